@@ -0,0 +1,75 @@
+"""
+Benchmark: serializing a model detail row with a full SHAP explanation.
+
+Compares FastAPI's default path (jsonable_encoder + json.dumps), the orjson default
+response class and the embed_json passthrough (JSON column text embedded as is,
+versus decode + re-encode with the stdlib).
+
+Run from the repository root (needs the api and worker extras):
+    PYTHONPATH=src python benchmarks/json_response.py
+"""
+import datetime
+import json
+import timeit
+import uuid
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from api.responses import FastJSONResponse, embed_json_columns
+from mlcore.explain.explanator import explain_model
+
+N_FEATURES = 60
+REPEAT = 50
+
+
+def build_model_row() -> dict:
+    X, y = make_classification(n_samples=2000, n_features=N_FEATURES, n_informative=20, random_state=42)
+    model = RandomForestClassifier(n_estimators=20, random_state=42).fit(X, y)
+    feature_names = [f"feature_{i}" for i in range(N_FEATURES)]
+    explanation = explain_model(
+        task="classification",
+        model=model,
+        X_train=X,
+        X_test=X[:200],
+        n_explain_max=200,
+        feature_names=feature_names,
+        feature_parents=feature_names,
+        label_classes=["no", "yes"],
+        include_distributions=True,
+    )
+    metadata = {"feature_names": feature_names, "explanation": explanation, "metrics": {"accuracy": 0.9}}
+    # pymysql returns MySQL JSON columns as text
+    return {
+        "id": str(uuid.uuid4()),
+        "problem_id": str(uuid.uuid4()),
+        "name": "benchmark",
+        "status": "staging",
+        "metrics_json": json.dumps({"accuracy": 0.9}),
+        "metadata_json": json.dumps(metadata),
+        "explanation_json": json.dumps(explanation),
+        "created_at": datetime.datetime.now(),
+    }
+
+
+def main():
+    row = build_model_row()
+    decoded = {key: json.loads(value) if key.endswith("_json") else value for key, value in row.items()}
+
+    cases = {
+        "default (jsonable_encoder + json), strings": lambda: json.dumps(jsonable_encoder(row)).encode(),
+        "orjson response, strings": lambda: FastJSONResponse(row).body,
+        "decode + re-encode (jsonable_encoder + json)": lambda: json.dumps(
+            jsonable_encoder({key: json.loads(value) if key.endswith("_json") else value for key, value in row.items()})
+        ).encode(),
+        "orjson response, embed_json passthrough": lambda: FastJSONResponse(embed_json_columns(row)).body,
+    }
+    print(f"payload: {len(FastJSONResponse(row).body) / 1024:.0f} KiB, {REPEAT} runs each")
+    assert json.loads(FastJSONResponse(embed_json_columns(row)).body) == json.loads(json.dumps(jsonable_encoder(decoded)))
+    for name, fn in cases.items():
+        seconds = min(timeit.repeat(fn, number=REPEAT, repeat=3)) / REPEAT
+        print(f"{name:<50} {seconds * 1e6:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: every list endpoint of the API against a DB seeded at synthetic scale.
+
+For each endpoint it times the first page, a page in the middle (OFFSET cost), a sort
+on a non-default column, a q= search and, where the endpoint has one, a status filter.
+Scoped endpoints (/datasetVersions/{id}, /problemModels/{id}, ...) use the parent with
+the most children. Requests go through the ASGI app (routing, DB, JSON response).
+
+Seed first, then run from the repository root (needs the api extras and MySQL):
+    python -m src.db.synthetic_seed --scale 10 --reset
+    DB_NAME=team1_db_test DB_CACHE_ENABLED=0 python benchmarks/list_endpoints.py
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from src.api.main import app  # noqa: E402
+from src.db.db import cursor  # noqa: E402
+
+# Parent id per scoped endpoint: the row with the most children
+BUSIEST_PARENT_SQL = {
+    "dataset": "SELECT dataset_id FROM dataset_versions GROUP BY dataset_id ORDER BY COUNT(*) DESC LIMIT 1",
+    "dataset_version": "SELECT dataset_version_id FROM ml_problems GROUP BY dataset_version_id ORDER BY COUNT(*) DESC LIMIT 1",
+    "problem": "SELECT problem_id FROM models GROUP BY problem_id ORDER BY COUNT(*) DESC LIMIT 1",
+    "model": "SELECT model_id FROM predictions GROUP BY model_id ORDER BY COUNT(*) DESC LIMIT 1",
+}
+
+# (path, parent, name sort, q, has status filter)
+ENDPOINTS = [
+    ("/datasets", None, "name", "churn", False),
+    ("/datasetVersions/{id}", "dataset", "name", "v1", False),
+    ("/datasetVersionProblems/{id}", "dataset_version", "name", "classification", False),
+    ("/problemModels/{id}", "problem", "name", "xgboost", True),
+    ("/modelPredictions/{id}", "model", "name", "prediction", False),
+    ("/problemPredictions/{id}", "problem", "name", "prediction", True),
+    ("/datasetVersionsAll", None, "dataset_name", "churn", False),
+    ("/mlProblemsAll", None, "name", "classification", False),
+    ("/modelsAll", None, "name", "xgboost", True),
+    ("/predictionsAll", None, "name", "prediction", True),
+]
+
+
+def busiest_parent(kind: str) -> str:
+    with cursor() as cur:
+        cur.execute(BUSIEST_PARENT_SQL[kind])
+        row = cur.fetchone()
+    if row is None:
+        raise SystemExit(f"No {kind} rows: seed the DB first (python -m src.db.synthetic_seed)")
+    return next(iter(row.values()))
+
+
+def timed(client: TestClient, path: str, params: dict, repeat: int) -> tuple[list[float], dict]:
+    samples = []
+    body = {}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(path, params=params)
+        samples.append(time.perf_counter() - started)
+        response.raise_for_status()
+        body = response.json()
+    return samples, body
+
+
+def main(repeat: int, size: int) -> None:
+    client = TestClient(app)
+    parents = {}
+    print(f"{'endpoint':<32} {'case':<12} {'p50 ms':>9} {'p95 ms':>9} {'total':>10}")
+    for path, parent, name_sort, q, has_status in ENDPOINTS:
+        if parent is not None and parent not in parents:
+            parents[parent] = busiest_parent(parent)
+        url = path.format(id=parents.get(parent))
+
+        _, first = timed(client, url, {"size": size}, 1)
+        cases = {
+            "first page": {"size": size},
+            "middle page": {"size": size, "page": max(1, first["total_pages"] // 2)},
+            f"sort {name_sort}": {"size": size, "sort": name_sort, "dir": "asc"},
+            "search": {"size": size, "q": q},
+        }
+        if has_status:
+            cases["status"] = {"size": size, "status": "completed" if "rediction" in path else "production"}
+
+        for case, params in cases.items():
+            samples, body = timed(client, url, params, repeat)
+            samples.sort()
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            print(f"{path:<32} {case:<12} {statistics.median(samples) * 1e3:9.1f} {p95 * 1e3:9.1f} {body['total']:>10}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Time every list endpoint against the current DB (DB_NAME).")
+    ap.add_argument("--repeat", type=int, default=20, help="Requests per case")
+    ap.add_argument("--size", type=int, default=20, help="Page size")
+    args = ap.parse_args()
+    main(args.repeat, args.size)
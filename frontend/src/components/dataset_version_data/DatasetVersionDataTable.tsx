@@ -23,7 +23,8 @@ const DatasetVersionDataTable = ({ uri }: Props) => {
   const [datasetVersionCSV, setDatasetVersionCSV] = useState<{
     column_names: string[];
     rows: Record<string, unknown>[];
-  }>({ column_names: [], rows: [] });
+    total_rows: number;
+  }>({ column_names: [], rows: [], total_rows: 0 });
   const [csvLoading, setCsvLoading] = useState(true);
   const [searchParams] = useSearchParams();
 
@@ -33,17 +34,15 @@ const DatasetVersionDataTable = ({ uri }: Props) => {
   const dir: "asc" | "desc" =
     searchParams.get("dir") === "asc" ? "asc" : "desc";
 
+  const offset = (page - 1) * size;
+
+  // only the current page is fetched (the API returns a window of the csv)
   useEffect(() => {
     async function loadCSV() {
       if (!uri) return;
       try {
-        const data: {
-          column_names: string[];
-          rows: Record<string, unknown>[];
-        } = await get_dataset_version_csv(uri);
+        const data = await get_dataset_version_csv(uri, offset, size);
         setDatasetVersionCSV(data);
-        setCsvLoading(false);
-        console.log(data);
       } catch (error) {
         console.log(error);
       } finally {
@@ -51,13 +50,14 @@ const DatasetVersionDataTable = ({ uri }: Props) => {
       }
     }
     loadCSV();
-  }, [uri]);
+  }, [uri, offset, size]);
 
   const columnNames: string[] = datasetVersionCSV.column_names;
   const rows: Record<string, unknown>[] = datasetVersionCSV.rows;
   const colSpan = columnNames.length - 1;
-  const total = rows.length;
+  const total = datasetVersionCSV.total_rows;
 
+  // sorting applies to the rows of the current page
   const sortedRows =
     !sort || !columnNames.includes(sort)
       ? rows
@@ -80,10 +80,7 @@ const DatasetVersionDataTable = ({ uri }: Props) => {
           );
         });
 
-  const totalRows = sortedRows.length;
-  const totalPages = Math.max(1, Math.ceil(totalRows / size));
-  const offset = (page - 1) * size;
-  const filteredRows = sortedRows.slice(offset, offset + size);
+  const totalPages = Math.max(1, Math.ceil(total / size));
 
   // helper function for stability
   function renderCell(value: unknown): React.ReactNode {
@@ -115,7 +112,7 @@ const DatasetVersionDataTable = ({ uri }: Props) => {
               </TableRow>
             </TableHeader>
             <TableBody>
-              {filteredRows.map((row, i) => (
+              {sortedRows.map((row, i) => (
                 <TableRow key={i}>
                   {columnNames.map((col) => (
                     <TableCell key={col}>{renderCell(row[col])}</TableCell>
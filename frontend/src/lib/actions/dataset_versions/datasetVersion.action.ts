@@ -129,11 +129,22 @@ export async function create_dataset_version(
   }
 }
 
-export async function get_dataset_version_csv(uri: string): Promise<{
+export async function get_dataset_version_csv(
+  uri: string,
+  offset: number,
+  limit: number,
+): Promise<{
   column_names: string[];
   rows: Record<string, unknown>[];
+  total_rows: number;
 }> {
-  const res = await fetch(`${API_URL}/csv/${encodeURIComponent(uri)}`);
+  const params = new URLSearchParams({
+    offset: String(offset),
+    limit: String(limit),
+  });
+  const res = await fetch(
+    `${API_URL}/csv/${encodeURIComponent(uri)}?${params.toString()}`,
+  );
   if (!res.ok) {
     throw new Error(`Failed to fetch csv: ${res.status}`);
   }
@@ -305,7 +305,9 @@ const MLProblemDetailPage = () => {
   }, [mlProblem, datasetVersion]);
 
   useEffect(() => {
-    const eventSource = new EventSource(`${API_URL}/events/stream`);
+    const eventSource = new EventSource(
+      `${API_URL}/events/stream?problem_id=${encodeURIComponent(problemId)}`,
+    );
 
     const refreshOnEvent = (e: MessageEvent) => {
       const payload = JSON.parse(e.data);
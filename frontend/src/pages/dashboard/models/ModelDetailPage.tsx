@@ -159,7 +159,9 @@ const ModelDetailPage = () => {
   }, [loadPredictions]);
 
   useEffect(() => {
-    const eventSource = new EventSource(`${API_URL}/events/stream`);
+    const eventSource = new EventSource(
+      `${API_URL}/events/stream?model_id=${encodeURIComponent(modelId)}`,
+    );
 
     const refreshOnPredict = (e: MessageEvent) => {
       const payload = JSON.parse(e.data);
@@ -1,4 +1,6 @@
+import asyncio
 import json
+import logging
 import os
 import time
 from typing import AsyncGenerator
@@ -6,41 +8,156 @@ from fastapi import APIRouter, Request
 from fastapi.responses import StreamingResponse
 import redis.asyncio as redis
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 REDIS_URL = os.getenv("REDISSERVER", "redis://redis_server:6379")
-CHANNEL = "jobs:global" # f"jobs:user:{user_id}" to add later -> Channel per user
+# Job events are published to jobs:u:{user_id}:p:{problem_id}:m:{model_id} (see worker/tasks.py);
+# no producer knows the requesting user yet, so the u part is always "_" and not filterable
+CHANNEL_PREFIX = "jobs"
+# Max events buffered per client; a slow client loses its oldest events first
+CLIENT_QUEUE_SIZE = int(os.getenv("SSE_CLIENT_QUEUE_SIZE", 100))
+# Seconds without events after which a keep-alive comment is sent
+HEARTBEAT_INTERVAL = float(os.getenv("SSE_HEARTBEAT_INTERVAL", 15))
+# Seconds to wait before resubscribing after the Redis connection was lost
+RECONNECT_DELAY = 1.0
+# Last metrics report of every worker's event publisher (see worker/publisher.py)
+PUBLISHER_METRICS_KEY = "events:publisher_metrics"
 
 def sse(event: str, data: dict) -> str:
     return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
+
+def channel_ids(channel: str) -> dict[str, str | None]:
+    """
+    problem_id/model_id of a job channel (jobs:u:{user_id}:p:{problem_id}:m:{model_id}, unknown parts "_").
+    """
+    parts = channel.split(":")
+    ids = dict(zip(parts[1::2], parts[2::2]))
+    return {
+        "problem_id": ids.get("p") if ids.get("p") != "_" else None,
+        "model_id": ids.get("m") if ids.get("m") != "_" else None,
+    }
+
+
+class Broadcaster:
+    """
+    One Redis pattern subscription (jobs:*) per API process, fanned out to a bounded
+    asyncio.Queue per SSE client. Each client has a filter (problem_id/model_id, None
+    matches anything) applied in the process, so any number of clients watching different
+    problems or models share the one Redis connection. The subscriber task starts with the
+    first client and stops when the last one leaves.
+    """
+
+    def __init__(self, url: str, pattern: str = f"{CHANNEL_PREFIX}:*", queue_size: int = CLIENT_QUEUE_SIZE):
+        self.url = url
+        self.pattern = pattern
+        self.queue_size = queue_size
+        self._clients: dict[asyncio.Queue, dict[str, str | None]] = {}
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self, problem_id: str | None = None, model_id: str | None = None) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._clients[queue] = {"problem_id": problem_id, "model_id": model_id}
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._clients.pop(queue, None)
+        if not self._clients and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def has_clients(self) -> bool:
+        return bool(self._clients)
+
+    def publish(self, channel: str, payload: dict) -> None:
+        ids = channel_ids(channel)
+        for queue, wanted in self._clients.items():
+            if any(value and ids[key] != value for key, value in wanted.items()):
+                continue
+            if queue.full():
+                # Drop-oldest: a slow consumer never blocks the others
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+    async def _run(self) -> None:
+        while True:
+            redis_con = redis.from_url(self.url, decode_responses=True)
+            pubsub = redis_con.pubsub()
+            try:
+                await pubsub.psubscribe(self.pattern)
+                # listen() blocks on the socket, no polling
+                async for msg in pubsub.listen():
+                    if msg.get("type") != "pmessage":
+                        continue
+                    try:
+                        self.publish(msg["channel"], json.loads(msg["data"]))
+                    except ValueError:
+                        logger.warning(f"[EVENTS] Dropping malformed message on {msg.get('channel')}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"[EVENTS] Redis subscription lost ({e}), reconnecting")
+                await asyncio.sleep(RECONNECT_DELAY)
+            finally:
+                try:
+                    await pubsub.punsubscribe(self.pattern)
+                    await pubsub.close()
+                    await redis_con.close()
+                except Exception:
+                    pass
+
+
+# Process-wide: every SSE client of this API process is served by this one subscription
+broadcaster = Broadcaster(REDIS_URL)
+
+
+@router.get("/metrics")
+async def publisher_metrics() -> dict:
+    """
+    Event publisher metrics per worker process ("<host>:<pid>"): published, dropped, failed,
+    queued and publish latency percentiles, as last reported (ts) by the process.
+    """
+    redis_con = redis.from_url(REDIS_URL, decode_responses=True)
+    try:
+        reports = await redis_con.hgetall(PUBLISHER_METRICS_KEY)
+    finally:
+        await redis_con.close()
+    return {"workers": {worker: json.loads(report) for worker, report in sorted(reports.items())}}
+
+
 @router.get("/stream")
-async def stream_events(request: Request) -> StreamingResponse:
+async def stream_events(
+    request: Request,
+    problem_id: str | None = None,
+    model_id: str | None = None,
+) -> StreamingResponse:
+    """
+    Server-sent job events. problem_id/model_id restrict the stream to the matching jobs;
+    without them every job event is sent.
+    """
+
     async def event_generator() -> AsyncGenerator[str, None]: # str: each yield -> string, None: never .send() values to the generator
-        redis_con = redis.from_url(REDIS_URL, decode_responses=True)
-        pubsub = redis_con.pubsub()
-        await pubsub.subscribe(CHANNEL)
+        queue = broadcaster.subscribe(problem_id, model_id)
 
         try:
-            yield sse("connected", {"ts": time.time(), "channel": CHANNEL})
-            
-            while True:
-                if await request.is_disconnected():
-                    break
-                
-                # Every *timeout* seconds recheck if request.is_disconnected()
-                msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            yield sse("connected", {"ts": time.time(), "problem_id": problem_id, "model_id": model_id})
 
-                if msg and msg.get("type") == "message":
-                    payload = json.loads(msg["data"])
-                    event = payload.get("event", "job.event")
-                    yield sse(event, payload)
+            # When the client disconnects, StreamingResponse cancels this generator -> finally
+            while True:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                event = payload.get("event", "job.event")
+                yield sse(event, payload)
 
         finally:
-            await pubsub.unsubscribe(CHANNEL)
-            await pubsub.close()
-            await redis_con.close()
+            broadcaster.unsubscribe(queue)
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
-
-
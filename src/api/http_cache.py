@@ -0,0 +1,112 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from fastapi import Request, Response
+from .responses import FastJSONResponse, embed_json_columns
+
+# Max number of (resource, id, variant) -> ETag entries kept in memory
+ETAG_INDEX_SIZE = int(os.getenv("ETAG_INDEX_SIZE", 10000))
+# Seconds an indexed ETag is trusted without reading the row again (bounds staleness when
+# several API processes run and one of them changes a row)
+ETAG_INDEX_TTL = float(os.getenv("ETAG_INDEX_TTL", 300))
+# Browsers may store the response but must revalidate it (cheap with If-None-Match -> 304)
+CACHE_CONTROL = "private, no-cache"
+
+
+class ETagIndex:
+    """
+    Small in-memory index of the ETags of rows that only change through this API,
+    so a matching If-None-Match is answered with 304 before the row is fetched.
+    Thread-safe: the sync handlers run concurrently in the threadpool.
+    """
+
+    def __init__(self, max_entries: int = ETAG_INDEX_SIZE, ttl: float = ETAG_INDEX_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[tuple, tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            etag, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return etag
+
+    def put(self, key: tuple, etag: str) -> None:
+        with self._lock:
+            self._entries[key] = (etag, time.monotonic())
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, resource: str, resource_id: str | None = None) -> None:
+        """
+        Drop the entries of one row (all variants) or, without an id, of a whole resource.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == resource and (resource_id is None or key[1] == resource_id)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+etag_index = ETagIndex()
+
+
+def _matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def not_modified(request: Request, resource: str, resource_id: str, embed_json: bool = False) -> Response | None:
+    """
+    304 response when the client already has the indexed version of the row, else None.
+    """
+    etag = etag_index.get((resource, resource_id, embed_json))
+    if etag and _matches(request, etag):
+        return _not_modified(etag)
+    return None
+
+
+def etag_response(
+    request: Request,
+    resource: str,
+    resource_id: str,
+    row: dict | None,
+    embed_json: bool = False,
+    cacheable: bool = True,
+) -> Response:
+    """
+    Detail response with a strong ETag (row id + hash of the serialized row) and Cache-Control.
+    cacheable=False for rows that can still be changed outside the API (e.g. by a running worker
+    task): they get an ETag, but it is not put into the index.
+    """
+    response = FastJSONResponse(embed_json_columns(row) if embed_json else row)
+    if not row:
+        return response
+
+    etag = f'"{resource_id}-{hashlib.sha256(response.body).hexdigest()[:20]}"'
+    if cacheable:
+        etag_index.put((resource, resource_id, embed_json), etag)
+    if _matches(request, etag):
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
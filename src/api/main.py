@@ -1,28 +1,31 @@
-import shutil
-import uuid
 from ..celery_handler import celery_app
 from fastapi import FastAPI, File, Form, HTTPException, Request, Query, UploadFile
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import starlette.status as status
 from typing import Any, Literal, Optional
 import logging
 import json
 import time
 import os
+from anyio import to_thread
 from ..db.init_db import main
-from ..db.db import create_dataset, create_dataset_version, create_ml_problem, create_model, create_prediction, db_get_dataset, db_get_dataset_version, delete_dataset, delete_dataset_version, delete_ml_problem, delete_model, delete_prediction, get_dashboard_stats, get_dataset_versions_all_joined, get_datasets, get_dataset_versions, get_ml_predictions_all_joined, get_ml_problem, get_ml_problems, get_ml_problems_all_joined, get_model, get_models, get_models_all_joined, get_prediction, get_predictions, get_predictions_all_joined, set_model_to_production, update_dataset, update_dataset_version, update_ml_problem, update_model, update_prediction
-from ..mlcore.profile.profiler import suggest_profile, suggest_schema
-from ..mlcore.io.data_reader import get_dataframe_from_csv, preprocess_dataframe, get_semantic_types
+from ..db.db import create_dataset, create_dataset_version, create_ml_problem, create_model, create_prediction, db_get_dataset, db_get_dataset_version, db_get_dataset_version_by_hash, delete_dataset, delete_dataset_version, delete_ml_problem, delete_model, delete_prediction, get_dashboard_stats, get_dataset_versions_all_joined, get_datasets, get_dataset_versions, get_ml_predictions_all_joined, get_ml_problem, get_ml_problems, get_ml_problems_all_joined, get_model, get_models, get_models_all_joined, get_prediction, get_predictions, get_predictions_all_joined, set_model_to_production, update_dataset, update_dataset_version, update_ml_problem, update_model, update_prediction
+from ..mlcore.io.preset_loader import get_registry
+# The pandas-based helpers (mlcore.profile, mlcore.io) are imported inside the handlers that
+# use them, so the API starts (and serves its list/detail routes) without loading pandas.
 from pathlib import Path
-import pandas as pd
 from io import BytesIO
 from .events import router as events_router
+from .uploads import save_upload
+from .responses import FastJSONResponse, detail_response
+from .http_cache import etag_index, etag_response, not_modified
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 
 app.add_middleware(
@@ -33,6 +36,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip responses above GZIP_MIN_SIZE bytes. Streaming responses are compressed chunk by chunk,
+# text/event-stream (/events/stream) is left uncompressed by the middleware.
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", 1024))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE, compresslevel=GZIP_LEVEL)
+
 app.include_router(events_router, prefix="/events")
 
 def get_domain(request: Request):
@@ -51,6 +60,17 @@ def get_domain(request: Request):
     return domain
 
 
+# Handlers are plain `def` so FastAPI runs their blocking work (pymysql, pandas, celery) in a
+# worker thread and the event loop stays free for SSE streams. This bounds that thread pool.
+API_THREADPOOL_SIZE = int(os.getenv("API_THREADPOOL_SIZE", 40))
+
+
+@app.on_event("startup")
+async def configure_threadpool():
+    limiter = to_thread.current_default_thread_limiter()
+    limiter.total_tokens = API_THREADPOOL_SIZE
+
+
 # .on_event is deprecated and it suggests to use lifespan, but i don't know it. It should still support .on_event.
 @app.on_event("startup")
 def on_startup():
@@ -72,7 +92,7 @@ def on_startup():
 
 
 @app.get("/")
-async def read_root():
+def read_root():
     logger.info("Sending celery task 'hello.task'")
     task = celery_app.send_task("hello.task", args=["world"])
     # return task id and url
@@ -117,14 +137,14 @@ def check_task(id: str):
 
 
 @app.post("/dataset")  # /dataset?name=test&user_id=1
-async def post_dataset(name: str,): # user_id: int):
+def post_dataset(name: str,): # user_id: int):
     """create a stub for a new dataset and return the id"""
     dataset_id = create_dataset(name)
     return dataset_id
 
 
 @app.get("/datasets")  # /datasets
-async def get_list_datasets(
+def get_list_datasets(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
     sort: str = Query("created_at"),
@@ -160,23 +180,25 @@ async def get_list_datasets(
 
 
 @app.get("/dataset/{dataset_id}")
-async def get_dataset(dataset_id: str): #, user_id: int):
+def get_dataset(dataset_id: str): #, user_id: int):
     """return the specified dataset if user has permission"""
     dataset = db_get_dataset(dataset_id)
     return dataset
 
 
 @app.patch("/dataset/{dataset_id}")
-async def patch_dataset(dataset_id: str, name: str):
+def patch_dataset(dataset_id: str, name: str):
     """update the specified dataset if user has permission"""
     res = update_dataset(dataset_id, name)
     return res
 
 
 @app.delete("/dataset/{dataset_id}")
-async def delete_dataset_ep(dataset_id: str):
+def delete_dataset_ep(dataset_id: str):
     """delete the specified dataset if user has permission"""
     res = delete_dataset(dataset_id)
+    # Cascades to versions, problems, models and predictions
+    etag_index.clear()
     return res
 
 # ========== Dataset version ==========
@@ -184,22 +206,10 @@ async def delete_dataset_ep(dataset_id: str):
 # TODO: allow .csv upload on Write-Paths
 
 UPLOAD_DIR = Path("/code/worker/testdata/")
-def save_file(file: UploadFile):
-    if file.filename == "":
-        raise HTTPException(status_code=400, detail="No file selected")
-    if not file.filename.lower().endswith(".csv"):
-        raise HTTPException(status_code=400, detail="File must be a CSV")
-    filename = file.filename
-    file_path = UPLOAD_DIR / f"{uuid.uuid4()}_{filename}" # force unique naming for CSVs to avoid accidentally overwriting
-    try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        return str(file_path), filename
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
+
 
 @app.post("/datasetVersion")
-async def post_dataset_version(
+def post_dataset_version(
     dataset_id: str = Form(...),
     name: str = Form(...),
     file: Optional[UploadFile] = File(None),
@@ -209,33 +219,59 @@ async def post_dataset_version(
     if not file and not file_id:
         return {}
     if file:
-        uri, filename = save_file(file)
-        if not uri:
-            return {}
+        # hash, row count and schema sketch are computed while the upload is written
+        upload = save_upload(file, UPLOAD_DIR)
+        uri = upload["uri"]
+        filename = upload["filename"]
     if file_id:
         return {}
     
-    # TO BE ADDED TO TASK AND UPDATE WHEN READY
-    df = get_dataframe_from_csv(uri)
-    profile_json = suggest_profile(df)
-    schema_json = suggest_schema(df)
-    # END OF COMMENT
+    schema_json = upload["schema_json"]
+    # Same content uploaded before: reuse its profile instead of profiling again
+    existing = db_get_dataset_version_by_hash(upload["content_hash"])
+    if existing and existing.get("profile_json"):
+        from ..mlcore.profile.profiler import suggest_exclusions
+        profile_json = json.loads(existing["profile_json"])
+        # exclude_suggestions may have been edited on the other version: start from the suggested ones
+        profile_json["exclude_suggestions"] = suggest_exclusions(profile_json.get("columns", {}))
+        if existing.get("schema_json"):
+            schema_json = json.loads(existing["schema_json"])
+    else:
+        from ..mlcore.io.data_reader import get_dataframe_from_csv
+        from ..mlcore.profile.profiler import suggest_profile
+        # TO BE ADDED TO TASK AND UPDATE WHEN READY
+        df = get_dataframe_from_csv(uri)
+        profile_json = suggest_profile(df)
+        # END OF COMMENT
     
-    dataset_version_id = create_dataset_version(dataset_id=dataset_id, uri=uri, filename=filename, name=name, schema_json=schema_json, profile_json=profile_json)
+    dataset_version_id = create_dataset_version(
+        dataset_id=dataset_id,
+        uri=uri,
+        filename=filename,
+        name=name,
+        schema_json=schema_json,
+        profile_json=profile_json,
+        row_count=upload["row_count"],
+        content_hash=upload["content_hash"],
+    )
     return dataset_version_id
 
 
 @app.get("/datasetVersion/{version}")
-async def get_dataset_version(version: str): #, user_id: int):
-    """return the specified dataset version if user has permission"""
+def get_dataset_version(request: Request, version: str, embed_json: bool = Query(False)): #, user_id: int):
+    """return the specified dataset version if user has permission (embed_json: JSON columns as objects)"""
+    cached = not_modified(request, "dataset_version", version, embed_json)
+    if cached:
+        return cached
     dataset_version = db_get_dataset_version(version)
-    return dataset_version
+    return etag_response(request, "dataset_version", version, dataset_version, embed_json)
 
 
 @app.patch("/datasetVersion/{version}")
-async def patch_dataset_version(version: str, name: str):
+def patch_dataset_version(version: str, name: str):
     """update the specified dataset version if user has permission"""
     res = update_dataset_version(version, name)
+    etag_index.invalidate("dataset_version", version)
     return res
 
 class Exclude(BaseModel):
@@ -255,6 +291,7 @@ def update_exclude_suggestions(version: str, exclude_body: Exclude) -> bool:
     profile["exclude_suggestions"] = exclude_body.exclude
 
     res = update_dataset_version(version, profile_json=profile)
+    etag_index.invalidate("dataset_version", version)
     return res
 
 
@@ -268,25 +305,30 @@ def reset_dataset_version_profile(version: str) -> bool:
     if not uri:
         raise HTTPException(404, "Dataset version URI not found")
 
+    from ..mlcore.io.data_reader import get_dataframe_from_csv
+    from ..mlcore.profile.profiler import suggest_profile, suggest_schema
     # TO BE ADDED TO TASK AND UPDATE WHEN READY
     df = get_dataframe_from_csv(uri)
     profile_json = suggest_profile(df)
     schema_json = suggest_schema(df)
     # END OF COMMENT
 
-    res = update_dataset_version(version, profile_json=profile_json, schema_json=schema_json)
+    res = update_dataset_version(version, profile_json=profile_json, schema_json=schema_json, row_count=len(df))
+    etag_index.invalidate("dataset_version", version)
     return res
 
 
 @app.delete("/datasetVersion/{version}")
-async def delete_dataset_version_ep(version: str):
+def delete_dataset_version_ep(version: str):
     """delete the specified dataset version if user has permission"""
     res = delete_dataset_version(version)
+    # Cascades to problems, models and predictions
+    etag_index.clear()
     return res
 
 
 @app.get("/datasetVersions/{dataset_id}")  # /dataset_versions
-async def get_list_dataset_versions(
+def get_list_dataset_versions(
     dataset_id: str,
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
@@ -324,7 +366,7 @@ async def get_list_dataset_versions(
 
 
 @app.get("/datasetVersionProblems/{dataset_version_id}")  # ml_problems
-async def get_list_problems(
+def get_list_problems(
     dataset_version_id: str,
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
@@ -407,7 +449,7 @@ async def delete_job(user_id: int):
 
 
 @app.post("/problem")  # or ml_problems for clarity
-async def post_problem(
+def post_problem(
     # user_id: int,
     # dataset_id: str,  # maybe we should concider having dataset_name UNIQUE in db so that we can replace this here with dataset_name
     target: str,
@@ -417,12 +459,13 @@ async def post_problem(
 ):
     """create a new ml_problem and return problem_id"""
     # TO BE ADDED TO TASK AND UPDATE WHEN READY
-    dataset_version = await get_dataset_version(dataset_version_id)
+    dataset_version = db_get_dataset_version(dataset_version_id)
     raw_profile = dataset_version.get("profile_json")
     profile = json.loads(raw_profile) if isinstance(raw_profile, str) and raw_profile else {}
     uri = dataset_version.get("uri")
     if not uri:
         raise HTTPException(status_code=400, detail="Dataset version has no URI")
+    from ..mlcore.io.data_reader import get_dataframe_from_csv, preprocess_dataframe, get_semantic_types
     df = get_dataframe_from_csv(uri)
     X, y = preprocess_dataframe(df, target, profile)
     semantic_types = get_semantic_types(X, profile)
@@ -438,23 +481,25 @@ async def post_problem(
 
 
 @app.get("/problem/{problem_id}")
-async def get_problem(problem_id: str):
-    """return specified problem if user has permission"""
+def get_problem(problem_id: str, embed_json: bool = Query(False)):
+    """return specified problem if user has permission (embed_json: JSON columns as objects)"""
     ml_problem = get_ml_problem(problem_id)
-    return ml_problem
+    return detail_response(ml_problem, embed_json)
 
 
 @app.patch("/problem/{problem_id}")
-async def patch_ml_problem(problem_id: str, name: str):
+def patch_ml_problem(problem_id: str, name: str):
     """update the specified ml_problem if user has permission"""
     res = update_ml_problem(problem_id, name)
     return res
 
 
 @app.delete("/problem/{problem_id}")
-async def delete_ml_problem_ep(problem_id: str):
+def delete_ml_problem_ep(problem_id: str):
     """delete the specified ml_problem if user has permission"""
     res = delete_ml_problem(problem_id)
+    # Cascades to models and predictions
+    etag_index.clear()
     return res
 
 
@@ -502,7 +547,7 @@ def reset_feature_strategy(problem_id: str) -> bool:
 
 
 @app.post("/train")
-async def post_train(
+def post_train(
     # user_id: int,
     name: str,
     problem_id: str,
@@ -510,8 +555,14 @@ async def post_train(
     train_mode: Literal["fast", "balanced", "accurate"] = "balanced",
     evaluation_strategy: Literal["cv", "holdout"] = "cv",
     explanation: bool = True,
+    reuse_fit: bool = True,
+    background_method: Literal["sample", "kmeans"] = "sample",
+    persist_background: bool = True,
 ):
-    """create a request/job to train a model for a given problem_id and return model_id"""
+    """
+    create a request/job to train a model for a given problem_id and return model_id
+    (persist_background=False: no local explanations for this model, background_method: how the SHAP background is drawn)
+    """
     model_id, model_uri = create_model(
             problem_id=problem_id,
             algorithm=algorithm,
@@ -524,14 +575,15 @@ async def post_train(
 
     # TODO: re-add user_id when we add checking for permissions
     task = celery_app.send_task(
-        "train.task", args=[name, problem_id, model_id, model_uri, algorithm, train_mode, evaluation_strategy, explanation])
+        "train.task", args=[name, problem_id, model_id, model_uri, algorithm, train_mode, evaluation_strategy, explanation],
+        kwargs={"reuse_fit": reuse_fit, "background_method": background_method, "persist_background": persist_background})
     return RedirectResponse(url=f"/celery/{task.id}", status_code=status.HTTP_303_SEE_OTHER)
 
 # ========== ML_Predict ==========
 
 
 @app.post("/predict")
-async def post_predict(
+def post_predict(
     name: str = Form(...),
     input_csv: Optional[UploadFile] = File(None),
     input_json: Optional[str] = Form(None),
@@ -553,8 +605,9 @@ async def post_predict(
         if not input_csv.filename.lower().endswith(".csv"):
             raise HTTPException(status_code=400, detail="File must be a CSV")
         # Read CSV
-        content = await input_csv.read()
+        content = input_csv.file.read()
         #  CSV to DataFrame with pandas
+        import pandas as pd
         df = pd.read_csv(BytesIO(content))
         # DataFrame to JSON
         input_json = df.to_json(orient='records')
@@ -587,7 +640,7 @@ async def post_predict(
 
 
 @app.get("/problemModels/{problem_id}")  # models
-async def get_list_models(
+def get_list_models(
     problem_id: str,
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
@@ -637,41 +690,51 @@ async def get_list_models(
 
 
 @app.get("/model/{model_id}")
-async def get_model_info(model_id: str): #, user_id: int):
-    """return the specified model if user has permission"""
+def get_model_info(request: Request, model_id: str, embed_json: bool = Query(False)): #, user_id: int):
+    """return the specified model if user has permission (embed_json: JSON columns as objects)"""
+    cached = not_modified(request, "model", model_id, embed_json)
+    if cached:
+        return cached
     model = get_model(model_id)
-    return model
+    # While training, the worker still writes the row
+    cacheable = bool(model) and model.get("status") != "training"
+    return etag_response(request, "model", model_id, model, embed_json, cacheable)
 
 
 @app.patch("/model/{model_id}")
-async def patch_model(model_id: str, name: str):
+def patch_model(model_id: str, name: str):
     """update the specified model if user has permission"""
     res = update_model(model_id, name)
+    etag_index.invalidate("model", model_id)
     return res
 
 
 @app.delete("/model/{model_id}")
-async def delete_model_ep(model_id: str):
+def delete_model_ep(model_id: str):
     """delete the specified model if user has permission"""
     res = delete_model(model_id)
+    etag_index.invalidate("model", model_id)
+    etag_index.invalidate("prediction")
     return res
 
 
 @app.patch("/model/{model_id}/set_production")
-async def set_model_to_production_ep(model_id: str):
+def set_model_to_production_ep(model_id: str):
     """set model to status production"""
     model = get_model(model_id)
     if not model:
         raise HTTPException(status_code=404, detail="Model not found")
     problem_id = model["problem_id"]
     res = set_model_to_production(problem_id, model_id)
+    # The previous production model of the problem is archived as well
+    etag_index.invalidate("model")
     return res
 
 
 # ========== ML_Predictions ==========
 
 @app.get("/problemPredictions/{problem_id}")
-async def get_list_predictions_all(
+def get_list_predictions_all(
     problem_id: str,
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
@@ -712,7 +775,7 @@ async def get_list_predictions_all(
 
 
 @app.get("/modelPredictions/{model_id}")  # models
-async def get_list_predictions(
+def get_list_predictions(
     model_id: str,
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
@@ -750,60 +813,80 @@ async def get_list_predictions(
 
 
 @app.get("/prediction/{prediction_id}")
-async def get_prediction_info(prediction_id: str): #, user_id: int):
-    """return the specified prediction if user has permission"""
+def get_prediction_info(request: Request, prediction_id: str, embed_json: bool = Query(False)): #, user_id: int):
+    """return the specified prediction if user has permission (embed_json: JSON columns as objects)"""
+    cached = not_modified(request, "prediction", prediction_id, embed_json)
+    if cached:
+        return cached
     prediction = get_prediction(prediction_id)
-    return prediction
+    # Finished predictions are still rewritten once by the retention job (archive.task sets
+    # archived_at/outputs_uri, outside the API): only archived rows no longer change
+    cacheable = (
+        bool(prediction)
+        and prediction.get("status") in ("completed", "failed")
+        and prediction.get("archived_at") is not None
+    )
+    return etag_response(request, "prediction", prediction_id, prediction, embed_json, cacheable)
 
 
 @app.patch("/prediction/{prediction_id}")
-async def patch_model(prediction_id: str, name: str):
+def patch_model(prediction_id: str, name: str):
     """update the specified prediction if user has permission"""
     res = update_prediction(prediction_id, name)
+    etag_index.invalidate("prediction", prediction_id)
     return res
 
 
+class ExplainRows(BaseModel):
+    rows: list[int]
+    top_k: int = 10
+
+@app.post("/prediction/{prediction_id}/explain")
+def post_prediction_explain(prediction_id: str, explain_body: ExplainRows):
+    """create a request/job to compute local explanations for selected rows of a stored prediction"""
+    if not explain_body.rows:
+        raise HTTPException(status_code=400, detail="Provide at least one row index")
+    prediction = get_prediction(prediction_id)
+    if not prediction:
+        raise HTTPException(status_code=404, detail="Prediction not found")
+    if prediction.get("status") != "completed":
+        raise HTTPException(status_code=409, detail="Prediction is not completed yet")
+    logger.info("Sending celery task 'explain.task'")
+
+    task = celery_app.send_task(
+        "explain.task", args=[prediction_id, explain_body.rows, explain_body.top_k])
+    return {"task_id": task.id, "status": f"/celery/{task.id}"}
+
+
 @app.delete("/prediction/{prediction_id}")
-async def delete_prediction_ep(prediction_id: str):
+def delete_prediction_ep(prediction_id: str):
     """delete the specified prediction if user has permission"""
     res = delete_prediction(prediction_id)
+    etag_index.invalidate("prediction", prediction_id)
     return res
 
 
 # ========== Dashboard Stats ==========
 
 
+# Seconds a dashboard stats snapshot is served before the counts are queried again
+DASHBOARD_STATS_TTL = float(os.getenv("DASHBOARD_STATS_TTL", 30))
+
 @app.get("/dashboard/stats")
-async def get_dashboard_stats_info(): #, user_id: int):
-    """return the dashboard stats if user has permission"""
-    stats = get_dashboard_stats()
+def get_dashboard_stats_info(): #, user_id: int):
+    """return the dashboard stats if user has permission (snapshot refreshed every DASHBOARD_STATS_TTL seconds)"""
+    stats = get_dashboard_stats(max_age=DASHBOARD_STATS_TTL)
     return stats
 
 
 # ========== Presets ==========
 
 def list_presets(task: Literal["classification", "regression"], base_dir: str = "/code/mlcore/presets") -> list[str]:
-    task_dir = os.path.join(base_dir, task)
-    if not os.path.isdir(task_dir):
-        raise ValueError(
-            f"Failed to find a directory for this task {task}.")
-    
-    presets = set()
-    
-    for file in os.listdir(task_dir):
-        # read only python files
-        if not file.endswith(".py"):
-            continue
-        # skip private / init files
-        if file == "__init__.py" or file.startswith("_"):
-            continue
-        preset_name = os.path.splitext(file)[0]
-        presets.add(preset_name)
-    
-    return sorted(presets)
+    # Cached per process, re-listed only when the task directory changes (presets are not imported)
+    return get_registry(base_dir).list(task)
 
 @app.get("/presets/{task}")
-async def get_presets_list(task): #, user_id: int):
+def get_presets_list(task): #, user_id: int):
     """return the preset_list"""
     presets = list_presets(task)
     return presets
@@ -811,13 +894,51 @@ async def get_presets_list(task): #, user_id: int):
 
 # ========== CSV ==========
 
+# Max rows per /csv window
+CSV_MAX_LIMIT = int(os.getenv("CSV_MAX_LIMIT", 10000))
+
 @app.get("/csv/{uri:path}")
-async def get_csv(uri: str) -> dict[str, Any]: #, user_id: int):
-    """return the csv given the uri"""
-    df = get_dataframe_from_csv(uri)
+def get_csv(
+    uri: str,
+    columns: Optional[str] = Query(None, description="comma separated column names to return"),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=CSV_MAX_LIMIT, description=f"rows to return (json: defaults to {CSV_MAX_LIMIT})"),
+    format: Literal["json", "ndjson"] = Query("json"),
+):  #, user_id: int):
+    """
+    return the csv given the uri (only the requested columns are parsed).
+    offset/limit return a window of rows, located through a cached row-offset index;
+    a json response holds at most CSV_MAX_LIMIT rows (total_rows tells the client to page).
+    format=ndjson streams a header line ({"column_names", "total_rows"}) followed by one row per line.
+    """
+    from ..mlcore.io.csv_index import get_row_index, iter_csv_chunks, read_csv_window
+
+    usecols = None
+    if columns:
+        selected = {column.strip() for column in columns.split(",") if column.strip()}
+        usecols = lambda column: column in selected
+
+    if format == "ndjson":
+        index = get_row_index(uri)
+        total_rows = index["n_rows"]
+        column_names = [column for column in index["columns"] if usecols is None or usecols(column)]
+
+        def ndjson_lines():
+            yield json.dumps({"column_names": column_names, "total_rows": total_rows}) + "\n"
+            for chunk in iter_csv_chunks(uri, offset=offset, limit=limit, usecols=usecols):
+                lines = chunk.to_json(orient="records", lines=True, force_ascii=False)
+                yield lines if lines.endswith("\n") else lines + "\n"
+
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+    limit = limit or CSV_MAX_LIMIT
+    df, total_rows = read_csv_window(uri, offset=offset, limit=limit, usecols=usecols)
     return {
         "column_names": list(df.columns),
         "rows": df.to_dict(orient="records"),
+        "offset": offset,
+        "limit": limit,
+        "total_rows": total_rows,
     }
 
 
@@ -825,7 +946,7 @@ async def get_csv(uri: str) -> dict[str, Any]: #, user_id: int):
 
 
 @app.get("/datasetVersionsAll")
-async def get_list_dataset_versions_all(
+def get_list_dataset_versions_all(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
     sort: str = Query("created_at"),
@@ -860,7 +981,7 @@ async def get_list_dataset_versions_all(
     }
 
 @app.get("/mlProblemsAll")
-async def get_list_ml_problems_all(
+def get_list_ml_problems_all(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
     sort: str = Query("created_at"),
@@ -907,7 +1028,7 @@ async def get_list_ml_problems_all(
     }
 
 @app.get("/modelsAll")
-async def get_list_models_all(
+def get_list_models_all(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
     sort: str = Query("created_at"),
@@ -963,7 +1084,7 @@ async def get_list_models_all(
     }
 
 @app.get("/predictionsAll")
-async def get_list_predictions_all(
+def get_list_predictions_all(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
     sort: str = Query("created_at"),
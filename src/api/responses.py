@@ -0,0 +1,61 @@
+import decimal
+from typing import Any
+import orjson
+from fastapi.responses import ORJSONResponse
+
+# MySQL JSON columns across all tables (returned by pymysql as JSON text)
+JSON_COLUMNS = (
+    "schema_json",
+    "profile_json",
+    "feature_strategy_json",
+    "schema_snapshot",
+    "semantic_types",
+    "metrics_json",
+    "metadata_json",
+    "explanation_json",
+    "inputs_json",
+    "outputs_json",
+)
+
+
+def _default(obj: Any) -> Any:
+    # Types orjson does not serialize natively
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    orjson response used as the default response class of the API.
+    Also serializes numpy values, non-string dict keys and Decimals.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+
+def embed_json_columns(row: dict | None) -> dict | None:
+    """
+    Wrap the JSON column text of a db row in orjson.Fragment so it is embedded
+    as nested JSON as it is, without being decoded and encoded again.
+    """
+    if not row:
+        return row
+    return {
+        key: orjson.Fragment(value) if key in JSON_COLUMNS and isinstance(value, (str, bytes)) else value
+        for key, value in row.items()
+    }
+
+
+def detail_response(row: dict | None, embed_json: bool = False) -> FastJSONResponse:
+    """
+    Response for a single db row, skipping FastAPI's jsonable_encoder pass.
+    embed_json=False keeps JSON columns as strings (what the frontend parses),
+    embed_json=True returns them as nested objects.
+    """
+    return FastJSONResponse(embed_json_columns(row) if embed_json else row)
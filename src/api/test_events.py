@@ -0,0 +1,42 @@
+import asyncio
+from .events import Broadcaster, channel_ids
+
+
+def test_channel_ids():
+    assert channel_ids("jobs:u:_:p:pr1:m:m1") == {"problem_id": "pr1", "model_id": "m1"}
+    assert channel_ids("jobs:u:_:p:_:m:_") == {"problem_id": None, "model_id": None}
+
+
+def test_one_subscription_routes_events_to_matching_clients(monkeypatch):
+    runs = []
+
+    async def fake_run(self):
+        runs.append(self.pattern)
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(Broadcaster, "_run", fake_run)
+
+    async def scenario():
+        broadcaster = Broadcaster("redis://fake")
+        everything = broadcaster.subscribe()
+        problem = broadcaster.subscribe(problem_id="pr1")
+        model = broadcaster.subscribe(model_id="m2")
+        await asyncio.sleep(0)
+
+        broadcaster.publish("jobs:u:_:p:pr1:m:m1", {"event": "job.completed", "n": 1})
+        broadcaster.publish("jobs:u:_:p:pr2:m:m2", {"event": "job.completed", "n": 2})
+        broadcaster.publish("jobs:u:_:p:_:m:_", {"event": "job.failed", "n": 3})
+
+        received = {
+            name: [queue.get_nowait()["n"] for _ in range(queue.qsize())]
+            for name, queue in (("everything", everything), ("problem", problem), ("model", model))
+        }
+        for queue in (everything, problem, model):
+            broadcaster.unsubscribe(queue)
+        return received, broadcaster
+
+    received, broadcaster = asyncio.run(scenario())
+    # Three clients with different filters, one Redis subscription
+    assert runs == ["jobs:*"]
+    assert received == {"everything": [1, 2, 3], "problem": [1], "model": [2]}
+    assert not broadcaster.has_clients
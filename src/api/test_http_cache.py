@@ -0,0 +1,53 @@
+import sys
+import threading
+from .http_cache import ETagIndex
+
+
+def test_etag_index_is_thread_safe():
+    # Small index: puts evict constantly while other threads read and invalidate
+    index = ETagIndex(max_entries=50, ttl=3600)
+    errors = []
+    start = threading.Barrier(8)
+
+    def worker(n):
+        try:
+            start.wait()
+            for i in range(5000):
+                key = ("model", str(i % 200), bool(n % 2))
+                index.put(key, f'"{i}"')
+                index.get(("model", str((i * 7) % 200), False))
+                if i % 50 == 0:
+                    index.invalidate("model", str(i % 200))
+                if i % 1000 == 0:
+                    index.invalidate("model")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    # Switch threads as often as possible, so unguarded OrderedDict updates interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert len(index._entries) <= 50
+
+
+def test_etag_index_expires_and_invalidates():
+    index = ETagIndex(ttl=0)
+    index.put(("model", "m1", False), '"a"')
+    assert index.get(("model", "m1", False)) is None
+
+    index = ETagIndex()
+    index.put(("model", "m1", False), '"a"')
+    index.put(("model", "m1", True), '"b"')
+    index.put(("prediction", "p1", False), '"c"')
+    index.invalidate("model", "m1")
+    assert index.get(("model", "m1", True)) is None
+    assert index.get(("prediction", "p1", False)) == '"c"'
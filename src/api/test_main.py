@@ -10,3 +10,87 @@ def test_read_main():
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"msg": "Hello World"}
+
+
+def test_list_requests_do_not_block_event_loop(monkeypatch):
+    """
+    Load test: slow (blocking) list requests run in the thread pool, so the
+    p99 latency of cheap requests served concurrently stays low.
+    """
+    import asyncio
+    import time
+    import httpx
+    from . import main
+
+    def slow_get_datasets(**kwargs):
+        time.sleep(0.3)  # simulates a slow MySQL query
+        return [], 0
+
+    monkeypatch.setattr(main, "get_datasets", slow_get_datasets)
+    monkeypatch.setattr(main, "get_dashboard_stats", lambda **kwargs: {"datasets": 0})
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            async def timed(url):
+                start = time.perf_counter()
+                response = await ac.get(url)
+                assert response.status_code == 200
+                return time.perf_counter() - start
+
+            async def fast_requests():
+                latencies = []
+                for _ in range(50):
+                    latencies.append(await timed("/dashboard/stats"))
+                    await asyncio.sleep(0.01)
+                return latencies
+
+            async def slow_requests():
+                # Waves of concurrent list requests while the fast requests are running
+                for _ in range(4):
+                    await asyncio.gather(*[timed("/datasets") for _ in range(10)])
+
+            fast, _ = await asyncio.gather(fast_requests(), slow_requests())
+            return sorted(fast)
+
+    latencies = asyncio.run(run())
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    assert p99 < 0.2, f"p99 latency {p99:.3f}s"
+
+
+def test_model_etag_not_modified(monkeypatch):
+    from . import main
+
+    calls = []
+    row = {"id": "m1", "status": "staging", "name": "model"}
+    monkeypatch.setattr(main, "get_model", lambda model_id: calls.append(model_id) or dict(row))
+
+    response = client.get("/model/m1")
+    etag = response.headers["etag"]
+    assert response.status_code == 200
+
+    # Indexed ETag -> 304 without reading the row again
+    response = client.get("/model/m1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert len(calls) == 1
+
+
+def test_prediction_etag_indexed_only_once_archived(monkeypatch):
+    from . import main
+
+    calls = []
+    row = {"id": "p1", "status": "completed", "archived_at": None}
+    monkeypatch.setattr(main, "get_prediction", lambda prediction_id: calls.append(prediction_id) or dict(row))
+    main.etag_index.clear()
+
+    # Finished but not archived yet: the retention job still rewrites the row -> not indexed
+    etag = client.get("/prediction/p1").headers["etag"]
+    response = client.get("/prediction/p1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert len(calls) == 2
+
+    row["archived_at"] = "2026-01-01T00:00:00"
+    etag = client.get("/prediction/p1").headers["etag"]
+    response = client.get("/prediction/p1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert len(calls) == 3
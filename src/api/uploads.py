@@ -0,0 +1,74 @@
+import hashlib
+import os
+import uuid
+from io import BytesIO
+from pathlib import Path
+from fastapi import HTTPException, UploadFile
+
+# Bytes read from the upload per iteration
+CHUNK_SIZE = 1024 * 1024
+# Number of leading rows used for the first-pass schema sketch
+SAMPLE_ROWS = 10000
+
+
+def save_upload(
+    file: UploadFile,
+    upload_dir: Path,
+) -> dict:
+    """
+    Stream an uploaded csv to disk chunk by chunk. In the same pass compute the
+    sha256 content hash, the row count, the row-offset index used by /csv and a
+    schema sketch from the first SAMPLE_ROWS rows, so the file is not re-read for them.
+    Files are stored content-addressed as <sha256>.csv: an upload whose content is
+    already stored reuses the existing file.
+    """
+    if file.filename == "":
+        raise HTTPException(status_code=400, detail="No file selected")
+    if not file.filename.lower().endswith(".csv"):
+        raise HTTPException(status_code=400, detail="File must be a CSV")
+    # pandas-based, imported on first upload (see api/main.py)
+    import pandas as pd
+    from ..mlcore.io.csv_index import RowIndexBuilder, register_row_index
+    from ..mlcore.profile.profiler import suggest_schema
+
+    filename = file.filename
+    # The hash is only known at the end, so write to a temporary name first
+    tmp_path = upload_dir / f".{uuid.uuid4()}.part"
+
+    sha = hashlib.sha256()
+    builder = RowIndexBuilder(sample_rows=SAMPLE_ROWS)
+    try:
+        with open(tmp_path, "wb") as buffer:
+            while chunk := file.file.read(CHUNK_SIZE):
+                buffer.write(chunk)
+                sha.update(chunk)
+                builder.feed(chunk)
+        builder.finish()
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
+
+    content_hash = sha.hexdigest()
+    file_path = upload_dir / f"{content_hash}.csv"
+    deduplicated = file_path.exists()
+    if deduplicated:
+        tmp_path.unlink(missing_ok=True)
+    else:
+        os.replace(tmp_path, file_path)
+
+    uri = str(file_path)
+    register_row_index(uri, builder.index(uri))
+    try:
+        schema_json = suggest_schema(pd.read_csv(BytesIO(builder.sample)))
+    except Exception:
+        # Not parseable as csv (e.g. empty file): leave the sketch empty, profiling reports the error
+        schema_json = {}
+
+    return {
+        "uri": uri,
+        "filename": filename,
+        "content_hash": content_hash,
+        "row_count": builder.n_rows,
+        "schema_json": schema_json,
+        "deduplicated": deduplicated,
+    }
@@ -10,3 +10,14 @@ celery_app = Celery(
     backend=CELERY_BROKER_URL,
     broker=CELERY_RESULT_BACKEND,
 )
+
+# Seconds between two runs of the prediction retention job (archive.task in worker/tasks.py).
+# Only run one beat process (the "beat" service in docker-compose), not one per worker replica.
+PREDICTION_ARCHIVE_INTERVAL = float(os.getenv("PREDICTION_ARCHIVE_INTERVAL", 3600))
+
+celery_app.conf.beat_schedule = {
+    "archive-predictions": {
+        "task": "archive.task",
+        "schedule": PREDICTION_ARCHIVE_INTERVAL,
+    },
+}
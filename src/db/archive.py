@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Optional
+
+# Cold storage for prediction payloads (inputs_json/outputs_json) moved out of the predictions
+# table. Must be readable by the API and the worker (shared volume, like the uploads).
+PREDICTION_ARCHIVE_DIR = os.getenv("PREDICTION_ARCHIVE_DIR", "/code/worker/testdata/prediction-archive")
+
+
+def write_payload(
+    prediction_id: str,
+    created_at: Optional[datetime],
+    inputs_json: Optional[str],
+    outputs_json: Optional[str],
+    archive_dir: str = PREDICTION_ARCHIVE_DIR,
+) -> str:
+    """
+    Write the JSON column texts of a prediction to <archive_dir>/<YYYY-MM>/<id>.json.gz
+    and return the path. The texts are stored as they are, so reading them back returns
+    exactly what the row held. Written to a temporary name first: a crash never leaves a
+    truncated archive behind a row that already points to it.
+    """
+    month = created_at.strftime("%Y-%m") if created_at else "unknown"
+    directory = os.path.join(archive_dir, month)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{prediction_id}.json.gz")
+    tmp_path = os.path.join(directory, f".{uuid.uuid4()}.tmp")
+    payload = json.dumps({"inputs_json": inputs_json, "outputs_json": outputs_json}).encode()
+    try:
+        with gzip.open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def read_payload(uri: str) -> dict:
+    """
+    {"inputs_json": ..., "outputs_json": ...} (JSON texts) of an archived prediction.
+    """
+    with gzip.open(uri, "rb") as f:
+        return json.loads(f.read())
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Seconds a row is served from the per-process tier. Invalidations reach the other processes
+# over Redis pub/sub; this bounds how stale a process that missed one (no Redis, subscriber
+# reconnecting) can be.
+DB_CACHE_LOCAL_TTL = float(os.getenv("DB_CACHE_LOCAL_TTL", "5"))
+# Max rows per namespace in the per-process tier
+DB_CACHE_LOCAL_SIZE = int(os.getenv("DB_CACHE_LOCAL_SIZE", "1024"))
+# Seconds a row is kept in the shared Redis tier (deleted right away on invalidation)
+DB_CACHE_REDIS_TTL = int(os.getenv("DB_CACHE_REDIS_TTL", "30"))
+# Redis for the shared tier (API and worker processes); empty -> local tier only
+DB_CACHE_REDIS_URL = os.getenv("DB_CACHE_REDIS_URL", os.getenv("REDISSERVER", ""))
+# Seconds the Redis tier is skipped after a Redis error, so a Redis outage costs one timeout
+DB_CACHE_REDIS_RETRY_AFTER = float(os.getenv("DB_CACHE_REDIS_RETRY_AFTER", "30"))
+# Socket timeout for the Redis tier; a lookup must never wait longer than the DB query it saves
+DB_CACHE_REDIS_TIMEOUT = float(os.getenv("DB_CACHE_REDIS_TIMEOUT", "0.2"))
+# "0" turns the cache off (every lookup reads the DB)
+DB_CACHE_ENABLED = os.getenv("DB_CACHE_ENABLED", "1") != "0"
+# Pub/sub channel carrying invalidations to the local tier of every process
+INVALIDATION_CHANNEL = "dbcache:invalidate"
+# Seconds a generation counter is kept; only has to outlive one loader call
+GENERATION_TTL = 24 * 3600
+
+# Stores a row only if the generation of its key is still the one read before the loader
+# ran: an invalidation in between (INCR) means the loaded row may be stale.
+_SET_IF_GENERATION = """
+if (redis.call('GET', KEYS[2]) or '0') == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+def _encode(value: Any) -> Any:
+    # Rows hold datetimes (created_at); tag them so they come back as datetimes, not strings
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    return str(value)
+
+
+def _decode(obj: dict) -> Any:
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    if "__date__" in obj:
+        return date.fromisoformat(obj["__date__"])
+    return obj
+
+
+class _RedisTier:
+    """
+    Shared second tier. Errors open a circuit breaker: Redis is skipped for
+    DB_CACHE_REDIS_RETRY_AFTER seconds and lookups go straight to the DB.
+    Every key has a generation counter, bumped by invalidate(), so a row loaded
+    before an invalidation is never stored after it (see _SET_IF_GENERATION).
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self._client: Optional[redis.Redis] = None
+        self._pid: Optional[int] = None
+        self._down_until = 0.0
+        self._set_if_generation = None
+        self._listener_pid: Optional[int] = None
+        self._listener_lock = threading.Lock()
+        self._callbacks: List[Callable[[Optional[dict]], None]] = []
+
+    def _get_client(self) -> Optional[redis.Redis]:
+        if not self.url or time.monotonic() < self._down_until:
+            return None
+        if self._pid != os.getpid():
+            # New client per process: forked workers must not share the parent's sockets
+            self._client = redis.Redis.from_url(
+                self.url,
+                socket_timeout=DB_CACHE_REDIS_TIMEOUT,
+                socket_connect_timeout=DB_CACHE_REDIS_TIMEOUT,
+            )
+            self._set_if_generation = self._client.register_script(_SET_IF_GENERATION)
+            self._pid = os.getpid()
+        return self._client
+
+    def _failed(self, e: Exception) -> None:
+        self._down_until = time.monotonic() + DB_CACHE_REDIS_RETRY_AFTER
+        logger.warning(f"[DB CACHE] Redis unavailable ({e}), using the DB for {DB_CACHE_REDIS_RETRY_AFTER}s")
+
+    def get(self, key: str, generation_key: str) -> Tuple[Optional[bytes], Optional[bytes]]:
+        """
+        (value, generation) in one round trip; generation is None when Redis is not used.
+        """
+        client = self._get_client()
+        if client is None:
+            return None, None
+        try:
+            value, generation = client.mget(key, generation_key)
+            return value, generation or b"0"
+        except redis.RedisError as e:
+            self._failed(e)
+            return None, None
+
+    def set(self, key: str, generation_key: str, generation: bytes, value: bytes, ttl: int) -> None:
+        """
+        Store value unless the key was invalidated since generation was read.
+        """
+        client = self._get_client()
+        if client is None:
+            return
+        try:
+            self._set_if_generation(keys=[key, generation_key], args=[generation, value, ttl])
+        except redis.RedisError as e:
+            self._failed(e)
+
+    def invalidate(self, keys: List[str], generation_keys: List[str], message: dict) -> None:
+        """
+        Bump the generations, delete the values and tell the other processes (message).
+        """
+        client = self._get_client()
+        if client is None:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for generation_key in generation_keys:
+                pipe.incr(generation_key)
+                pipe.expire(generation_key, GENERATION_TTL)
+            pipe.delete(*keys)
+            pipe.publish(INVALIDATION_CHANNEL, json.dumps(message))
+            pipe.execute()
+        except redis.RedisError as e:
+            self._failed(e)
+
+    def listen(self, callback: Callable[[Optional[dict]], None]) -> None:
+        """
+        Call callback(message) for every invalidation published by any process, and
+        callback(None) after (re)subscribing, since messages may have been missed.
+        One subscriber thread per process, started on first use.
+        """
+        if not self.url:
+            return
+        with self._listener_lock:
+            if callback not in self._callbacks:
+                self._callbacks.append(callback)
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+        threading.Thread(target=self._listen, name="db-cache-invalidation", daemon=True).start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                # No socket timeout: listen() blocks until a message arrives
+                client = redis.Redis.from_url(self.url, socket_connect_timeout=DB_CACHE_REDIS_TIMEOUT)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                self._notify(None)
+                for msg in pubsub.listen():
+                    try:
+                        self._notify(json.loads(msg["data"]))
+                    except ValueError:
+                        logger.warning("[DB CACHE] Dropping malformed invalidation message")
+            except redis.RedisError as e:
+                logger.warning(f"[DB CACHE] Invalidation subscriber lost ({e}), reconnecting")
+                time.sleep(DB_CACHE_REDIS_RETRY_AFTER)
+
+    def _notify(self, message: Optional[dict]) -> None:
+        for callback in list(self._callbacks):
+            callback(message)
+
+
+_redis_tier = _RedisTier(DB_CACHE_REDIS_URL)
+
+
+class ReadThroughCache:
+    """
+    Read-through cache for single-row lookups by id: per-process LRU with a short TTL,
+    then Redis, then the loader (the DB query). Missing rows (None) are not cached,
+    so a newly created row is visible right away. Writers call invalidate(id) after
+    their change is committed.
+
+    Staleness: the Redis tier never keeps a row loaded before an invalidation (generation
+    check). The local tier of another process serves the old row until the invalidation
+    message reaches it (pub/sub, usually milliseconds); a process that misses it (Redis
+    down, subscriber reconnecting) serves it for at most local_ttl seconds.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        local_ttl: float = DB_CACHE_LOCAL_TTL,
+        local_size: int = DB_CACHE_LOCAL_SIZE,
+        redis_ttl: int = DB_CACHE_REDIS_TTL,
+        redis_tier: _RedisTier = _redis_tier,
+    ):
+        self.namespace = namespace
+        self.local_ttl = local_ttl
+        self.local_size = local_size
+        self.redis_ttl = redis_ttl
+        self.redis_tier = redis_tier
+        self._local: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every local invalidation: a row loaded before one is not kept locally
+        self._local_generation = 0
+
+    def _key(self, key: str) -> str:
+        return f"dbcache:{self.namespace}:{key}"
+
+    def _generation_key(self, key: str) -> str:
+        return f"dbcache:gen:{self.namespace}:{key}"
+
+    def _get_local(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.local_ttl:
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return entry[1]
+
+    def _put_local(self, key: str, row: dict, local_generation: int) -> None:
+        with self._lock:
+            if local_generation != self._local_generation:
+                return
+            self._local[key] = (time.monotonic(), row)
+            self._local.move_to_end(key)
+            if len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    def _drop_local(self, keys: List[str]) -> None:
+        with self._lock:
+            self._local_generation += 1
+            for key in keys:
+                self._local.pop(key, None)
+
+    def _on_invalidation(self, message: Optional[dict]) -> None:
+        if message is None:
+            # (Re)subscribed: invalidations may have been missed
+            self.clear_local()
+        elif message.get("namespace") == self.namespace:
+            self._drop_local(message.get("keys", []))
+
+    def get(self, key: str, loader: Callable[[str], Optional[dict]]) -> Optional[dict]:
+        if not DB_CACHE_ENABLED or not key:
+            return loader(key)
+
+        row = self._get_local(key)
+        if row is not None:
+            # Copy: callers may modify the row they got
+            return dict(row)
+
+        self.redis_tier.listen(self._on_invalidation)
+        local_generation = self._local_generation
+        cached, generation = self.redis_tier.get(self._key(key), self._generation_key(key))
+        if cached is not None:
+            row = json.loads(cached, object_hook=_decode)
+        else:
+            row = loader(key)
+            if row is None:
+                return None
+            if generation is not None:
+                value = json.dumps(row, default=_encode).encode()
+                self.redis_tier.set(self._key(key), self._generation_key(key), generation, value, self.redis_ttl)
+
+        self._put_local(key, row, local_generation)
+        return dict(row)
+
+    def invalidate(self, *keys: Optional[str]) -> None:
+        keys = [key for key in keys if key]
+        if not keys:
+            return
+        self._drop_local(keys)
+        self.redis_tier.invalidate(
+            [self._key(key) for key in keys],
+            [self._generation_key(key) for key in keys],
+            {"namespace": self.namespace, "keys": keys},
+        )
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._local_generation += 1
+            self._local.clear()
@@ -2,13 +2,23 @@ from __future__ import annotations
 
 import os
 import json
+import logging
+import re
+import threading
+import time
 import uuid
 import contextlib
-from typing import Any, Optional, Tuple, List, Dict, Literal
+from datetime import datetime
+from typing import Any, Callable, Optional, Tuple, List, Dict, Literal
 
 import pymysql
 from pymysql.cursors import DictCursor
 
+from .archive import PREDICTION_ARCHIVE_DIR, read_payload, write_payload
+from .cache import ReadThroughCache
+
+logger = logging.getLogger(__name__)
+
 # -------------------------------------------------------------------
 # MODEL PATH CONFIG
 # -------------------------------------------------------------------
@@ -55,16 +65,74 @@ def get_conn():
     return pymysql.connect(**DB_CFG)
 
 
+class _ConnectionPool:
+    """
+    Idle connections kept for reuse, so a request does not pay a TCP + auth handshake per query.
+    Per process: a forked (celery prefork) worker starts with an empty pool instead of sharing sockets.
+    """
+
+    def __init__(self, max_idle: int, ping_after: float):
+        self.max_idle = max_idle
+        self.ping_after = ping_after
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._idle: List[Tuple[Any, float]] = []
+
+    def acquire(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid, self._idle = os.getpid(), []
+            conn, released_at = self._idle.pop() if self._idle else (None, 0.0)
+        if conn is None:
+            return get_conn()
+        if time.monotonic() - released_at > self.ping_after:
+            # The server may have dropped a long idle connection (wait_timeout)
+            conn.ping(reconnect=True)
+        return conn
+
+    def release(self, conn) -> None:
+        with self._lock:
+            if self._pid == os.getpid() and conn.open and len(self._idle) < self.max_idle:
+                self._idle.append((conn, time.monotonic()))
+                return
+        if conn.open:
+            conn.close()
+
+
+# Idle connections kept per process; more concurrent requests still open (and then close) extra ones.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+# Seconds a pooled connection may sit idle before it is pinged on reuse
+DB_POOL_PING_AFTER = float(os.getenv("DB_POOL_PING_AFTER", "30"))
+
+_pool = _ConnectionPool(DB_POOL_SIZE, DB_POOL_PING_AFTER)
+
+
 @contextlib.contextmanager
 def cursor():
-    # Keep DB usage safe + consistent: open connection, run query, close connection.
-    # This avoids leaked connections across requests.
-    conn = get_conn()
+    # Keep DB usage safe + consistent: borrow a pooled connection, run queries, give it back.
+    # All CRUD helpers run with autocommit, so a returned connection holds no open transaction.
+    conn = _pool.acquire()
     try:
         with conn.cursor() as cur:
             yield cur
-    finally:
-        conn.close()
+    except BaseException:
+        # Connection state is unknown after an error (broken socket, unread results): don't reuse it.
+        if conn.open:
+            conn.close()
+        raise
+    _pool.release(conn)
+
+
+# -------------------------------------------------------------------
+# LOOKUP CACHE
+# -------------------------------------------------------------------
+
+# Read-through caches for the by-id lookups the predict/train flows repeat
+# (get_ml_problem, get_model, db_get_dataset_version). Every helper that changes or deletes
+# one of these rows invalidates it; see db/cache.py for the tiers and staleness bounds.
+ml_problem_cache = ReadThroughCache("ml_problems")
+model_cache = ReadThroughCache("models")
+dataset_version_cache = ReadThroughCache("dataset_versions")
 
 
 def _build_update_sql(
@@ -91,6 +159,169 @@ def _build_update_sql(
     return sql, params
 
 
+# -------------------------------------------------------------------
+# FULL-TEXT SEARCH (q= of the joined lists)
+# -------------------------------------------------------------------
+
+# Words shorter than innodb_ft_min_token_size (default 3) are not in the FULLTEXT index.
+FULLTEXT_MIN_TOKEN = int(os.getenv("DB_FULLTEXT_MIN_TOKEN", "3"))
+
+
+def _fulltext_query(q: str) -> Optional[str]:
+    # Boolean mode query: every word is required and matched as a prefix ("+iris* +v2*").
+    # None when a word is too short to be indexed -> caller falls back to LIKE.
+    words = re.findall(r"\w+", q)
+    if not words or any(len(w) < FULLTEXT_MIN_TOKEN for w in words):
+        return None
+    return " ".join(f"+{w}*" for w in words)
+
+
+def _search_filter(
+    q: Optional[str],
+    targets: List[Tuple[str, str, Tuple[str, ...]]],
+) -> Optional[Tuple[str, List[Any], Optional[str], List[Any]]]:
+    """
+    WHERE clause for q over (alias, table, columns) targets, each backed by a FULLTEXT
+    index on exactly those columns (schema_mysql.sql). None without q.
+    Returns (where_sql, params, score_sql, score_params); score_sql is the summed
+    relevance to ORDER BY, None when the LIKE fallback was used.
+    """
+    if not q:
+        return None
+    ft = _fulltext_query(q)
+    if ft is None:
+        like = f"%{q}%"
+        cols = [f"{alias}.{col}" for alias, _, columns in targets for col in columns]
+        return "(" + " OR ".join(f"{col} LIKE %s" for col in cols) + ")", [like] * len(cols), None, []
+
+    # The id IN (...) subqueries let every table use its own index; a MATCH over the join would scan.
+    where_sql = "(" + " OR ".join(
+        f"{alias}.id IN (SELECT id FROM {table} WHERE MATCH({', '.join(columns)}) AGAINST (%s IN BOOLEAN MODE))"
+        for alias, table, columns in targets
+    ) + ")"
+    score_sql = " + ".join(
+        f"MATCH({', '.join(f'{alias}.{col}' for col in columns)}) AGAINST (%s IN BOOLEAN MODE)"
+        for alias, _, columns in targets
+    )
+    return where_sql, [ft] * len(targets), score_sql, [ft] * len(targets)
+
+
+# -------------------------------------------------------------------
+# PAGINATION (shared by the list helpers)
+# -------------------------------------------------------------------
+
+def _build_where(
+    scope: Optional[Dict[str, Any]] = None,
+    equals: Optional[Dict[str, Any]] = None,
+    contains: Optional[Dict[str, Any]] = None,
+    any_contains: Optional[Tuple[Optional[str], List[str]]] = None,
+    search: Optional[Tuple[str, List[Any], Optional[str], List[Any]]] = None,
+) -> Tuple[str, List[Any]]:
+    """
+    Parameterized WHERE clause from a filter spec. Optional filters whose value is None/empty are skipped.
+      scope:        column -> value              column = %s, always applied (parent id of a nested list)
+      equals:       column -> value              column = %s
+      contains:     column -> substring          column LIKE %value%
+      any_contains: (q, columns)                 (col1 LIKE %q% OR col2 LIKE %q% ...)
+      search:       result of _search_filter     full-text q of the joined lists
+    """
+    clauses: List[str] = []
+    params: List[Any] = []
+
+    for col, val in (scope or {}).items():
+        clauses.append(f"{col} = %s")
+        params.append(val)
+
+    for col, val in (equals or {}).items():
+        if val:
+            clauses.append(f"{col} = %s")
+            params.append(val)
+
+    for col, val in (contains or {}).items():
+        if val:
+            clauses.append(f"{col} LIKE %s")
+            params.append(f"%{val}%")
+
+    if any_contains and any_contains[0]:
+        q, cols = any_contains
+        clauses.append("(" + " OR ".join(f"{col} LIKE %s" for col in cols) + ")")
+        params.extend([f"%{q}%"] * len(cols))
+
+    if search:
+        clauses.append(search[0])
+        params.extend(search[1])
+
+    where_sql = "WHERE " + " AND ".join(clauses) if clauses else ""
+    return where_sql, params
+
+
+def _order_by(
+    sort: str,
+    dir: Literal["asc", "desc"],
+    allowed: Dict[str, str],
+    default: str,
+    search: Optional[Tuple[str, List[Any], Optional[str], List[Any]]] = None,
+) -> Tuple[str, List[Any]]:
+    # Whitelisted sort column; sort=relevance orders full-text matches by score
+    # (newest first when there is no score, e.g. after the LIKE fallback).
+    if sort == "relevance" and search and search[2]:
+        return f"{search[2]} DESC, {default} DESC", search[3]
+    dir_sql = "ASC" if dir == "asc" else "DESC"
+    return f"{allowed.get(sort, default)} {dir_sql}", []
+
+
+def _paginate(
+    columns: str,
+    from_sql: str,
+    key: str,
+    where_sql: str,
+    params: List[Any],
+    order_sql: str,
+    order_params: List[Any],
+    page: int,
+    size: int,
+) -> Tuple[List[Dict], int]:
+    """
+    Return (items, total) with two queries on one connection. The first one filters,
+    sorts and counts (COUNT(*) OVER(), before LIMIT) carrying only the key column, so
+    large columns (JSON payloads) are never read for rows outside the page. The second
+    one loads the columns of the page's rows by key.
+    Only a page past the end (no rows to carry the total) needs a separate COUNT.
+    """
+    offset = (page - 1) * size
+    sql = f"""
+        SELECT {key} AS _page_key, COUNT(*) OVER() AS _total_rows
+        FROM {from_sql}
+        {where_sql}
+        ORDER BY {order_sql}
+        LIMIT %s OFFSET %s
+    """
+    with cursor() as cur:
+        cur.execute(sql, params + order_params + [size, offset])
+        keys = cur.fetchall()
+        if keys:
+            total = keys[0]["_total_rows"]
+        elif offset:
+            cur.execute(f"SELECT COUNT(*) AS total FROM {from_sql} {where_sql}", params)
+            row = cur.fetchone()
+            total = row["total"] if row else 0
+        else:
+            total = 0
+        if not keys:
+            return [], total
+
+        order = [row["_page_key"] for row in keys]
+        placeholders = ", ".join(["%s"] * len(order))
+        cur.execute(
+            f"SELECT {columns.strip()}, {key} AS _page_key FROM {from_sql} WHERE {key} IN ({placeholders})",
+            order,
+        )
+        by_key = {item.pop("_page_key"): item for item in cur.fetchall()}
+
+    # Rows deleted between the two queries are skipped
+    return [by_key[k] for k in order if k in by_key], total
+
+
 # -------------------------------------------------------------------
 # USERS
 # -------------------------------------------------------------------
@@ -150,48 +381,13 @@ def get_datasets(
     """
     Return (items, total) for datasets with pagination, sorting and optional search.
     """
-    # SORTING (whitelisted)
-    sort_column = ALLOWED_DATASET_SORT_FIELDS.get(sort, "created_at")
-    dir_sql = "ASC" if dir == "asc" else "DESC"
-
-    # WHERE clauses + params are built in a safe parameterized way (%s placeholders).
-    where_clauses = []
-    params = []
-
-    if q:
-        like = f"%{q}%"
-        where_clauses.append("name LIKE %s")
-        params.append(like)
-
-    if id:
-        where_clauses.append("id = %s")
-        params.append(id)
-
-    if name:
-        like = f"%{name}%"
-        where_clauses.append("name LIKE %s")
-        params.append(like)
-
-    where_sql = ""
-    if where_clauses:
-        where_sql = "WHERE " + " AND ".join(where_clauses)
-
-    # Separate COUNT(*) so the API can return total results for pagination UI.
-    count_sql = f"SELECT COUNT(*) AS total FROM datasets {where_sql}"
-    with cursor() as cur:
-        cur.execute(count_sql, params)
-        row = cur.fetchone()
-        total = row["total"] if row else 0
-
-    # LIMIT/OFFSET paging (simple and good enough for project scope).
-    offset = (page - 1) * size
-    datasets_sql = f"SELECT * FROM datasets {where_sql} ORDER BY {sort_column} {dir_sql} LIMIT %s OFFSET %s"
-    with cursor() as cur:
-        # Add LIMIT/OFFSET at the end without mutating the base params list.
-        cur.execute(datasets_sql, params + [size, offset])
-        items = cur.fetchall()
-
-    return items, total
+    where_sql, params = _build_where(
+        equals={"id": id},
+        contains={"name": name},
+        any_contains=(q, ["name"]),
+    )
+    order_sql, order_params = _order_by(sort, dir, ALLOWED_DATASET_SORT_FIELDS, "created_at")
+    return _paginate("datasets.*", "datasets", "datasets.id", where_sql, params, order_sql, order_params, page, size)
 
 
 def update_dataset(dataset_id: str, name: Optional[str] = None, owner_id: Optional[str] = None) -> bool:
@@ -215,13 +411,14 @@ def create_dataset_version(
     schema_json: Optional[dict] = None,
     profile_json: Optional[dict] = None,
     row_count: Optional[int] = None,
+    content_hash: Optional[str] = None,
 ) -> str:
     # A dataset version represents one concrete upload/version of a dataset.
     version_id = str(uuid.uuid4())
     sql = """
         INSERT INTO dataset_versions
-        (id, name, dataset_id, filename, uri, schema_json, profile_json, row_count)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        (id, name, dataset_id, filename, uri, schema_json, profile_json, row_count, content_hash)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
     """
     with cursor() as cur:
         cur.execute(
@@ -235,18 +432,36 @@ def create_dataset_version(
                 _json_dump(schema_json),
                 _json_dump(profile_json),
                 row_count,
+                content_hash,
             ),
         )
     return version_id
 
 
-def db_get_dataset_version(version_id: str) -> Optional[dict]:
+def _load_dataset_version(version_id: str) -> Optional[dict]:
     sql = "SELECT * FROM dataset_versions WHERE id = %s"
     with cursor() as cur:
         cur.execute(sql, (version_id,))
         return cur.fetchone()
 
 
+def db_get_dataset_version(version_id: str) -> Optional[dict]:
+    return dataset_version_cache.get(version_id, _load_dataset_version)
+
+
+def db_get_dataset_version_by_hash(content_hash: str) -> Optional[dict]:
+    # Newest dataset version whose file has this sha256 (content-addressed uploads).
+    sql = """
+        SELECT * FROM dataset_versions
+        WHERE content_hash = %s
+        ORDER BY created_at DESC
+        LIMIT 1
+    """
+    with cursor() as cur:
+        cur.execute(sql, (content_hash,))
+        return cur.fetchone()
+
+
 # Whitelist sort fields to keep ORDER BY safe.
 ALLOWED_DATASET_VERSION_SORT_FIELDS = {
     "name": "name",
@@ -267,44 +482,14 @@ def get_dataset_versions(
     """
     Return (items, total) for dataset_versions for a given dataset_id with pagination, sorting and optional search.
     """
-    sort_column = ALLOWED_DATASET_VERSION_SORT_FIELDS.get(sort, "created_at")
-    dir_sql = "ASC" if dir == "asc" else "DESC"
-
-    where_clauses = []
-    params = []
-
-    if q:
-        like = f"%{q}%"
-        where_clauses.append("name LIKE %s")
-        params.append(like)
-
-    if id:
-        where_clauses.append("id = %s")
-        params.append(id)
-
-    if name:
-        like = f"%{name}%"
-        where_clauses.append("name LIKE %s")
-        params.append(like)
-
-    # Here we append conditions after "dataset_id = %s" (so it starts with AND ...).
-    where_sql = ""
-    if where_clauses:
-        where_sql = " AND " + " AND ".join(where_clauses)
-
-    count_sql = f"SELECT COUNT(*) AS total FROM dataset_versions WHERE dataset_id = %s {where_sql}"
-    with cursor() as cur:
-        cur.execute(count_sql, [dataset_id] + params)
-        row = cur.fetchone()
-        total = row["total"] if row else 0
-
-    offset = (page - 1) * size
-    dataset_versions_sql = f"SELECT * FROM dataset_versions WHERE dataset_id = %s {where_sql} ORDER BY {sort_column} {dir_sql} LIMIT %s OFFSET %s"
-    with cursor() as cur:
-        cur.execute(dataset_versions_sql, [dataset_id] + params + [size, offset])
-        items = cur.fetchall()
-
-    return items, total
+    where_sql, params = _build_where(
+        scope={"dataset_id": dataset_id},
+        equals={"id": id},
+        contains={"name": name},
+        any_contains=(q, ["name"]),
+    )
+    order_sql, order_params = _order_by(sort, dir, ALLOWED_DATASET_VERSION_SORT_FIELDS, "created_at")
+    return _paginate("dataset_versions.*", "dataset_versions", "dataset_versions.id", where_sql, params, order_sql, order_params, page, size)
 
 
 def update_dataset_version(
@@ -333,7 +518,9 @@ def update_dataset_version(
         return False
     with cursor() as cur:
         cur.execute(sql, params)
-        return cur.rowcount > 0
+        updated = cur.rowcount > 0
+    dataset_version_cache.invalidate(version_id)
+    return updated
 
 
 # -------------------------------------------------------------------
@@ -378,13 +565,17 @@ def create_ml_problem(
     return problem_id
 
 
-def get_ml_problem(problem_id: str) -> Optional[dict]:
+def _load_ml_problem(problem_id: str) -> Optional[dict]:
     sql = "SELECT * FROM ml_problems WHERE id = %s"
     with cursor() as cur:
         cur.execute(sql, (problem_id,))
         return cur.fetchone()
 
 
+def get_ml_problem(problem_id: str) -> Optional[dict]:
+    return ml_problem_cache.get(problem_id, _load_ml_problem)
+
+
 ALLOWED_ML_PROBLEM_SORT_FIELDS = {
     "name": "name",
     "task": "task",
@@ -408,53 +599,14 @@ def get_ml_problems(
     """
     Return (items, total) for ml_problems for a given dataset_version_id with pagination, sorting and optional search.
     """
-    sort_column = ALLOWED_ML_PROBLEM_SORT_FIELDS.get(sort, "created_at")
-    dir_sql = "ASC" if dir == "asc" else "DESC"
-
-    where_clauses = []
-    params = []
-
-    if q:
-        like = f"%{q}%"
-        where_clauses.append("(" "name LIKE %s OR task LIKE %s OR target LIKE %s" ")")
-        params.extend([like, like, like])
-
-    if id:
-        where_clauses.append("id = %s")
-        params.append(id)
-
-    if name:
-        like = f"%{name}%"
-        where_clauses.append("name LIKE %s")
-        params.append(like)
-
-    if task:
-        like = f"%{task}%"
-        where_clauses.append("task LIKE %s")
-        params.append(like)
-
-    if target:
-        like = f"%{target}%"
-        where_clauses.append("target LIKE %s")
-        params.append(like)
-
-    where_sql = ""
-    if where_clauses:
-        where_sql = " AND " + " AND ".join(where_clauses)
-
-    count_sql = f"SELECT COUNT(*) AS total FROM ml_problems WHERE dataset_version_id = %s {where_sql}"
-    with cursor() as cur:
-        cur.execute(count_sql, [dataset_version_id] + params)
-        row = cur.fetchone()
-        total = row["total"] if row else 0
-
-    offset = (page - 1) * size
-    ml_problems_sql = f"SELECT * FROM ml_problems WHERE dataset_version_id = %s {where_sql} ORDER BY {sort_column} {dir_sql} LIMIT %s OFFSET %s"
-    with cursor() as cur:
-        cur.execute(ml_problems_sql, [dataset_version_id] + params + [size, offset])
-        items = cur.fetchall()
-
-    return items, total
+    where_sql, params = _build_where(
+        scope={"dataset_version_id": dataset_version_id},
+        equals={"id": id},
+        contains={"name": name, "task": task, "target": target},
+        any_contains=(q, ["name", "task", "target"]),
+    )
+    order_sql, order_params = _order_by(sort, dir, ALLOWED_ML_PROBLEM_SORT_FIELDS, "created_at")
+    return _paginate("ml_problems.*", "ml_problems", "ml_problems.id", where_sql, params, order_sql, order_params, page, size)
 
 
 def update_ml_problem(
@@ -487,7 +639,9 @@ def update_ml_problem(
         return False
     with cursor() as cur:
         cur.execute(sql, params)
-        return cur.rowcount > 0
+        updated = cur.rowcount > 0
+    ml_problem_cache.invalidate(problem_id)
+    return updated
 
 
 # -------------------------------------------------------------------
@@ -511,6 +665,7 @@ def create_model(
     metadata_json: Optional[dict] = None,
     explanation_json: Optional[dict] = None,
     created_by: Optional[str] = None,
+    fingerprint: Optional[str] = None,
 ) -> Tuple[str, str]:
     model_id = str(uuid.uuid4())
 
@@ -521,8 +676,8 @@ def create_model(
     sql = """
         INSERT INTO models
         (id, problem_id, name, algorithm, train_mode, evaluation_strategy, status,
-         metrics_json, uri, metadata_json, explanation_json, created_by)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+         metrics_json, uri, metadata_json, explanation_json, fingerprint, created_by)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
     """
     with cursor() as cur:
         cur.execute(
@@ -539,19 +694,37 @@ def create_model(
                 uri,
                 _json_dump(metadata_json),
                 _json_dump(explanation_json),
+                fingerprint,
                 created_by,
             ),
         )
     return model_id, uri
 
 
-def get_model(model_id: str) -> Optional[dict]:
+def _load_model(model_id: str) -> Optional[dict]:
     sql = "SELECT * FROM models WHERE id = %s"
     with cursor() as cur:
         cur.execute(sql, (model_id,))
         return cur.fetchone()
 
 
+def get_model(model_id: str) -> Optional[dict]:
+    return model_cache.get(model_id, _load_model)
+
+
+def get_model_by_fingerprint(problem_id: str, fingerprint: str) -> Optional[dict]:
+    # Fit cache lookup: newest successfully trained model of this problem with the same fingerprint.
+    sql = """
+        SELECT * FROM models
+        WHERE problem_id = %s AND fingerprint = %s AND status IN ('staging', 'production', 'archived')
+        ORDER BY created_at DESC
+        LIMIT 1
+    """
+    with cursor() as cur:
+        cur.execute(sql, (problem_id, fingerprint))
+        return cur.fetchone()
+
+
 ALLOWED_MODEL_SORT_FIELDS = {
     "name": "name",
     "status": "status",
@@ -576,68 +749,20 @@ def get_models(
     """
     Return (items, total) for models for a given problem_id with pagination, sorting and optional search.
     """
-    sort_column = ALLOWED_MODEL_SORT_FIELDS.get(sort, "created_at")
-    dir_sql = "ASC" if dir == "asc" else "DESC"
-
-    where_clauses = []
-    params = []
-
-    if q:
-        like = f"%{q}%"
-        where_clauses.append(
-            "("
-            "name LIKE %s OR algorithm LIKE %s OR train_mode LIKE %s OR evaluation_strategy LIKE %s OR status LIKE %s"
-            ")"
-        )
-        params.extend([like, like, like, like, like])
-
-    if id:
-        where_clauses.append("id = %s")
-        params.append(id)
-
-    if name:
-        like = f"%{name}%"
-        where_clauses.append("name LIKE %s")
-        params.append(like)
-
-    if algorithm:
-        like = f"%{algorithm}%"
-        where_clauses.append("algorithm LIKE %s")
-        params.append(like)
-
-    if train_mode:
-        like = f"%{train_mode}%"
-        where_clauses.append("train_mode LIKE %s")
-        params.append(like)
-
-    if evaluation_strategy:
-        like = f"%{evaluation_strategy}%"
-        where_clauses.append("evaluation_strategy LIKE %s")
-        params.append(like)
-
-    if status:
-        like = f"%{status}%"
-        where_clauses.append("status LIKE %s")
-        params.append(like)
-
-    where_sql = ""
-    if where_clauses:
-        where_sql = " AND " + " AND ".join(where_clauses)
-
-    # COUNT(*) for pagination totals.
-    count_sql = f"SELECT COUNT(*) AS total FROM models WHERE problem_id = %s {where_sql}"
-    with cursor() as cur:
-        cur.execute(count_sql, [problem_id] + params)
-        row = cur.fetchone()
-        total = row["total"] if row else 0
-
-    offset = (page - 1) * size
-    models_sql = f"SELECT * FROM models WHERE problem_id = %s {where_sql} ORDER BY {sort_column} {dir_sql} LIMIT %s OFFSET %s"
-    with cursor() as cur:
-        cur.execute(models_sql, [problem_id] + params + [size, offset])
-        items = cur.fetchall()
-
-    return items, total
+    where_sql, params = _build_where(
+        scope={"problem_id": problem_id},
+        equals={"id": id},
+        contains={
+            "name": name,
+            "algorithm": algorithm,
+            "train_mode": train_mode,
+            "evaluation_strategy": evaluation_strategy,
+            "status": status,
+        },
+        any_contains=(q, ["name", "algorithm", "train_mode", "evaluation_strategy", "status"]),
+    )
+    order_sql, order_params = _order_by(sort, dir, ALLOWED_MODEL_SORT_FIELDS, "created_at")
+    return _paginate("models.*", "models", "models.id", where_sql, params, order_sql, order_params, page, size)
 
 
 def update_model(
@@ -648,6 +773,7 @@ def update_model(
     uri: Optional[str] = None,
     metadata_json: Optional[str] = None,
     explanation_json: Optional[str] = None,
+    fingerprint: Optional[str] = None,
 ) -> bool:
     sql, params = _build_update_sql(
         "models",
@@ -660,13 +786,46 @@ def update_model(
             "uri": uri,
             "metadata_json": metadata_json,
             "explanation_json": explanation_json,
+            "fingerprint": fingerprint,
         },
     )
     if not sql:
         return False
     with cursor() as cur:
         cur.execute(sql, params)
-        return cur.rowcount > 0
+        updated = cur.rowcount > 0
+    model_cache.invalidate(model_id)
+    return updated
+
+
+MODEL_REGISTER_COLUMNS = (
+    "id", "problem_id", "name", "algorithm", "train_mode", "evaluation_strategy", "status",
+    "metrics_json", "uri", "metadata_json", "explanation_json", "fingerprint", "created_by",
+)
+
+
+def register_model(row: Dict[str, Any], publish: Optional[Callable[[], None]] = None) -> None:
+    """
+    Write the complete row of a trained model (insert, or update the row the API created
+    when the training was requested) in one transaction. JSON fields are passed as JSON text.
+    publish (e.g. moving the model files into place) runs after the row is written and
+    before the commit: if it fails, nothing is committed, and the model becomes visible
+    together with its files.
+    """
+    cols = ", ".join(MODEL_REGISTER_COLUMNS)
+    placeholders = ", ".join(["%s"] * len(MODEL_REGISTER_COLUMNS))
+    updates = ", ".join(
+        f"{col} = new.{col}" if col != "created_by" else "created_by = COALESCE(new.created_by, models.created_by)"
+        for col in MODEL_REGISTER_COLUMNS
+        if col not in ("id", "problem_id")
+    )
+    sql = f"INSERT INTO models ({cols}) VALUES ({placeholders}) AS new ON DUPLICATE KEY UPDATE {updates}"
+    with prod_cursor() as cur:
+        cur.execute(sql, [row.get(col) for col in MODEL_REGISTER_COLUMNS])
+        if publish is not None:
+            publish()
+    # After the commit, so no reader caches the pre-registration row again
+    model_cache.invalidate(row["id"])
 
 
 # -------------------------------------------------------------------
@@ -761,11 +920,18 @@ def create_prediction(
     return prediction_id
 
 
-def get_prediction(prediction_id: str) -> Optional[dict]:
+def get_prediction(prediction_id: str, load_archived: bool = True) -> Optional[dict]:
+    # Archived predictions (see archive_predictions) get their payload back from the archive file.
     sql = "SELECT * FROM predictions WHERE id = %s"
     with cursor() as cur:
         cur.execute(sql, (prediction_id,))
-        return cur.fetchone()
+        row = cur.fetchone()
+    if row and load_archived and row.get("archived_at") and row.get("outputs_uri"):
+        try:
+            row.update(read_payload(row["outputs_uri"]))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to read archived payload of prediction {prediction_id}: {e}")
+    return row
 
 
 ALLOWED_PREDICTION_SORT_FIELDS = {
@@ -787,43 +953,14 @@ def get_predictions(
     """
     Return (items, total) for predictions for a given model_id with pagination, sorting and optional search.
     """
-    sort_column = ALLOWED_PREDICTION_SORT_FIELDS.get(sort, "created_at")
-    dir_sql = "ASC" if dir == "asc" else "DESC"
-
-    where_clauses = []
-    params = []
-
-    if q:
-        like = f"%{q}%"
-        where_clauses.append("name LIKE %s")
-        params.append(like)
-
-    if id:
-        where_clauses.append("id = %s")
-        params.append(id)
-
-    if name:
-        like = f"%{name}%"
-        where_clauses.append("name LIKE %s")
-        params.append(like)
-
-    where_sql = ""
-    if where_clauses:
-        where_sql = " AND " + " AND ".join(where_clauses)
-
-    count_sql = f"SELECT COUNT(*) AS total FROM predictions WHERE model_id = %s {where_sql}"
-    with cursor() as cur:
-        cur.execute(count_sql, [model_id] + params)
-        row = cur.fetchone()
-        total = row["total"] if row else 0
-
-    offset = (page - 1) * size
-    predictions_sql = f"SELECT * FROM predictions WHERE model_id = %s {where_sql} ORDER BY {sort_column} {dir_sql} LIMIT %s OFFSET %s"
-    with cursor() as cur:
-        cur.execute(predictions_sql, [model_id] + params + [size, offset])
-        items = cur.fetchall()
-
-    return items, total
+    where_sql, params = _build_where(
+        scope={"model_id": model_id},
+        equals={"id": id},
+        contains={"name": name},
+        any_contains=(q, ["name"]),
+    )
+    order_sql, order_params = _order_by(sort, dir, ALLOWED_PREDICTION_SORT_FIELDS, "created_at")
+    return _paginate("predictions.*", "predictions", "predictions.id", where_sql, params, order_sql, order_params, page, size)
 
 
 def update_prediction(
@@ -859,13 +996,118 @@ def update_prediction(
         return cur.rowcount > 0
 
 
+PREDICTION_UPDATE_COLUMNS = (
+    "model_id", "name", "input_uri", "inputs_json", "outputs_json", "outputs_uri", "status", "requested_by",
+)
+
+
+def update_predictions(rows: List[Dict[str, Any]]) -> int:
+    """
+    Update many prediction rows in one multi-row UPDATE (joined with the rows as a derived table).
+    Only the non-None fields are updated (same partial-update semantics as update_prediction).
+    JSON fields are passed as JSON text. Ids that are not in the table (e.g. deleted with
+    their model) are skipped, never inserted. Idempotent, so a batch can be retried or replayed.
+    Returns the number of rows changed.
+    """
+    if not rows:
+        return 0
+    columns = ("id",) + PREDICTION_UPDATE_COLUMNS
+    first = "SELECT " + ", ".join(f"%s AS {col}" for col in columns)
+    rest = "SELECT " + ", ".join(["%s"] * len(columns))
+    values_sql = " UNION ALL ".join([first] + [rest] * (len(rows) - 1))
+    updates = ", ".join(f"p.{col} = COALESCE(new.{col}, p.{col})" for col in PREDICTION_UPDATE_COLUMNS)
+    sql = f"UPDATE predictions p JOIN ({values_sql}) AS new ON new.id = p.id SET {updates}"
+    params = [row.get(col) for row in rows for col in columns]
+    with cursor() as cur:
+        cur.execute(sql, params)
+        return cur.rowcount
+
+
+# -------------------------------------------------------------------
+# RETENTION (hot/cold split of prediction payloads)
+# -------------------------------------------------------------------
+
+# Predictions younger than this keep inputs_json/outputs_json in the row
+PREDICTION_HOT_DAYS = int(os.getenv("PREDICTION_HOT_DAYS", "30"))
+# Predictions archived per batch (each row can hold megabytes of JSON)
+PREDICTION_ARCHIVE_BATCH_SIZE = int(os.getenv("PREDICTION_ARCHIVE_BATCH_SIZE", "100"))
+
+
+def archive_predictions(
+    older_than_days: int = PREDICTION_HOT_DAYS,
+    batch_size: int = PREDICTION_ARCHIVE_BATCH_SIZE,
+    max_batches: Optional[int] = None,
+    archive_dir: str = PREDICTION_ARCHIVE_DIR,
+) -> int:
+    """
+    Move the payloads of finished predictions older than older_than_days to gzip files:
+    outputs_uri points to the file, inputs_json/outputs_json are set to NULL and archived_at
+    is set, so the table (and every p.* list query) only carries payloads of the hot window.
+    Only the payload is split off: archived rows stay in lists, counts and the dashboard.
+    Rows with an outputs_uri of their own are left alone. Safe to rerun after a crash:
+    a file is written before its row is updated, and rows are only updated once.
+    MySQL cannot partition predictions (it has foreign keys), hence the split by column.
+    Returns the number of archived predictions.
+    """
+    # idx_predictions_archive (archived_at, created_at) only holds the unarchived rows in front;
+    # each batch resumes after the last (created_at, id) seen, so rows skipped by the other
+    # conditions (still running, own outputs_uri) are not walked again by every batch.
+    select_sql = """
+        SELECT id, created_at, inputs_json, outputs_json
+        FROM predictions
+        WHERE archived_at IS NULL
+          AND created_at < NOW() - INTERVAL %s DAY
+          AND (created_at > %s OR (created_at = %s AND id > %s))
+          AND outputs_uri IS NULL
+          AND status IN ('completed', 'failed')
+        ORDER BY created_at, id
+        LIMIT %s
+    """
+    update_sql = """
+        UPDATE predictions
+        SET inputs_json = NULL, outputs_json = NULL, outputs_uri = %s, archived_at = NOW()
+        WHERE id = %s AND archived_at IS NULL
+    """
+    archived = 0
+    batches = 0
+    last_created_at, last_id = datetime.min, ""
+    while max_batches is None or batches < max_batches:
+        with cursor() as cur:
+            cur.execute(select_sql, (older_than_days, last_created_at, last_created_at, last_id, batch_size))
+            rows = cur.fetchall()
+        if not rows:
+            break
+
+        updates = [
+            (write_payload(row["id"], row["created_at"], row["inputs_json"], row["outputs_json"], archive_dir), row["id"])
+            for row in rows
+        ]
+        with cursor() as cur:
+            cur.executemany(update_sql, updates)
+        archived += len(rows)
+        batches += 1
+        last_created_at, last_id = rows[-1]["created_at"], rows[-1]["id"]
+        if len(rows) < batch_size:
+            break
+    return archived
+
+
 # -------------------------------------------------------------------
 # DASHBOARD STATS
 # -------------------------------------------------------------------
 
-def get_dashboard_stats() -> Optional[dict]:
-    # Simple counts used for a quick dashboard view (no heavy joins).
-    sql = """
+# Days of history in predictions_by_day
+DASHBOARD_HISTORY_DAYS = int(os.getenv("DASHBOARD_HISTORY_DAYS", "30"))
+
+# Last computed dashboard snapshot: (monotonic time it was computed, stats)
+_dashboard_stats_cache: Optional[Tuple[float, dict]] = None
+_dashboard_stats_lock = threading.Lock()
+
+
+def _compute_dashboard_stats() -> dict:
+    # Row counts plus per-status breakdowns, all on one connection.
+    # The GROUP BYs are covered by the status indexes (idx_*_status, idx_predictions_created_at).
+    counts_sql = """
     SELECT
       (SELECT COUNT(*) FROM users)            AS users,
       (SELECT COUNT(*) FROM datasets)         AS datasets,
@@ -876,8 +1118,50 @@ def get_dashboard_stats() -> Optional[dict]:
       (SELECT COUNT(*) FROM predictions)      AS predictions
     """
     with cursor() as cur:
-        cur.execute(sql)
-        return cur.fetchone()
+        cur.execute(counts_sql)
+        stats = dict(cur.fetchone() or {})
+
+        for table in ("models", "jobs", "predictions"):
+            cur.execute(f"SELECT status, COUNT(*) AS n FROM {table} GROUP BY status")
+            stats[f"{table}_by_status"] = {row["status"]: row["n"] for row in cur.fetchall()}
+
+        cur.execute(
+            """
+            SELECT DATE(created_at) AS day, status, COUNT(*) AS n
+            FROM predictions
+            WHERE created_at >= CURDATE() - INTERVAL %s DAY
+            GROUP BY day, status
+            ORDER BY day
+            """,
+            (DASHBOARD_HISTORY_DAYS,),
+        )
+        by_day: Dict[str, Dict[str, int]] = {}
+        for row in cur.fetchall():
+            by_day.setdefault(str(row["day"]), {})[row["status"]] = row["n"]
+        stats["predictions_by_day"] = [{"day": day, **counts} for day, counts in by_day.items()]
+
+    return stats
+
+
+def get_dashboard_stats(max_age: float = 0) -> Optional[dict]:
+    """
+    Counts per table, models/jobs/predictions by status and predictions per day and status.
+    max_age > 0 serves the last snapshot while it is younger than max_age seconds, so a
+    polled dashboard costs one set of scans per interval instead of one per request.
+    """
+    global _dashboard_stats_cache
+    cached = _dashboard_stats_cache
+    if max_age > 0 and cached and time.monotonic() - cached[0] < max_age:
+        return cached[1]
+
+    # Concurrent requests on an expired snapshot wait for one refresh instead of all querying
+    with _dashboard_stats_lock:
+        cached = _dashboard_stats_cache
+        if max_age > 0 and cached and time.monotonic() - cached[0] < max_age:
+            return cached[1]
+        stats = _compute_dashboard_stats()
+        _dashboard_stats_cache = (time.monotonic(), stats)
+    return stats
 
 
 # -------------------------------------------------------------------
@@ -911,11 +1195,16 @@ def delete_model(model_id: str) -> bool:
     """
     # Manual cascade keeps deletes explicit and predictable for the project scope.
     with cursor() as cur:
+        cur.execute("SELECT id FROM ml_problems WHERE current_model_id=%s", (model_id,))
+        problem_ids = [r["id"] for r in (cur.fetchall() or [])]
         cur.execute("DELETE FROM predictions WHERE model_id=%s", (model_id,))
         cur.execute("DELETE FROM jobs WHERE model_id=%s", (model_id,))
         cur.execute("UPDATE ml_problems SET current_model_id=NULL WHERE current_model_id=%s", (model_id,))
         cur.execute("DELETE FROM models WHERE id=%s", (model_id,))
-        return cur.rowcount > 0
+        deleted = cur.rowcount > 0
+    model_cache.invalidate(model_id)
+    ml_problem_cache.invalidate(*problem_ids)
+    return deleted
 
 
 def delete_ml_problem(problem_id: str) -> bool:
@@ -935,7 +1224,9 @@ def delete_ml_problem(problem_id: str) -> bool:
     with cursor() as cur:
         cur.execute("DELETE FROM jobs WHERE problem_id=%s", (problem_id,))
         cur.execute("DELETE FROM ml_problems WHERE id=%s", (problem_id,))
-        return cur.rowcount > 0
+        deleted = cur.rowcount > 0
+    ml_problem_cache.invalidate(problem_id)
+    return deleted
 
 
 def delete_dataset_version(version_id: str) -> bool:
@@ -953,7 +1244,9 @@ def delete_dataset_version(version_id: str) -> bool:
 
     with cursor() as cur:
         cur.execute("DELETE FROM dataset_versions WHERE id=%s", (version_id,))
-        return cur.rowcount > 0
+        deleted = cur.rowcount > 0
+    dataset_version_cache.invalidate(version_id)
+    return deleted
 
 
 def delete_dataset(dataset_id: str) -> bool:
@@ -1062,59 +1355,24 @@ def get_dataset_versions_all_joined(
     Return (items, total) for ALL dataset_versions,
     joined with datasets for names only.
     """
-    sort_column = ALLOWED_DATASET_VERSION_JOIN_SORT_FIELDS.get(sort, "dv.created_at")
-    dir_sql = "ASC" if dir == "asc" else "DESC"
-
-    where_clauses = []
-    params = []
-
-    if q:
-        like = f"%{q}%"
-        where_clauses.append("(d.name LIKE %s OR dv.name LIKE %s)")
-        params.extend([like, like])
-
-    if dataset_name:
-        like = f"%{dataset_name}%"
-        where_clauses.append("d.name LIKE %s")
-        params.append(like)
-
-    if version_name:
-        like = f"%{version_name}%"
-        where_clauses.append("dv.name LIKE %s")
-        params.append(like)
-
-    where_sql = ""
-    if where_clauses:
-        where_sql = "WHERE " + " AND ".join(where_clauses)
-
-    count_sql = f"""
-        SELECT COUNT(*) AS total
-        FROM dataset_versions dv
-        JOIN datasets d ON d.id = dv.dataset_id
-        {where_sql}
-    """
-    with cursor() as cur:
-        cur.execute(count_sql, params)
-        row = cur.fetchone()
-        total = row["total"] if row else 0
-
-    offset = (page - 1) * size
-    items_sql = f"""
-        SELECT
+    search = _search_filter(q, [("d", "datasets", ("name",)), ("dv", "dataset_versions", ("name",))])
+    where_sql, params = _build_where(
+        contains={"d.name": dataset_name, "dv.name": version_name},
+        search=search,
+    )
+    order_sql, order_params = _order_by(sort, dir, ALLOWED_DATASET_VERSION_JOIN_SORT_FIELDS, "dv.created_at", search)
+    return _paginate(
+        """
             dv.*,
             d.id   AS dataset_id,
             d.name AS dataset_name
-        FROM dataset_versions dv
-        JOIN datasets d ON d.id = dv.dataset_id
-        {where_sql}
-        ORDER BY {sort_column} {dir_sql}
-        LIMIT %s OFFSET %s
-    """
-    with cursor() as cur:
-        cur.execute(items_sql, params + [size, offset])
-        items = cur.fetchall()
-
-    return items, total
+        """,
+        """
+            dataset_versions dv
+            JOIN datasets d ON d.id = dv.dataset_id
+        """,
+        "dv.id", where_sql, params, order_sql, order_params, page, size,
+    )
 
 
 ALLOWED_ML_PROBLEM_JOINED_SORT_FIELDS = {
@@ -1145,87 +1403,38 @@ def get_ml_problems_all_joined(
       - dv.name AS dataset_version_name
       - d.name  AS dataset_name
     """
-    sort_column = ALLOWED_ML_PROBLEM_JOINED_SORT_FIELDS.get(sort, "mp.created_at")
-    dir_sql = "ASC" if dir == "asc" else "DESC"
-
-    where_clauses = []
-    params = []
-
-    if q:
-        like = f"%{q}%"
-        where_clauses.append(
-            "("
-            "mp.name LIKE %s OR mp.task LIKE %s OR mp.target LIKE %s OR "
-            "dv.name LIKE %s OR d.name LIKE %s"
-            ")"
-        )
-        params.extend([like, like, like, like, like])
-
-    if id:
-        where_clauses.append("mp.id = %s")
-        params.append(id)
-
-    if problem_name:
-        like = f"%{problem_name}%"
-        where_clauses.append("mp.name LIKE %s")
-        params.append(like)
-
-    if task:
-        like = f"%{task}%"
-        where_clauses.append("mp.task LIKE %s")
-        params.append(like)
-
-    if target:
-        like = f"%{target}%"
-        where_clauses.append("mp.target LIKE %s")
-        params.append(like)
-
-    if dataset_version_name:
-        like = f"%{dataset_version_name}%"
-        where_clauses.append("dv.name LIKE %s")
-        params.append(like)
-
-    if dataset_name:
-        like = f"%{dataset_name}%"
-        where_clauses.append("d.name LIKE %s")
-        params.append(like)
-
-    where_sql = ""
-    if where_clauses:
-        where_sql = "WHERE " + " AND ".join(where_clauses)
-
-    count_sql = f"""
-        SELECT COUNT(*) AS total
-        FROM ml_problems mp
-        JOIN dataset_versions dv ON dv.id = mp.dataset_version_id
-        JOIN datasets d ON d.id = dv.dataset_id
-        {where_sql}
-    """
-    with cursor() as cur:
-        cur.execute(count_sql, params)
-        row = cur.fetchone()
-        total = row["total"] if row else 0
-
-    offset = (page - 1) * size
-    items_sql = f"""
-        SELECT
+    search = _search_filter(q, [
+        ("mp", "ml_problems", ("name", "task", "target")),
+        ("dv", "dataset_versions", ("name",)),
+        ("d", "datasets", ("name",)),
+    ])
+    where_sql, params = _build_where(
+        equals={"mp.id": id},
+        contains={
+            "mp.name": problem_name,
+            "mp.task": task,
+            "mp.target": target,
+            "dv.name": dataset_version_name,
+            "d.name": dataset_name,
+        },
+        search=search,
+    )
+    order_sql, order_params = _order_by(sort, dir, ALLOWED_ML_PROBLEM_JOINED_SORT_FIELDS, "mp.created_at", search)
+    return _paginate(
+        """
             mp.*,
             dv.id   AS dataset_version_id,
             dv.name AS dataset_version_name,
             d.id    AS dataset_id,
             d.name  AS dataset_name
-        FROM ml_problems mp
-        JOIN dataset_versions dv ON dv.id = mp.dataset_version_id
-        JOIN datasets d ON d.id = dv.dataset_id
-        {where_sql}
-        ORDER BY {sort_column} {dir_sql}
-        LIMIT %s OFFSET %s
-    """
-    with cursor() as cur:
-        cur.execute(items_sql, params + [size, offset])
-        items = cur.fetchall()
-
-    return items, total
+        """,
+        """
+            ml_problems mp
+            JOIN dataset_versions dv ON dv.id = mp.dataset_version_id
+            JOIN datasets d ON d.id = dv.dataset_id
+        """,
+        "mp.id", where_sql, params, order_sql, order_params, page, size,
+    )
 
 
 ALLOWED_MODEL_JOINED_SORT_FIELDS = {
@@ -1263,87 +1472,29 @@ def get_models_all_joined(
       - dv.name AS dataset_version_name
       - d.name  AS dataset_name
     """
-    sort_column = ALLOWED_MODEL_JOINED_SORT_FIELDS.get(sort, "m.created_at")
-    dir_sql = "ASC" if dir == "asc" else "DESC"
-
-    where_clauses = []
-    params = []
-
-    if q:
-        like = f"%{q}%"
-        where_clauses.append(
-            "("
-            "m.name LIKE %s OR m.algorithm LIKE %s OR m.train_mode LIKE %s OR "
-            "m.evaluation_strategy LIKE %s OR "
-            "mp.name LIKE %s OR dv.name LIKE %s OR d.name LIKE %s"
-            ")"
-        )
-        params.extend([like, like, like, like, like, like, like])
-
-    if id:
-        where_clauses.append("m.id = %s")
-        params.append(id)
-
-    if name:
-        like = f"%{name}%"
-        where_clauses.append("m.name LIKE %s")
-        params.append(like)
-
-    if algorithm:
-        like = f"%{algorithm}%"
-        where_clauses.append("m.algorithm LIKE %s")
-        params.append(like)
-
-    if train_mode:
-        like = f"%{train_mode}%"
-        where_clauses.append("m.train_mode LIKE %s")
-        params.append(like)
-
-    if evaluation_strategy:
-        like = f"%{evaluation_strategy}%"
-        where_clauses.append("m.evaluation_strategy LIKE %s")
-        params.append(like)
-
-    if status:
-        like = f"%{status}%"
-        where_clauses.append("m.status LIKE %s")
-        params.append(like)
-
-    if problem_name:
-        like = f"%{problem_name}%"
-        where_clauses.append("mp.name LIKE %s")
-        params.append(like)
-
-    if dataset_version_name:
-        like = f"%{dataset_version_name}%"
-        where_clauses.append("dv.name LIKE %s")
-        params.append(like)
-
-    if dataset_name:
-        like = f"%{dataset_name}%"
-        where_clauses.append("d.name LIKE %s")
-        params.append(like)
-
-    where_sql = ""
-    if where_clauses:
-        where_sql = "WHERE " + " AND ".join(where_clauses)
-
-    count_sql = f"""
-        SELECT COUNT(*) AS total
-        FROM models m
-        JOIN ml_problems mp ON mp.id = m.problem_id
-        JOIN dataset_versions dv ON dv.id = mp.dataset_version_id
-        JOIN datasets d ON d.id = dv.dataset_id
-        {where_sql}
-    """
-    with cursor() as cur:
-        cur.execute(count_sql, params)
-        row = cur.fetchone()
-        total = row["total"] if row else 0
-
-    offset = (page - 1) * size
-    items_sql = f"""
-        SELECT
+    search = _search_filter(q, [
+        ("m", "models", ("name", "algorithm", "train_mode", "evaluation_strategy")),
+        ("mp", "ml_problems", ("name",)),
+        ("dv", "dataset_versions", ("name",)),
+        ("d", "datasets", ("name",)),
+    ])
+    where_sql, params = _build_where(
+        equals={"m.id": id},
+        contains={
+            "m.name": name,
+            "m.algorithm": algorithm,
+            "m.train_mode": train_mode,
+            "m.evaluation_strategy": evaluation_strategy,
+            "m.status": status,
+            "mp.name": problem_name,
+            "dv.name": dataset_version_name,
+            "d.name": dataset_name,
+        },
+        search=search,
+    )
+    order_sql, order_params = _order_by(sort, dir, ALLOWED_MODEL_JOINED_SORT_FIELDS, "m.created_at", search)
+    return _paginate(
+        """
             m.*,
             mp.id   AS problem_id,
             mp.name AS problem_name,
@@ -1351,19 +1502,15 @@ def get_models_all_joined(
             dv.name AS dataset_version_name,
             d.id    AS dataset_id,
             d.name  AS dataset_name
-        FROM models m
-        JOIN ml_problems mp ON mp.id = m.problem_id
-        JOIN dataset_versions dv ON dv.id = mp.dataset_version_id
-        JOIN datasets d ON d.id = dv.dataset_id
-        {where_sql}
-        ORDER BY {sort_column} {dir_sql}
-        LIMIT %s OFFSET %s
-    """
-    with cursor() as cur:
-        cur.execute(items_sql, params + [size, offset])
-        items = cur.fetchall()
-
-    return items, total
+        """,
+        """
+            models m
+            JOIN ml_problems mp ON mp.id = m.problem_id
+            JOIN dataset_versions dv ON dv.id = mp.dataset_version_id
+            JOIN datasets d ON d.id = dv.dataset_id
+        """,
+        "m.id", where_sql, params, order_sql, order_params, page, size,
+    )
 
 
 ALLOWED_PREDICTION_JOINED_SORT_FIELDS = {
@@ -1398,77 +1545,28 @@ def get_predictions_all_joined(
       - dv.name AS dataset_version_name
       - d.name  AS dataset_name
     """
-    sort_column = ALLOWED_PREDICTION_JOINED_SORT_FIELDS.get(sort, "p.created_at")
-    dir_sql = "ASC" if dir == "asc" else "DESC"
-
-    where_clauses = []
-    params = []
-
-    if q:
-        like = f"%{q}%"
-        where_clauses.append(
-            "("
-            "p.name LIKE %s OR "
-            "m.name LIKE %s OR mp.name LIKE %s OR dv.name LIKE %s OR d.name LIKE %s"
-            ")"
-        )
-        params.extend([like, like, like, like, like])
-
-    if id:
-        where_clauses.append("p.id = %s")
-        params.append(id)
-
-    if name:
-        like = f"%{name}%"
-        where_clauses.append("p.name LIKE %s")
-        params.append(like)
-
-    if status:
-        like = f"%{status}%"
-        where_clauses.append("p.status LIKE %s")
-        params.append(like)
-
-    if model_name:
-        like = f"%{model_name}%"
-        where_clauses.append("m.name LIKE %s")
-        params.append(like)
-
-    if problem_name:
-        like = f"%{problem_name}%"
-        where_clauses.append("mp.name LIKE %s")
-        params.append(like)
-
-    if dataset_version_name:
-        like = f"%{dataset_version_name}%"
-        where_clauses.append("dv.name LIKE %s")
-        params.append(like)
-
-    if dataset_name:
-        like = f"%{dataset_name}%"
-        where_clauses.append("d.name LIKE %s")
-        params.append(like)
-
-    where_sql = ""
-    if where_clauses:
-        where_sql = "WHERE " + " AND ".join(where_clauses)
-
-    count_sql = f"""
-        SELECT COUNT(*) AS total
-        FROM predictions p
-        JOIN models m ON m.id = p.model_id
-        JOIN ml_problems mp ON mp.id = m.problem_id
-        JOIN dataset_versions dv ON dv.id = mp.dataset_version_id
-        JOIN datasets d ON d.id = dv.dataset_id
-        {where_sql}
-    """
-    with cursor() as cur:
-        cur.execute(count_sql, params)
-        row = cur.fetchone()
-        total = row["total"] if row else 0
-
-    offset = (page - 1) * size
-    items_sql = f"""
-        SELECT
+    search = _search_filter(q, [
+        ("p", "predictions", ("name",)),
+        ("m", "models", ("name",)),
+        ("mp", "ml_problems", ("name",)),
+        ("dv", "dataset_versions", ("name",)),
+        ("d", "datasets", ("name",)),
+    ])
+    where_sql, params = _build_where(
+        equals={"p.id": id},
+        contains={
+            "p.name": name,
+            "p.status": status,
+            "m.name": model_name,
+            "mp.name": problem_name,
+            "dv.name": dataset_version_name,
+            "d.name": dataset_name,
+        },
+        search=search,
+    )
+    order_sql, order_params = _order_by(sort, dir, ALLOWED_PREDICTION_JOINED_SORT_FIELDS, "p.created_at", search)
+    return _paginate(
+        """
             p.*,
             m.id    AS model_id,
             m.name  AS model_name,
@@ -1478,20 +1576,16 @@ def get_predictions_all_joined(
             dv.name AS dataset_version_name,
             d.id    AS dataset_id,
             d.name  AS dataset_name
-        FROM predictions p
-        JOIN models m ON m.id = p.model_id
-        JOIN ml_problems mp ON mp.id = m.problem_id
-        JOIN dataset_versions dv ON dv.id = mp.dataset_version_id
-        JOIN datasets d ON d.id = dv.dataset_id
-        {where_sql}
-        ORDER BY {sort_column} {dir_sql}
-        LIMIT %s OFFSET %s
-    """
-    with cursor() as cur:
-        cur.execute(items_sql, params + [size, offset])
-        items = cur.fetchall()
-
-    return items, total
+        """,
+        """
+            predictions p
+            JOIN models m ON m.id = p.model_id
+            JOIN ml_problems mp ON mp.id = m.problem_id
+            JOIN dataset_versions dv ON dv.id = mp.dataset_version_id
+            JOIN datasets d ON d.id = dv.dataset_id
+        """,
+        "p.id", where_sql, params, order_sql, order_params, page, size,
+    )
 
 
 ALLOWED_ML_PREDICTION_JOINED_SORT_FIELDS = {
@@ -1518,59 +1612,24 @@ def get_ml_predictions_all_joined(
     joined for names only:
       - m.name AS model_name
     """
-    sort_column = ALLOWED_ML_PREDICTION_JOINED_SORT_FIELDS.get(sort, "p.created_at")
-    dir_sql = "ASC" if dir == "asc" else "DESC"
-
-    where_clauses = ["m.problem_id = %s"]
-    params = [problem_id]
-
-    if q:
-        like = f"%{q}%"
-        where_clauses.append("(" "p.name LIKE %s OR " "m.name LIKE %s" ")")
-        params.extend([like, like])
-
-    if name:
-        where_clauses.append("p.name LIKE %s")
-        params.append(f"%{name}%")
-
-    if status:
-        where_clauses.append("p.status LIKE %s")
-        params.append(f"%{status}%")
-
-    if model_name:
-        where_clauses.append("m.name LIKE %s")
-        params.append(f"%{model_name}%")
-
-    where_sql = "WHERE " + " AND ".join(where_clauses)
-
-    count_sql = f"""
-        SELECT COUNT(*) AS total
-        FROM predictions p
-        JOIN models m ON m.id = p.model_id
-        {where_sql}
-    """
-    with cursor() as cur:
-        cur.execute(count_sql, params)
-        row = cur.fetchone()
-        total = row["total"] if row else 0
-
-    offset = (page - 1) * size
-    items_sql = f"""
-        SELECT
+    where_sql, params = _build_where(
+        scope={"m.problem_id": problem_id},
+        contains={"p.name": name, "p.status": status, "m.name": model_name},
+        any_contains=(q, ["p.name", "m.name"]),
+    )
+    order_sql, order_params = _order_by(sort, dir, ALLOWED_ML_PREDICTION_JOINED_SORT_FIELDS, "p.created_at")
+    return _paginate(
+        """
             p.*,
             m.id   AS model_id,
             m.name AS model_name
-        FROM predictions p
-        JOIN models m ON m.id = p.model_id
-        {where_sql}
-        ORDER BY {sort_column} {dir_sql}
-        LIMIT %s OFFSET %s
-    """
-    with cursor() as cur:
-        cur.execute(items_sql, params + [size, offset])
-        items = cur.fetchall()
-
-    return items, total
+        """,
+        """
+            predictions p
+            JOIN models m ON m.id = p.model_id
+        """,
+        "p.id", where_sql, params, order_sql, order_params, page, size,
+    )
 
 
 # -------------------------------------------------------------------
@@ -1618,4 +1677,7 @@ def set_model_to_production(problem_id: str, model_id: str) -> bool:
 
         cur.execute(sql_update_ml_problems, (model_id, problem_id))
 
-        return True
+    # After the commit, so no reader caches the pre-switch rows again
+    ml_problem_cache.invalidate(problem_id)
+    model_cache.invalidate(model_id, prev_model_id)
+    return True
@@ -22,6 +22,69 @@ def run_sql_file(cur, path):
         cur.execute(stmt)
 
 
+# Columns added after the first release. CREATE TABLE IF NOT EXISTS leaves existing
+# tables untouched, so missing columns are added here: (table, column, ALTER statement).
+SCHEMA_UPGRADES = [
+    ("models", "fingerprint",
+     "ALTER TABLE models ADD COLUMN fingerprint CHAR(64) AFTER explanation_json, "
+     "ADD INDEX idx_models_fingerprint (problem_id, fingerprint)"),
+    ("dataset_versions", "content_hash",
+     "ALTER TABLE dataset_versions ADD COLUMN content_hash CHAR(64) AFTER row_count, "
+     "ADD INDEX idx_dataset_versions_content_hash (content_hash)"),
+    ("predictions", "archived_at",
+     "ALTER TABLE predictions ADD COLUMN archived_at TIMESTAMP NULL AFTER requested_by"),
+]
+
+# Indexes added after the first release: (table, index name, ALTER statement).
+# The FULLTEXT indexes back the q= search of the joined lists (db._search_filter).
+INDEX_UPGRADES = [
+    ("datasets", "ft_datasets_name",
+     "ALTER TABLE datasets ADD FULLTEXT INDEX ft_datasets_name (name)"),
+    ("dataset_versions", "ft_dataset_versions_name",
+     "ALTER TABLE dataset_versions ADD FULLTEXT INDEX ft_dataset_versions_name (name)"),
+    ("ml_problems", "ft_ml_problems_name",
+     "ALTER TABLE ml_problems ADD FULLTEXT INDEX ft_ml_problems_name (name)"),
+    ("ml_problems", "ft_ml_problems_search",
+     "ALTER TABLE ml_problems ADD FULLTEXT INDEX ft_ml_problems_search (name, task, target)"),
+    ("models", "ft_models_name",
+     "ALTER TABLE models ADD FULLTEXT INDEX ft_models_name (name)"),
+    ("models", "ft_models_search",
+     "ALTER TABLE models ADD FULLTEXT INDEX ft_models_search (name, algorithm, train_mode, evaluation_strategy)"),
+    ("predictions", "ft_predictions_name",
+     "ALTER TABLE predictions ADD FULLTEXT INDEX ft_predictions_name (name)"),
+    ("models", "idx_models_status",
+     "ALTER TABLE models ADD INDEX idx_models_status (status)"),
+    ("jobs", "idx_jobs_status",
+     "ALTER TABLE jobs ADD INDEX idx_jobs_status (status)"),
+    ("predictions", "idx_predictions_created_at",
+     "ALTER TABLE predictions ADD INDEX idx_predictions_created_at (created_at, status)"),
+    ("predictions", "idx_predictions_archive",
+     "ALTER TABLE predictions ADD INDEX idx_predictions_archive (archived_at, created_at)"),
+]
+
+
+def apply_schema_upgrades(cur):
+    for table, column, stmt in SCHEMA_UPGRADES:
+        cur.execute(
+            "SELECT COUNT(*) AS n FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+            (table, column),
+        )
+        if cur.fetchone()["n"] == 0:
+            print(f"Upgrading schema: {table}.{column}")
+            cur.execute(stmt)
+
+    for table, index, stmt in INDEX_UPGRADES:
+        cur.execute(
+            "SELECT COUNT(*) AS n FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s",
+            (table, index),
+        )
+        if cur.fetchone()["n"] == 0:
+            print(f"Upgrading schema: index {table}.{index}")
+            cur.execute(stmt)
+
+
 def main(apply_seed: bool = True):
     print(
         f"Connecting to MySQL {DB_HOST}:{DB_PORT} db={DB_NAME} as {DB_USER} ...")
@@ -33,6 +96,7 @@ def main(apply_seed: bool = True):
         with conn.cursor() as cur:
             print(f"Applying schema: {SCHEMA_PATH}")
             run_sql_file(cur, SCHEMA_PATH)
+            apply_schema_upgrades(cur)
             if apply_seed and os.path.exists(SEED_PATH):
                 print(f"Applying seed:   {SEED_PATH}")
                 run_sql_file(cur, SEED_PATH)
@@ -57,15 +57,15 @@ def _first_entry(d: Dict[str, Any]) -> Dict[str, Any]:
     return next(iter(d.values()))
 
 
-def _ensure_test_db_exists() -> None:
+def _ensure_test_db_exists(database: str = TEST_DB) -> None:
     # connect without specifying database
     with _conn() as c:
         with c.cursor() as cur:
-            cur.execute(f"CREATE DATABASE IF NOT EXISTS {TEST_DB};")
+            cur.execute(f"CREATE DATABASE IF NOT EXISTS {database};")
 
 
-def _reset_tables() -> None:
-    with _conn(TEST_DB) as c:
+def _reset_tables(database: str = TEST_DB) -> None:
+    with _conn(database) as c:
         with c.cursor() as cur:
             cur.execute("SET FOREIGN_KEY_CHECKS=0;")
             for t in ["predictions", "jobs", "models", "ml_problems", "dataset_versions", "datasets", "users"]:
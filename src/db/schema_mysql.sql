@@ -18,6 +18,7 @@ CREATE TABLE IF NOT EXISTS datasets (
   name VARCHAR(255) NOT NULL,
   owner_id CHAR(36),                        -- FK to users.id
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  FULLTEXT INDEX ft_datasets_name (name),   -- q= search of the joined lists
   FOREIGN KEY (owner_id) REFERENCES users(id)
 );
 
@@ -30,7 +31,10 @@ CREATE TABLE IF NOT EXISTS dataset_versions (
   schema_json JSON,                         -- inferred schema at upload
   profile_json JSON,                        -- data profile / stats
   row_count INT,
+  content_hash CHAR(64),                    -- sha256 of the file content
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  INDEX idx_dataset_versions_content_hash (content_hash),
+  FULLTEXT INDEX ft_dataset_versions_name (name),
   FOREIGN KEY (dataset_id) REFERENCES datasets(id)
 );
 
@@ -50,6 +54,8 @@ CREATE TABLE IF NOT EXISTS ml_problems (
   semantic_types JSON,                      -- semantic info per column
   current_model_id CHAR(36),                -- id of current production model (no URI duplication)
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  FULLTEXT INDEX ft_ml_problems_name (name),
+  FULLTEXT INDEX ft_ml_problems_search (name, task, target),
   FOREIGN KEY (dataset_version_id) REFERENCES dataset_versions(id)
   -- FOREIGN KEY (current_model_id) REFERENCES models(id) -- this can't work at the moment, because at the time of ml_problems table creation, models table is not yet created
                                                           -- and it errors trying to reference a non existent table
@@ -71,8 +77,13 @@ CREATE TABLE IF NOT EXISTS models (
   uri TEXT,                                 -- where the model file is stored (joblib, etc.)
   metadata_json JSON,                       -- optional extra metadata file
   explanation_json JSON,                    -- optional explanation/shap file
+  fingerprint CHAR(64),                     -- sha256 of everything that influences the fit (fit cache key)
   created_by CHAR(36),                      -- FK to users.id (who trained it)
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  INDEX idx_models_fingerprint (problem_id, fingerprint),
+  INDEX idx_models_status (status),         -- dashboard breakdown
+  FULLTEXT INDEX ft_models_name (name),
+  FULLTEXT INDEX ft_models_search (name, algorithm, train_mode, evaluation_strategy),
   FOREIGN KEY (problem_id) REFERENCES ml_problems(id),
   FOREIGN KEY (created_by) REFERENCES users(id)
 );
@@ -92,6 +103,7 @@ CREATE TABLE IF NOT EXISTS jobs (
   started_at TIMESTAMP NULL,
   finished_at TIMESTAMP NULL,
   error TEXT,
+  INDEX idx_jobs_status (status),           -- dashboard breakdown
   FOREIGN KEY (problem_id) REFERENCES ml_problems(id),
   FOREIGN KEY (model_id) REFERENCES models(id),
   FOREIGN KEY (requested_by) REFERENCES users(id)
@@ -111,7 +123,11 @@ CREATE TABLE IF NOT EXISTS predictions (
   outputs_uri TEXT,                         -- file with outputs (CSV/Parquet)
   status VARCHAR(32) NOT NULL,              -- 'predicting' | 'completed' | 'failed'
   requested_by CHAR(36),                    -- FK: who asked for the prediction
+  archived_at TIMESTAMP NULL,               -- payload moved to the gzip file in outputs_uri
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  INDEX idx_predictions_created_at (created_at, status),  -- dashboard history
+  INDEX idx_predictions_archive (archived_at, created_at),  -- archive_predictions: unarchived rows by age
+  FULLTEXT INDEX ft_predictions_name (name),
   FOREIGN KEY (model_id) REFERENCES models(id),
   FOREIGN KEY (requested_by) REFERENCES users(id)
 );
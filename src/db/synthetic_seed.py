@@ -0,0 +1,276 @@
+# src/db/synthetic_seed.py
+"""
+Synthetic-scale data for the DB: bulk-loads realistic rows with consistent foreign keys
+into every table, so list/search/dashboard queries can be measured at production size.
+
+Run from the repository root (creates the schema in the target DB if needed):
+    python -m src.db.synthetic_seed --scale 1 --reset
+    python -m src.db.synthetic_seed --scale 100 --reset   # 100k models, 10M predictions
+
+benchmarks/list_endpoints.py then times every list endpoint against the seeded DB.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from .init_test_db import TEST_DB, _conn, _ensure_test_db_exists, _reset_tables
+
+# Rows per table at --scale 1; every count is multiplied by the scale factor
+BASE_ROWS = {
+    "users": 20,
+    "datasets": 50,
+    "dataset_versions": 150,
+    "ml_problems": 300,
+    "models": 1_000,
+    "predictions": 100_000,
+}
+# Rows per INSERT statement (pymysql folds executemany into one multi-row INSERT)
+SEED_BATCH_SIZE = int(os.getenv("SEED_BATCH_SIZE", "1000"))
+# created_at values are spread over this many days back (dashboard history, archive window)
+SEED_HISTORY_DAYS = int(os.getenv("SEED_HISTORY_DAYS", "90"))
+
+DATASET_WORDS = [
+    "customer", "churn", "sales", "forecast", "energy", "load", "housing", "prices", "credit",
+    "default", "traffic", "sensor", "retail", "weather", "insurance", "claims", "fraud", "iris",
+]
+FEATURES = [
+    "age", "income", "tenure", "region", "plan", "balance", "visits", "temperature",
+    "humidity", "weekday", "month", "price", "quantity", "discount", "score", "segment",
+]
+ALGORITHMS = {
+    "classification": ["random_forest", "xgboost", "logistic_regression", "knn"],
+    "regression": ["random_forest", "xgboost", "linear_regression", "ridge"],
+    "timeseries": ["xgboost", "random_forest"],
+}
+EVALUATION_STRATEGIES = ["train_test_split", "cv_5fold", "time_series_split"]
+# (value, weight) pairs for the status columns
+MODEL_STATUSES = [("staging", 0.7), ("archived", 0.3)]
+JOB_STATUSES = [("completed", 0.9), ("failed", 0.07), ("running", 0.03)]
+PREDICTION_STATUSES = [("completed", 0.92), ("failed", 0.05), ("predicting", 0.03)]
+
+
+def _uuid(rng: random.Random) -> str:
+    # Deterministic ids: the same --seed produces the same DB
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _pick(rng: random.Random, weighted: Sequence[Tuple[str, float]]) -> str:
+    return rng.choices([v for v, _ in weighted], weights=[w for _, w in weighted])[0]
+
+
+def _after(rng: random.Random, start: datetime, now: datetime) -> datetime:
+    # Children are created after their parent
+    return start + (now - start) * rng.random()
+
+
+def _insert(cur, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]], batch_size: int) -> int:
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    started = time.perf_counter()
+    total = 0
+    batch: List[Sequence[Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            cur.executemany(sql, batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        cur.executemany(sql, batch)
+        total += len(batch)
+    seconds = time.perf_counter() - started
+    print(f"{table:<18} {total:>10} rows {seconds:8.1f}s {total / max(seconds, 1e-9):10.0f} rows/s")
+    return total
+
+
+def seed_synthetic(
+    database: str = TEST_DB,
+    scale: float = 1.0,
+    seed: int = 42,
+    reset: bool = False,
+    batch_size: int = SEED_BATCH_SIZE,
+) -> Dict[str, int]:
+    """
+    Bulk-load BASE_ROWS * scale rows into an existing schema and return the row count per table.
+    Parents are generated before children and only their ids/created_at are kept in memory,
+    so predictions (the bulk of the rows) are streamed.
+    """
+    if reset:
+        _reset_tables(database)
+
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    start = now - timedelta(days=SEED_HISTORY_DAYS)
+    counts = {table: max(1, int(n * scale)) for table, n in BASE_ROWS.items()}
+    inserted: Dict[str, int] = {}
+
+    with _conn(database) as c:
+        with c.cursor() as cur:
+            users = [_uuid(rng) for _ in range(counts["users"])]
+            inserted["users"] = _insert(
+                cur, "users", ("id", "username", "email", "created_at"),
+                ((u, f"user_{i}", f"user_{i}@example.com", start) for i, u in enumerate(users)),
+                batch_size,
+            )
+
+            datasets: List[Tuple[str, datetime]] = []
+            dataset_rows = []
+            for i in range(counts["datasets"]):
+                dataset_id, created_at = _uuid(rng), _after(rng, start, now)
+                datasets.append((dataset_id, created_at))
+                name = f"{' '.join(rng.sample(DATASET_WORDS, 2))} {i}"
+                dataset_rows.append((dataset_id, name, rng.choice(users), created_at))
+            inserted["datasets"] = _insert(cur, "datasets", ("id", "name", "owner_id", "created_at"), dataset_rows, batch_size)
+
+            versions: List[Tuple[str, datetime, str, List[str]]] = []
+            version_rows = []
+            for i in range(counts["dataset_versions"]):
+                # The first pass gives every dataset a version
+                dataset_id, dataset_created = datasets[i] if i < len(datasets) else rng.choice(datasets)
+                version_id, created_at = _uuid(rng), _after(rng, dataset_created, now)
+                features = rng.sample(FEATURES, rng.randint(4, len(FEATURES)))
+                uri = f"/code/worker/testdata/uploads/data_{i}.csv"
+                versions.append((version_id, created_at, uri, features))
+                n_rows = rng.randint(100, 1_000_000)
+                schema = {col: rng.choice(["numeric", "categorical", "boolean"]) for col in features}
+                profile = {
+                    "summary": {"n_rows": n_rows, "n_cols": len(features), "missing_pct": round(rng.random() * 0.2, 4)},
+                    "columns": {col: {"semantic_type": st, "missing_pct": round(rng.random() * 0.1, 4)} for col, st in schema.items()},
+                }
+                version_rows.append((
+                    version_id, f"v{i}", dataset_id, f"data_{i}.csv", uri,
+                    json.dumps(schema), json.dumps(profile), n_rows, uuid.UUID(int=rng.getrandbits(128)).hex * 2, created_at,
+                ))
+            inserted["dataset_versions"] = _insert(
+                cur, "dataset_versions",
+                ("id", "name", "dataset_id", "filename", "uri", "schema_json", "profile_json", "row_count", "content_hash", "created_at"),
+                version_rows, batch_size,
+            )
+
+            problems: List[Tuple[str, datetime, str, List[str]]] = []
+            problem_rows = []
+            for i in range(counts["ml_problems"]):
+                version_id, version_created, uri, features = versions[i] if i < len(versions) else rng.choice(versions)
+                problem_id, created_at = _uuid(rng), _after(rng, version_created, now)
+                task = rng.choice(list(ALGORITHMS))
+                target, inputs = features[0], features[1:]
+                problems.append((problem_id, created_at, task, inputs))
+                problem_rows.append((
+                    problem_id, version_id, f"{target} {task} {i}", uri,
+                    task, target, json.dumps({"include": inputs, "exclude": []}), json.dumps({"columns": features}),
+                    json.dumps({"numeric": inputs, "categorical": [], "boolean": []}), created_at,
+                ))
+            inserted["ml_problems"] = _insert(
+                cur, "ml_problems",
+                ("id", "dataset_version_id", "name", "dataset_version_uri", "task", "target",
+                 "feature_strategy_json", "schema_snapshot", "semantic_types", "created_at"),
+                problem_rows, batch_size,
+            )
+
+            models: List[Tuple[str, datetime, str, int]] = []
+            model_rows = []
+            for i in range(counts["models"]):
+                problem_id, problem_created, task, inputs = problems[i % len(problems)]
+                model_id, created_at = _uuid(rng), _after(rng, problem_created, now)
+                algorithm = rng.choice(ALGORITHMS[task])
+                # About half of the problems have a production model: their first one
+                status = "production" if i < len(problems) and rng.random() < 0.5 else _pick(rng, MODEL_STATUSES)
+                models.append((model_id, created_at, problem_id, len(inputs)))
+                importance = {col: round(rng.random(), 4) for col in inputs}
+                metrics = {"accuracy": round(rng.random(), 4)} if task == "classification" else {"rmse": round(rng.random() * 100, 4)}
+                model_rows.append((
+                    model_id, problem_id, f"{algorithm} {i}", algorithm, rng.choice(["auto", "manual"]),
+                    rng.choice(EVALUATION_STRATEGIES), status, json.dumps(metrics),
+                    f"/models/{problem_id}/{model_id}/model.joblib",
+                    json.dumps({"feature_names": inputs, "metrics": metrics, "task": task}),
+                    json.dumps({"global_importance": importance}),
+                    uuid.UUID(int=rng.getrandbits(128)).hex * 2, rng.choice(users), created_at,
+                ))
+            inserted["models"] = _insert(
+                cur, "models",
+                ("id", "problem_id", "name", "algorithm", "train_mode", "evaluation_strategy", "status",
+                 "metrics_json", "uri", "metadata_json", "explanation_json", "fingerprint", "created_by", "created_at"),
+                model_rows, batch_size,
+            )
+            model_rows = []
+            cur.execute(
+                "UPDATE ml_problems mp JOIN models m ON m.problem_id = mp.id AND m.status = 'production' "
+                "SET mp.current_model_id = m.id"
+            )
+
+            def job_rows():
+                # One train job per model
+                for model_id, created_at, problem_id, _ in models:
+                    status = _pick(rng, JOB_STATUSES)
+                    yield (
+                        _uuid(rng), "train", problem_id, model_id, status, _uuid(rng), rng.choice(users),
+                        created_at - timedelta(minutes=5), created_at if status != "running" else None,
+                        "synthetic failure" if status == "failed" else None,
+                    )
+
+            inserted["jobs"] = _insert(
+                cur, "jobs",
+                ("id", "type", "problem_id", "model_id", "status", "task_id", "requested_by", "started_at", "finished_at", "error"),
+                job_rows(), batch_size,
+            )
+
+            def prediction_rows():
+                for i in range(counts["predictions"]):
+                    model_id, model_created, _, n_inputs = rng.choice(models)
+                    status = _pick(rng, PREDICTION_STATUSES)
+                    n = rng.randint(1, 20)
+                    inputs = [[round(rng.random() * 100, 2) for _ in range(n_inputs)] for _ in range(n)]
+                    outputs = [round(rng.random(), 4) for _ in range(n)] if status == "completed" else None
+                    yield (
+                        _uuid(rng), model_id, f"prediction {i}", None, json.dumps(inputs),
+                        json.dumps(outputs) if outputs is not None else None, None, status,
+                        rng.choice(users), _after(rng, model_created, now),
+                    )
+
+            inserted["predictions"] = _insert(
+                cur, "predictions",
+                ("id", "model_id", "name", "input_uri", "inputs_json", "outputs_json", "outputs_uri", "status", "requested_by", "created_at"),
+                prediction_rows(), batch_size,
+            )
+
+            # Fresh optimizer statistics, so the benchmark sees the plans production would get
+            cur.execute("ANALYZE TABLE users, datasets, dataset_versions, ml_problems, models, jobs, predictions")
+            cur.fetchall()
+    return inserted
+
+
+def main(database: str, scale: float, seed: int, reset: bool, batch_size: int) -> None:
+    try:
+        _ensure_test_db_exists(database)
+    except Exception as e:
+        raise SystemExit(
+            f"Could not create {database} with current MySQL user.\n"
+            f"Fix: create it once with root, then rerun.\n"
+            f"Error: {e}"
+        )
+
+    # Apply the schema (init_db reads DB_NAME at import)
+    os.environ["DB_NAME"] = database
+    from ..db.init_db import main as init_db_main
+    init_db_main(apply_seed=False)
+
+    started = time.perf_counter()
+    inserted = seed_synthetic(database=database, scale=scale, seed=seed, reset=reset, batch_size=batch_size)
+    print(f"Seeded {database} (scale={scale}) with {sum(inserted.values())} rows in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Bulk-load synthetic rows (BASE_ROWS * scale) into a test database.")
+    ap.add_argument("--database", default=TEST_DB, help="Target database (created if missing)")
+    ap.add_argument("--scale", type=float, default=1.0, help="Scale factor; 100 gives 100k models and 10M predictions")
+    ap.add_argument("--seed", type=int, default=42, help="Random seed (same seed, same rows)")
+    ap.add_argument("--reset", action="store_true", help="TRUNCATE tables before inserting")
+    ap.add_argument("--batch-size", type=int, default=SEED_BATCH_SIZE, help="Rows per INSERT statement")
+    args = ap.parse_args()
+    main(args.database, args.scale, args.seed, args.reset, args.batch_size)
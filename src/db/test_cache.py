@@ -0,0 +1,122 @@
+from datetime import datetime
+
+from .cache import ReadThroughCache, _RedisTier
+
+
+class DictTier(_RedisTier):
+    # Stands in for the Redis tier (same bytes in / bytes out); invalidation messages are
+    # delivered synchronously to every cache sharing the tier, like separate processes
+    def __init__(self):
+        super().__init__("")
+        self.store = {}
+        self.generations = {}
+        self.listeners = []
+
+    def get(self, key, generation_key):
+        return self.store.get(key), self.generations.get(generation_key, b"0")
+
+    def set(self, key, generation_key, generation, value, ttl):
+        if self.generations.get(generation_key, b"0") == generation:
+            self.store[key] = value
+
+    def invalidate(self, keys, generation_keys, message):
+        for generation_key in generation_keys:
+            self.generations[generation_key] = str(int(self.generations.get(generation_key, b"0")) + 1).encode()
+        for key in keys:
+            self.store.pop(key, None)
+        for callback in self.listeners:
+            callback(message)
+
+    def listen(self, callback):
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+
+def make_loader(rows):
+    calls = []
+
+    def loader(key):
+        calls.append(key)
+        row = rows.get(key)
+        return dict(row) if row else None
+
+    return loader, calls
+
+
+def test_read_through_and_invalidate():
+    rows = {"m1": {"id": "m1", "status": "staging", "created_at": datetime(2026, 1, 2, 3, 4, 5)}}
+    loader, calls = make_loader(rows)
+    tier = DictTier()
+    cache = ReadThroughCache("models", redis_tier=tier)
+
+    assert cache.get("m1", loader)["status"] == "staging"
+    assert cache.get("m1", loader)["status"] == "staging"
+    assert calls == ["m1"]
+
+    # Another process: empty local tier, row comes from the shared tier with its types intact
+    other = ReadThroughCache("models", redis_tier=tier)
+    assert other.get("m1", loader)["created_at"] == datetime(2026, 1, 2, 3, 4, 5)
+    assert calls == ["m1"]
+
+    rows["m1"]["status"] = "production"
+    cache.invalidate("m1")
+    assert cache.get("m1", loader)["status"] == "production"
+    assert calls == ["m1", "m1"]
+
+
+def test_missing_rows_are_not_cached():
+    rows = {}
+    loader, calls = make_loader(rows)
+    cache = ReadThroughCache("models", redis_tier=DictTier())
+
+    assert cache.get("m2", loader) is None
+    rows["m2"] = {"id": "m2"}
+    assert cache.get("m2", loader) == {"id": "m2"}
+    assert calls == ["m2", "m2"]
+
+
+def test_local_tier_expires():
+    loader, calls = make_loader({"p1": {"id": "p1"}})
+    cache = ReadThroughCache("ml_problems", local_ttl=0, redis_tier=_RedisTier(""))
+
+    cache.get("p1", loader)
+    cache.get("p1", loader)
+    assert calls == ["p1", "p1"]
+
+
+def test_row_loaded_before_an_invalidation_is_not_cached():
+    rows = {"m1": {"id": "m1", "status": "staging"}}
+    tier = DictTier()
+    cache = ReadThroughCache("models", redis_tier=tier)
+    writer = ReadThroughCache("models", redis_tier=tier)
+
+    def racing_loader(key):
+        # The row is read, then a writer commits and invalidates before it is stored
+        row = dict(rows[key])
+        rows[key]["status"] = "production"
+        writer.invalidate(key)
+        return row
+
+    assert cache.get("m1", racing_loader)["status"] == "staging"
+    loader, calls = make_loader(rows)
+    assert cache.get("m1", loader)["status"] == "production"
+    assert calls == ["m1"]
+
+
+def test_invalidation_reaches_the_local_tier_of_other_processes():
+    rows = {"p1": {"id": "p1", "current_model_id": "m1"}}
+    loader, calls = make_loader(rows)
+    tier = DictTier()
+    reader = ReadThroughCache("ml_problems", local_ttl=3600, redis_tier=tier)
+    writer = ReadThroughCache("ml_problems", redis_tier=tier)
+    other_namespace = ReadThroughCache("models", local_ttl=3600, redis_tier=tier)
+    other_namespace.get("p1", loader)
+
+    assert reader.get("p1", loader)["current_model_id"] == "m1"
+    rows["p1"]["current_model_id"] = "m2"
+    writer.invalidate("p1")
+
+    assert reader.get("p1", loader)["current_model_id"] == "m2"
+    assert calls == ["p1", "p1", "p1"]
+    # Only the invalidated namespace is dropped
+    assert other_namespace._get_local("p1") == {"id": "p1", "current_model_id": "m1"}
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import os
+import json
 import uuid
 import pytest
 import pymysql
@@ -56,6 +57,12 @@ from ..db.db import (
     delete_dataset,
     # Transaction
     set_model_to_production,
+    # Batched writes
+    update_predictions,
+    # Retention
+    archive_predictions,
+    # Model registration
+    register_model,
 )
 
 # ---------------------------------------------------------
@@ -243,6 +250,9 @@ def test_smoke_core_crud_joins_and_stats():
     assert stats["models"] == 1
     assert stats["jobs"] == 1
     assert stats["predictions"] == 1
+    assert sum(stats["models_by_status"].values()) == 1
+    assert sum(stats["predictions_by_status"].values()) == 1
+    assert sum(n for day in stats["predictions_by_day"] for key, n in day.items() if key != "day") == 1
 
 
 # ---------------------------------------------------------
@@ -263,6 +273,18 @@ def test_smoke_lists_and_joined_lists():
     assert total >= 2
     assert 0 < len(items) <= 2
 
+    # Page past the end: no rows, total still reported
+    items, total = get_datasets(page=5, size=2, sort="created_at", dir="desc", q=None, id=None, name=None)
+    assert items == []
+    assert total == 3
+
+    # Page rows are loaded by id and keep the order of the sort
+    items, total = get_datasets(page=1, size=2, sort="name", dir="asc", q=None, id=None, name=None)
+    assert [item["name"] for item in items] == ["alpha_dataset", "beta_dataset"]
+    assert total == 3
+    items, _ = get_datasets(page=2, size=2, sort="name", dir="asc", q=None, id=None, name=None)
+    assert [item["id"] for item in items] == [ds_g]
+
     # Create versions for one dataset and test dataset_versions list
     dv1 = create_dataset_version(ds_a, uri="/data/a1.csv", name="v1", filename="a1.csv", schema_json={}, profile_json={}, row_count=1)
     dv2 = create_dataset_version(ds_a, uri="/data/a2.csv", name="v2", filename="a2.csv", schema_json={}, profile_json={}, row_count=2)
@@ -322,6 +344,40 @@ def test_smoke_lists_and_joined_lists():
     assert len(ppr_items) == 2
 
 
+def test_smoke_joined_lists_fulltext_search():
+    _print_test("Joined list q= search (FULLTEXT + LIKE fallback)")
+
+    ds = create_dataset("housing_dataset")
+    dv = create_dataset_version(ds, uri="/data/h.csv", name="housing prices", filename="h.csv", schema_json={}, profile_json={}, row_count=1)
+    p = create_ml_problem(dataset_version_id=dv, task="regression", target="price", name="price forecast", dataset_version_uri="/data/h.csv")
+    m_rf, _ = create_model(problem_id=p, algorithm="random_forest", status="staging", name="forest baseline")
+    m_lr, _ = create_model(problem_id=p, algorithm="linear", status="staging", name="linear")
+
+    # Prefix match on the model columns; relevance puts the model matching in more columns first
+    items, total = get_models_all_joined(page=1, size=10, sort="relevance", dir="desc", q="fores")
+    assert total == 1
+    assert items[0]["id"] == m_rf
+
+    # Matches through the joined dataset name -> every model of the problem
+    items, total = get_models_all_joined(page=1, size=10, sort="relevance", dir="desc", q="housing")
+    assert total == 2
+
+    # All words are required
+    items, total = get_ml_problems_all_joined(page=1, size=10, sort="relevance", dir="desc", q="price regression")
+    assert total == 1
+    items, total = get_ml_problems_all_joined(page=1, size=10, sort="relevance", dir="desc", q="price classification")
+    assert total == 0
+
+    # Short words are not indexed -> LIKE fallback (relevance falls back to created_at)
+    items, total = get_models_all_joined(page=1, size=10, sort="relevance", dir="desc", q="ar")
+    assert {row["id"] for row in items} == {m_lr}
+
+    items, total = get_dataset_versions_all_joined(page=1, size=10, sort="relevance", dir="desc", q="housing")
+    assert total == 1
+    items, total = get_predictions_all_joined(page=1, size=10, sort="relevance", dir="desc", q="housing")
+    assert total == 0
+
+
 # ---------------------------------------------------------
 # 3) Transaction: set_model_to_production (row lock + consistent state)
 # ---------------------------------------------------------
@@ -453,3 +509,116 @@ def test_smoke_update_edge_cases():
 
     # Non-existent id should return False
     assert update_dataset(str(uuid.uuid4()), name="nope") is False
+
+
+# ---------------------------------------------------------
+# 6) Batched prediction updates (worker write-behind buffer)
+# ---------------------------------------------------------
+def test_smoke_update_predictions():
+    _print_test("Batched prediction updates")
+
+    pr1 = create_prediction(name="batched", status="predicting")
+    pr2 = create_prediction(name="other", status="predicting")
+    deleted = str(uuid.uuid4())
+
+    update_predictions([
+        {"id": pr1, "status": "completed", "outputs_json": '{"y_pred": [1]}'},
+        {"id": pr2, "status": "failed"},
+        {"id": deleted, "status": "failed"},
+    ])
+
+    row = get_prediction(pr1)
+    assert row["status"] == "completed"
+    assert row["name"] == "batched"  # fields not in the batch are kept
+    assert get_prediction(pr2)["status"] == "failed"
+    # Unknown (e.g. deleted) ids are not re-inserted
+    assert get_prediction(deleted) is None
+
+    # Replaying the same batch is harmless
+    update_predictions([{"id": pr1, "status": "completed"}])
+    assert get_prediction(pr1)["outputs_json"] is not None
+
+
+# ---------------------------------------------------------
+# 7) Retention: old payloads move to archive files
+# ---------------------------------------------------------
+def test_smoke_archive_predictions(tmp_path):
+    _print_test("Prediction payload archival")
+
+    old = create_prediction(name="old", inputs_json={"a": [1]}, outputs_json={"y_pred": [1]}, status="completed")
+    old_failed = create_prediction(name="old failed", inputs_json={"a": [2]}, status="failed")
+    running = create_prediction(name="running", inputs_json={"a": [3]}, status="predicting")
+    hot = create_prediction(name="hot", outputs_json={"y_pred": [2]}, status="completed")
+    conn = pymysql.connect(**_db_connect_kwargs())
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "UPDATE predictions SET created_at = NOW() - INTERVAL 60 DAY WHERE id IN (%s, %s, %s)",
+                (old, old_failed, running),
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+    # One row per batch: each batch resumes after the previous one, the running row is skipped
+    assert archive_predictions(older_than_days=30, batch_size=1, archive_dir=str(tmp_path)) == 2
+    assert get_prediction(running, load_archived=False)["archived_at"] is None
+    # Rerun: nothing left to archive
+    assert archive_predictions(older_than_days=30, archive_dir=str(tmp_path)) == 0
+
+    raw = get_prediction(old, load_archived=False)
+    assert raw["outputs_json"] is None and raw["archived_at"] is not None
+    assert raw["outputs_uri"].startswith(str(tmp_path))
+
+    restored = get_prediction(old)
+    assert json.loads(restored["outputs_json"]) == {"y_pred": [1]}
+    assert json.loads(restored["inputs_json"]) == {"a": [1]}
+    assert get_prediction(hot, load_archived=False)["outputs_json"] is not None
+
+
+# ---------------------------------------------------------
+# 8) Model registration: row + files in one transaction
+# ---------------------------------------------------------
+def test_smoke_register_model():
+    _print_test("Transaction: register_model")
+
+    user_id = create_user("reg_user", "reg@example.com")
+    ds_id = create_dataset("reg_dataset", owner_id=user_id)
+    dv_id = create_dataset_version(ds_id, uri="/data/reg.csv", name="reg_v1", filename="reg.csv", schema_json={}, profile_json={}, row_count=1)
+    prob_id = create_ml_problem(dataset_version_id=dv_id, task="classification", target="y", name="reg_p1", dataset_version_uri="/data/reg.csv")
+    model_id, model_uri = create_model(problem_id=prob_id, name="reg_m1", algorithm="algo", status="training", created_by=user_id)
+
+    row = {
+        "id": model_id,
+        "problem_id": prob_id,
+        "name": "reg_m1",
+        "algorithm": "algo",
+        "status": "staging",
+        "metrics_json": '{"accuracy": 0.9}',
+        "uri": model_uri,
+        "metadata_json": '{"model_id": "%s"}' % model_id,
+        "explanation_json": "{}",
+        "fingerprint": "f" * 64,
+        "created_by": None,
+    }
+
+    # publish fails -> nothing committed, the row is still the one the API created
+    def failing_publish():
+        raise OSError("rename failed")
+
+    with pytest.raises(OSError):
+        register_model(row, publish=failing_publish)
+    assert get_model(model_id)["status"] == "training"
+
+    published = []
+    register_model(row, publish=lambda: published.append(True))
+    model = get_model(model_id)
+    assert published == [True]
+    assert model["status"] == "staging" and model["fingerprint"] == "f" * 64
+    assert model["created_by"] == user_id  # kept when the registration has none
+    assert json.loads(model["metadata_json"]) == {"model_id": model_id}
+
+    # A model without a pre-created row is inserted
+    new_id = str(uuid.uuid4())
+    register_model({**row, "id": new_id, "created_by": user_id})
+    assert get_model(new_id)["status"] == "staging"
@@ -1,5 +1,5 @@
+from typing import Literal
 import numpy as np
-import shap
 from scipy.sparse import issparse
 
 from mlcore.explain.summary_calculator import calculate_summary
@@ -16,10 +16,75 @@ def _force_2D(X):
         X = X.reshape(1, -1)
     return X
 
+def sample_background(
+    X,
+    n_ref_max: int = 200,
+    random_seed: int = 42,
+):
+    """
+    Draw the reference (background) sample for SHAP from X.
+    Works on DataFrames (before preprocessing) and on arrays (after preprocessing).
+    """
+    rng = np.random.default_rng(random_seed)
+    # Fixed sample size for reproducability
+    n_rows = X.shape[0]
+    n_ref = min(n_ref_max, n_rows)
+    # Equivalent to .sample method of pandas
+    idx_ref = rng.choice(n_rows, size=n_ref, replace=False)
+    if hasattr(X, "iloc"):
+        return X.iloc[idx_ref]
+    return X[idx_ref]
+
+def _summarize_kmeans(
+    X: np.ndarray,
+    n_clusters: int,
+    random_seed: int = 42,
+) -> np.ndarray:
+    """
+    Summarize X by k-means centroids. Like shap.kmeans, every centroid value is
+    snapped to the closest value observed in that column (keeps OHE columns 0/1).
+    """
+    from sklearn.cluster import KMeans
+
+    n_clusters = min(n_clusters, X.shape[0])
+    kmeans = KMeans(n_clusters=n_clusters, n_init=10, random_state=random_seed).fit(X)
+    centroids = kmeans.cluster_centers_
+    for j in range(X.shape[1]):
+        observed = np.unique(X[:, j])
+        nearest = np.abs(centroids[:, j][:, None] - observed[None, :]).argmin(axis=1)
+        centroids[:, j] = observed[nearest]
+    return centroids
+
+def build_background(
+    preprocessor,
+    X,
+    n_ref_max: int = 200,
+    random_seed: int = 42,
+    method: Literal["sample", "kmeans"] = "sample",
+    n_clusters: int = 50,
+) -> np.ndarray:
+    """
+    Build the background from the raw training rows in the (dense, float32)
+    feature space the estimator and the explainer work in.
+    - sample: random sample of n_ref_max rows
+    - kmeans: n_clusters centroids summarizing a larger sample (10 * n_ref_max rows)
+    """
+    if method == "sample":
+        X_ref = sample_background(X, n_ref_max, random_seed)
+        background = _force_2D(preprocessor.transform(X_ref))
+    elif method == "kmeans":
+        X_ref = sample_background(X, n_ref_max * 10, random_seed)
+        background = _summarize_kmeans(
+            _force_2D(preprocessor.transform(X_ref)).astype(np.float64), n_clusters, random_seed)
+    else:
+        raise ValueError(f"Invalid background method: '{method}'. Expected 'sample' or 'kmeans'.")
+    # float32 halves the size on disk and in memory, precision is plenty for SHAP
+    return background.astype(np.float32)
+
 def explain_model(
     task: str,
     model,
-    X_train: np.ndarray,
+    X_train: np.ndarray | None,
     X_test: np.ndarray,
     feature_names: list[str],
     feature_parents: list[str],
@@ -29,7 +94,8 @@ def explain_model(
     top_k: int = 30,
     include_distributions: bool = True,
     quantiles: list[float] = [0.10, 0.25, 0.50, 0.75, 0.90],
-    random_seed: int = 42,    
+    random_seed: int = 42,
+    X_ref: np.ndarray | None = None,
     )-> dict:
 
     rng = np.random.default_rng(random_seed)
@@ -40,13 +106,13 @@ def explain_model(
     # n_rows = X_train.shape[0]
     # n_ref = max(1, int(n_rows * pct_ref))
 
-    # Fixed sample size for reproducability
-    n_rows = X_train.shape[0]
-    n_ref = min(n_ref_max, n_rows)
-    
-    # Equivalent to .sample method of pandas
-    idx_ref = rng.choice(n_rows, size=n_ref, replace=False)
-    X_ref = X_train[idx_ref]
+    # The trainer passes the background it persists with the model, so the
+    # global summary and later local explanations share the same reference.
+    if X_ref is None:
+        if X_train is None:
+            raise ValueError("Provide X_train or a precomputed X_ref.")
+        X_ref = sample_background(X_train, n_ref_max, random_seed)
+    n_ref = X_ref.shape[0]
     
     # Explanation sample percentage (5–20%)
     # pct_explain = rng.integers(5, 21) / 100.0
@@ -99,6 +165,8 @@ def classification_explanation(
     X_explain: np.ndarray,
     feature_names: list[str],
     ):
+    # shap is imported on first use: it takes seconds, and most worker tasks never explain
+    import shap
     explainer = shap.Explainer(model.predict_proba, X_ref, feature_names=feature_names)
     shap_values = explainer(X_explain)
     return shap_values
@@ -109,6 +177,7 @@ def regression_explanation(
     X_explain: np.ndarray,
     feature_names: list[str],
     ):
+    import shap
     explainer = shap.Explainer(model.predict, X_ref, feature_names=feature_names)
     shap_values = explainer(X_explain)
     return shap_values
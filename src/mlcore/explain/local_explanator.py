@@ -0,0 +1,174 @@
+import json
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from mlcore.io.model_loader import ModelArtifacts
+from mlcore.explain.explanator import _force_2D
+from mlcore.explain.get_feature_names import get_feature_names
+from db.db import get_prediction, get_model
+import logging
+logger = logging.getLogger(__name__)
+
+# Max number of rows that can be explained in one request (bounds the cost per request)
+MAX_ROWS = 100
+# Max number of models whose explainer is kept in memory per worker process
+CACHE_SIZE = 8
+
+# model_uri -> explainer bundle (model, explainer, feature names, label classes)
+_explainer_cache: "OrderedDict[str, dict]" = OrderedDict()
+
+
+def _get_explainer(model_uri: str) -> dict:
+    """
+    Return the cached explainer for a model, building it from the persisted
+    model artifact, background sample and explainer state on the first call.
+    """
+    bundle = _explainer_cache.get(model_uri)
+    if bundle is not None:
+        _explainer_cache.move_to_end(model_uri)
+        return bundle
+
+    artifacts = ModelArtifacts(model_uri)
+    model = artifacts.model
+    state = artifacts.explainer_state
+    if state is None:
+        # Models trained before explainer.json existed: derive the state from the artifacts
+        feature_info = get_feature_names(model.named_steps["pre"])
+        state = {
+            "task": artifacts.metadata.get("task"),
+            "feature_names": feature_info["feature_names"],
+            "feature_parents": feature_info["feature_parents"],
+            "label_classes": artifacts.metadata.get("label_classes"),
+        }
+
+    est = model.named_steps["est"]
+    task = state.get("task")
+    if task == "classification":
+        predict_fn = est.predict_proba
+    elif task == "regression":
+        predict_fn = est.predict
+    else:
+        raise ValueError(f"Invalid task: '{task}'. Expected 'classification' or 'regression'.")
+    # Imported on first use, like in explanator: only explain tasks pay for shap
+    import shap
+    explainer = shap.Explainer(predict_fn, artifacts.background, feature_names=state["feature_names"])
+
+    bundle = {
+        "model": model,
+        "explainer": explainer,
+        "feature_names": state["feature_names"],
+        "feature_parents": state["feature_parents"],
+        "label_classes": state.get("label_classes"),
+    }
+    _explainer_cache[model_uri] = bundle
+    if len(_explainer_cache) > CACHE_SIZE:
+        _explainer_cache.popitem(last=False)
+    return bundle
+
+
+def explain_rows(
+    model_uri: str,
+    X: pd.DataFrame,
+    top_k: int = 10,
+) -> list[dict]:
+    """
+    Compute local SHAP attributions for each row of X (raw input columns in training order).
+    """
+    bundle = _get_explainer(model_uri)
+    model = bundle["model"]
+    feature_names = bundle["feature_names"]
+    feature_parents = bundle["feature_parents"]
+
+    X_t = _force_2D(model.named_steps["pre"].transform(X)).astype(np.float32)
+    shap_values = bundle["explainer"](X_t)
+    values = np.asarray(shap_values.values)
+    base_values = np.asarray(shap_values.base_values)
+
+    label_classes = bundle["label_classes"]
+    y_pred = model.predict(X)
+
+    explanations = []
+    for i in range(values.shape[0]):
+        if values.ndim == 3:
+            # Classification: explain the class that was predicted for this row
+            class_idx = int(y_pred[i])
+            row_values = values[i, :, class_idx]
+            base_value = base_values[i, class_idx]
+            prediction = label_classes[class_idx] if label_classes else class_idx
+        else:
+            class_idx = None
+            row_values = values[i]
+            base_value = base_values[i]
+            prediction = float(y_pred[i])
+
+        top_k_eff = min(top_k, len(feature_names))
+        top_fids = np.argsort(-np.abs(row_values))[:top_k_eff]
+
+        explanations.append({
+            # Types inserted to avoid numpy serialisation errors during JSON dumps
+            "prediction": prediction,
+            "class_index": class_idx,
+            "base_value": round(float(base_value), 4),
+            "contributions": [
+                {
+                    "fid": int(fid),
+                    "name": feature_names[fid],
+                    "parent": feature_parents[fid],
+                    "value": round(float(row_values[fid]), 4),
+                    "x": round(float(X_t[i, fid]), 4),
+                }
+                for fid in top_fids
+            ],
+        })
+    return explanations
+
+
+def explain_prediction(
+    prediction_id: str,
+    rows: list[int],
+    top_k: int = 10,
+) -> dict:
+    """
+    Local explanations for selected rows of a stored prediction.
+    """
+    if not rows:
+        raise ValueError("No rows were specified. Provide at least one row index.")
+    if len(rows) > MAX_ROWS:
+        raise ValueError(f"Too many rows requested ({len(rows)}). The maximum is {MAX_ROWS}.")
+
+    prediction = get_prediction(prediction_id)
+    if not prediction:
+        raise ValueError(f"Prediction '{prediction_id}' not found.")
+    if prediction.get("status") != "completed":
+        raise ValueError(f"Prediction '{prediction_id}' is not completed.")
+
+    raw_outputs = prediction.get("outputs_json")
+    outputs = json.loads(raw_outputs) if isinstance(raw_outputs, str) else raw_outputs
+    if not outputs or not outputs.get("X"):
+        raise ValueError(f"Prediction '{prediction_id}' has no stored inputs to explain.")
+
+    model_db = get_model(prediction.get("model_id"))
+    if not model_db or not model_db.get("uri"):
+        raise ValueError(f"Model '{prediction.get('model_id')}' not found or has no uri.")
+
+    X_all = pd.DataFrame(outputs["X"])
+    invalid = [row for row in rows if row < 0 or row >= len(X_all)]
+    if invalid:
+        raise ValueError(f"Row indices out of range: {invalid}")
+
+    feature_order = outputs.get("model_metadata", {}).get("schema_snapshot", {}).get("feature_order")
+    X = X_all.iloc[rows]
+    if feature_order:
+        X = X[feature_order]
+
+    explanations = explain_rows(model_db["uri"], X, top_k=top_k)
+    for row, explanation in zip(rows, explanations):
+        explanation["row"] = row
+
+    return {
+        "prediction_id": prediction_id,
+        "model_id": prediction.get("model_id"),
+        "problem_id": model_db.get("problem_id"),
+        "top_k": top_k,
+        "rows": explanations,
+    }
@@ -1,9 +1,12 @@
 from collections import defaultdict
+from typing import TYPE_CHECKING
 import numpy as np
-import shap
+
+if TYPE_CHECKING:
+    import shap
 
 def calculate_summary(
-        shap_values: shap.Explanation,
+        shap_values: "shap.Explanation",
         task: str,
         model_output: str,
         output_space: str,
@@ -0,0 +1,72 @@
+import json
+import numpy as np
+import pandas as pd
+from mlcore.io.model_loader import ModelArtifacts
+from mlcore.io.model_saver import save_background, save_model
+from mlcore.explain.explanator import build_background
+from mlcore.explain.get_feature_names import get_feature_names
+from mlcore.presets.regression.linear_regression import build_model
+from . import local_explanator
+
+
+def fit_model(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({
+        "plan": rng.choice(["basic", "pro"], size=200),
+        "age": rng.integers(18, 70, size=200).astype(float),
+        "income": rng.normal(3000, 500, size=200),
+    })
+    y = 2 * X["age"] + 0.01 * X["income"] + np.where(X["plan"] == "pro", 5.0, 0.0)
+    model, _ = build_model(categorical=["plan"], numeric=["age", "income"])
+    model.fit(X, y)
+
+    pre = model.named_steps["pre"]
+    background = build_background(pre, X, n_ref_max=50, random_seed=0)
+    feature_info = get_feature_names(pre)
+    save_model(model, tmp_path)
+    save_background(background, tmp_path, {
+        "task": "regression",
+        "explainer": "auto",
+        "model_output": "predict",
+        "feature_names": feature_info["feature_names"],
+        "feature_parents": feature_info["feature_parents"],
+        "label_classes": None,
+        "background": {"method": "sample", "random_seed": 0},
+    })
+    (tmp_path / "metadata.json").write_text(json.dumps({"task": "regression"}))
+    return model, X, background, str(tmp_path / "model.joblib")
+
+
+def test_model_artifacts_round_trip(tmp_path):
+    model, X, background, model_uri = fit_model(tmp_path)
+    artifacts = ModelArtifacts(model_uri)
+
+    assert artifacts.background.dtype == np.float32
+    np.testing.assert_array_equal(artifacts.background, np.asarray(background, dtype=np.float32))
+    state = artifacts.explainer_state
+    assert state["background"]["n_rows"] == background.shape[0]
+    assert state["feature_names"] == ["plan=basic", "plan=pro", "age", "income"]
+    assert artifacts.metadata == {"task": "regression"}
+    np.testing.assert_allclose(artifacts.model.predict(X.head()), model.predict(X.head()))
+
+
+def test_local_shap_values_sum_to_prediction(tmp_path, monkeypatch):
+    model, X, _, model_uri = fit_model(tmp_path)
+    prediction = {
+        "id": "p1",
+        "model_id": "m1",
+        "status": "completed",
+        "outputs_json": json.dumps({"X": X.head(5).to_dict(orient="records")}),
+    }
+    monkeypatch.setattr(local_explanator, "get_prediction", lambda prediction_id: prediction)
+    monkeypatch.setattr(local_explanator, "get_model", lambda model_id: {"uri": model_uri, "problem_id": "pr1"})
+
+    result = local_explanator.explain_prediction("p1", rows=[0, 3], top_k=10)
+
+    assert [row["row"] for row in result["rows"]] == [0, 3]
+    y_pred = model.predict(X.iloc[[0, 3]])
+    for row, expected in zip(result["rows"], y_pred):
+        assert row["prediction"] == expected
+        total = row["base_value"] + sum(c["value"] for c in row["contributions"])
+        # Contributions and base value are rounded to 4 decimals
+        assert abs(total - expected) < 1e-2
@@ -0,0 +1,218 @@
+import csv
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator
+import pandas as pd
+
+# A checkpoint (byte offset of a record start) is stored every ROW_INDEX_STEP rows
+ROW_INDEX_STEP = 1000
+# Max number of csv files whose row index is kept in memory
+INDEX_CACHE_SIZE = 32
+
+# uri -> row index (header, checkpoints, row count, file signature)
+_index_cache: "OrderedDict[str, dict]" = OrderedDict()
+# Guards _index_cache: the sync /csv handler runs concurrently in the API threadpool
+_index_cache_lock = threading.Lock()
+
+
+def _file_signature(uri: str) -> tuple:
+    stat = os.stat(uri)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class RowIndexBuilder:
+    """
+    Incremental row index: feed the csv bytes chunk by chunk (e.g. while an upload is
+    written to disk) and get the same index build_row_index computes from the file.
+    Quoted fields may contain newlines, so a line only starts a new record when
+    the number of quotes seen so far is even (quote parity).
+    Optionally keeps the header and the first `sample_rows` records as a sample.
+    """
+
+    def __init__(self, step: int = ROW_INDEX_STEP, sample_rows: int = 0):
+        self.step = step
+        self.sample_rows = sample_rows
+        self.offsets = []
+        self.n_rows = 0
+        self.header = b""
+        self.sample = b""
+        self._header_done = False
+        self._in_quotes = False
+        self._position = 0
+        self._pending = b""
+        # Index of the record the current line belongs to
+        self._record = -1
+
+    def feed(self, chunk: bytes) -> None:
+        data = self._pending + chunk
+        start = 0
+        while True:
+            end = data.find(b"\n", start)
+            if end == -1:
+                break
+            self._line(data[start:end + 1])
+            start = end + 1
+        self._pending = data[start:]
+
+    def finish(self) -> None:
+        if self._pending:
+            self._line(self._pending)
+            self._pending = b""
+
+    def _line(self, line: bytes) -> None:
+        starts_record = not self._in_quotes
+        if line.count(b'"') % 2 == 1:
+            self._in_quotes = not self._in_quotes
+
+        if not self._header_done:
+            self.header += line
+            self.sample += line
+            self._header_done = not self._in_quotes
+        elif not starts_record:
+            # Continuation of a record with a quoted newline
+            if self._record < self.sample_rows:
+                self.sample += line
+        elif line.strip():
+            if self.n_rows % self.step == 0:
+                self.offsets.append(self._position)
+            self._record = self.n_rows
+            self.n_rows += 1
+            if self._record < self.sample_rows:
+                self.sample += line
+        self._position += len(line)
+
+    @property
+    def columns(self) -> list[str]:
+        return next(csv.reader(io.StringIO(self.header.decode("utf-8-sig"))), [])
+
+    def index(self, uri: str) -> dict:
+        return {
+            "columns": self.columns,
+            "offsets": self.offsets,
+            "step": self.step,
+            "n_rows": self.n_rows,
+            "signature": _file_signature(uri),
+        }
+
+
+def build_row_index(
+    uri: str,
+    step: int = ROW_INDEX_STEP,
+) -> dict:
+    """
+    Scan the csv once and record the byte offset of every `step`-th record.
+    """
+    builder = RowIndexBuilder(step=step)
+    with open(uri, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            builder.feed(chunk)
+    builder.finish()
+    return builder.index(uri)
+
+
+def register_row_index(
+    uri: str,
+    index: dict,
+) -> None:
+    """
+    Put an index built elsewhere (e.g. during upload) into the cache.
+    """
+    with _index_cache_lock:
+        _index_cache[uri] = index
+        _index_cache.move_to_end(uri)
+        if len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+
+
+def get_row_index(
+    uri: str,
+) -> dict:
+    """
+    Cached row index of a csv, rebuilt when the file changed on disk.
+    The file is scanned outside the lock (two threads may build the same index once).
+    """
+    signature = _file_signature(uri)
+    with _index_cache_lock:
+        index = _index_cache.get(uri)
+        if index is not None and index["signature"] == signature:
+            _index_cache.move_to_end(uri)
+            return index
+
+    index = build_row_index(uri)
+    register_row_index(uri, index)
+    return index
+
+
+def _resolve_usecols(
+    columns: list[str],
+    usecols: Iterable[str] | Callable[[str], bool] | None,
+) -> list[str]:
+    if usecols is None:
+        return list(columns)
+    if callable(usecols):
+        return [column for column in columns if usecols(column)]
+    wanted = set(usecols)
+    return [column for column in columns if column in wanted]
+
+
+def read_csv_window(
+    uri: str,
+    offset: int = 0,
+    limit: int | None = None,
+    usecols: Iterable[str] | Callable[[str], bool] | None = None,
+) -> tuple[pd.DataFrame, int]:
+    """
+    Read `limit` rows starting at row `offset` (0-based, header excluded).
+    Parsing starts at the nearest checkpoint of the row index instead of the top of the file.
+    Returns the window and the total number of rows.
+    """
+    if not uri:
+        raise ValueError("No csv_uri was provided. Provide a csv_uri.")
+    if offset < 0:
+        raise ValueError("offset must be >= 0.")
+
+    index = get_row_index(uri)
+    columns = index["columns"]
+    selected = _resolve_usecols(columns, usecols)
+    n_rows = index["n_rows"]
+    if offset >= n_rows or limit == 0:
+        return pd.DataFrame(columns=selected), n_rows
+
+    checkpoint = offset // index["step"]
+    # Rows between the checkpoint and offset are parsed and dropped (at most step - 1)
+    skip = offset - checkpoint * index["step"]
+    with open(uri, "rb") as f:
+        f.seek(index["offsets"][checkpoint])
+        df = pd.read_csv(
+            f,
+            header=None,
+            names=columns,
+            usecols=selected,
+            nrows=None if limit is None else skip + limit,
+        )
+    df = df.iloc[skip:].reset_index(drop=True)
+    return df[selected], n_rows
+
+
+def iter_csv_chunks(
+    uri: str,
+    offset: int = 0,
+    limit: int | None = None,
+    usecols: Iterable[str] | Callable[[str], bool] | None = None,
+    chunk_size: int = ROW_INDEX_STEP,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield the rows [offset, offset + limit) in chunks of at most chunk_size rows,
+    so a response can be streamed without loading the whole window.
+    """
+    n_rows = get_row_index(uri)["n_rows"]
+    end = n_rows if limit is None else min(n_rows, offset + limit)
+    start = offset
+    while start < end:
+        df, _ = read_csv_window(uri, offset=start, limit=min(chunk_size, end - start), usecols=usecols)
+        if df.empty:
+            return
+        yield df
+        start += len(df)
@@ -1,40 +1,140 @@
+import numpy as np
 import pandas as pd
-from typing import Tuple
+import pandas.api.types as pdtypes
+from typing import Callable, Iterable, Tuple
+
+# Integer widths tried in order when downcasting, smallest first
+_INT_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+def compact_dtypes(
+    profile: dict,
+) -> dict:
+    """
+    read_csv dtypes derived from the profile: the smallest integer width that holds
+    the profiled min/max, `category` for categoricals and `bool` for booleans.
+    Columns with missing values keep the pandas default (NaN forces float/object).
+    """
+    _check_profile(profile)
+    dtypes = {}
+    for column, summary in profile.get("columns", {}).items():
+        if summary.get("is_empty") or summary.get("missing_pct", 1) > 0:
+            continue
+        semantic_type = summary.get("semantic_type")
+        if semantic_type == "numeric" and str(summary.get("dtype_raw", "")).startswith("int"):
+            for dtype in _INT_DTYPES:
+                info = np.iinfo(dtype)
+                if info.min <= summary["min"] and summary["max"] <= info.max:
+                    dtypes[column] = dtype
+                    break
+        elif semantic_type == "categorical":
+            dtypes[column] = "category"
+        elif semantic_type == "boolean":
+            dtypes[column] = "bool"
+    return dtypes
+
+
+def is_float32_exact(
+    column: pd.Series,
+) -> bool:
+    """
+    True when column is float64 and every value survives a float32 round trip
+    (123456.789 does not: it would come back as 123456.7890625).
+    """
+    if column.dtype != np.float64:
+        return False
+    values = column.to_numpy()
+    with np.errstate(over="ignore"):
+        round_trip = values.astype(np.float32).astype(np.float64)
+    return bool(((round_trip == values) | (np.isnan(round_trip) & np.isnan(values))).all())
 
 
 def get_dataframe_from_csv(
     uri: str,
+    profile: dict | None = None,
+    usecols: Iterable[str] | Callable[[str], bool] | None = None,
 ) -> pd.DataFrame:
+    """
+    Load a csv. When the dataset profile is given, the columns are loaded with
+    compact dtypes (see compact_dtypes) and float columns are downcast to float32
+    only when every value is exactly representable (see is_float32_exact).
+    usecols restricts parsing to the given columns (names or a predicate on the name).
+    """
     if not uri:
         raise ValueError("No csv_uri was provided. Provide a csv_uri.")
     
     try:
-        df = pd.read_csv(uri)
+        if not profile:
+            return pd.read_csv(uri, usecols=usecols)
+        try:
+            df = pd.read_csv(uri, usecols=usecols, dtype=compact_dtypes(profile))
+        except (ValueError, OverflowError) as e:
+            # The file no longer matches its profile (new values/missing values): load it as is
+            print(f"Compact load failed, falling back to default dtypes: {e}")
+            return pd.read_csv(uri, usecols=usecols)
+        for column in df.columns:
+            if is_float32_exact(df[column]):
+                df[column] = df[column].astype(np.float32)
         return df
     except Exception as e:
         print(f"Failed to load csv: {e}")
         raise
 
+
+def logical_dtype(
+    dtype,
+) -> str:
+    """
+    Dtype a column has when loaded without compaction (int8 -> int64, category -> object, ...).
+    Stored in the schema snapshot so training and prediction agree on it.
+    """
+    if isinstance(dtype, pd.CategoricalDtype):
+        return "object"
+    if pdtypes.is_bool_dtype(dtype):
+        return "bool"
+    if pdtypes.is_integer_dtype(dtype):
+        return "int64"
+    if pdtypes.is_float_dtype(dtype):
+        return "float64"
+    return str(dtype)
+
+
+def coerce_to_schema(
+    df: pd.DataFrame,
+    schema: dict,
+) -> pd.DataFrame:
+    """
+    Cast the columns of df to the logical dtypes recorded in a schema snapshot.
+    Columns that cannot be cast (e.g. integers with missing values) are left as they are.
+    """
+    df = df.copy()
+    for column, dtype in schema.items():
+        if column not in df.columns or str(df[column].dtype) == dtype:
+            continue
+        try:
+            df[column] = df[column].astype(dtype)
+        except (ValueError, TypeError):
+            pass
+    return df
+
 def _check_profile(profile):
     if not profile:
         raise ValueError("This dataset_version is missing a profile.")
 
-def preprocess_dataframe(
-    df: pd.DataFrame,
+def _resolve_include_exclude(
     target: str,
-    profile: dict, 
-    feature_strategy: dict | str = "auto",  
-)-> Tuple[pd.DataFrame, pd.Series]:
-    
+    profile: dict,
+    feature_strategy: dict | str = "auto",
+) -> Tuple[list | None, list]:
+    """
+    Resolve the include/exclude lists of a feature strategy. include is None when all columns are included.
+    """
     if feature_strategy == "auto":
-        include = df.columns
+        include = None
         _check_profile(profile)
         exclude = profile["exclude_suggestions"]
     else:
-        if feature_strategy.get("include", False):
-            include = feature_strategy.get("include")
-        else:
-            include = df.columns
+        include = feature_strategy.get("include") or None
         if feature_strategy.get("exclude", False):
             exclude = feature_strategy.get("exclude")
             if target in exclude:
@@ -42,6 +142,32 @@ def preprocess_dataframe(
         else:
             _check_profile(profile)
             exclude = profile["exclude_suggestions"]
+    return include, exclude
+
+def select_columns(
+    target: str,
+    profile: dict,
+    feature_strategy: dict | str = "auto",
+) -> Callable[[str], bool]:
+    """
+    usecols predicate keeping exactly the columns preprocess_dataframe would keep,
+    so excluded columns are never parsed.
+    """
+    include, exclude = _resolve_include_exclude(target, profile, feature_strategy)
+    include = set(include) if include is not None else None
+    exclude = set(exclude)
+    return lambda column: (include is None or column in include) and column not in exclude
+
+def preprocess_dataframe(
+    df: pd.DataFrame,
+    target: str,
+    profile: dict, 
+    feature_strategy: dict | str = "auto",  
+)-> Tuple[pd.DataFrame, pd.Series]:
+    
+    include, exclude = _resolve_include_exclude(target, profile, feature_strategy)
+    if include is None:
+        include = df.columns
     
     pre_cols = [column for column in df.columns if column in include and column not in exclude]
     df_pre = df[pre_cols]
@@ -22,6 +22,15 @@ def save_metadata(
         print(f"Failed to save metadata: {e}")
         raise
 
-    
 
-    
+def save_metadata_json(
+    metadata_json: str,
+    uri: str,
+)-> str:
+    """
+    Write metadata that is already serialized (the same text that is stored in models.metadata_json).
+    """
+    metadata_path = Path(uri) / "metadata.json"
+    with open(metadata_path, "w") as f:
+        f.write(metadata_json)
+    return str(metadata_path)
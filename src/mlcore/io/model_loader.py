@@ -1,5 +1,8 @@
+from functools import cached_property
 from joblib import load
 from pathlib import Path
+import json
+import numpy as np
 import logging
 logger = logging.getLogger(__name__)
 
@@ -23,3 +26,75 @@ def load_model(
     except Exception as e:
         logger.error(f"[LOAD_MODEL] Failed to load model: {e}")
         raise
+
+
+def load_background(
+    model_uri: str | None = None,
+) -> np.ndarray:
+    """
+    Load the SHAP background sample that was stored next to the model at train time.
+    """
+    if not model_uri:
+        raise ValueError(
+            "Not specified which background to load. Provide a model_uri.")
+
+    background_path = Path(model_uri).with_name("background.npy")
+    if not background_path.exists():
+        raise FileNotFoundError(
+            f"No background sample stored for this model: {background_path}. Retrain the model to enable local explanations.")
+
+    try:
+        background = np.load(background_path, allow_pickle=False)
+        logger.info(f"[LOAD_BACKGROUND] Background loaded from: {background_path}")
+        return background
+    except Exception as e:
+        logger.error(f"[LOAD_BACKGROUND] Failed to load background: {e}")
+        raise
+
+
+def load_explainer_state(
+    model_uri: str | None = None,
+) -> dict | None:
+    """
+    Load the explainer state stored next to the model, or None for models trained without it.
+    """
+    if not model_uri:
+        raise ValueError(
+            "Not specified which explainer state to load. Provide a model_uri.")
+
+    explainer_path = Path(model_uri).with_name("explainer.json")
+    if not explainer_path.exists():
+        return None
+    with open(explainer_path, "r") as f:
+        return json.load(f)
+
+
+class ModelArtifacts:
+    """
+    Lazy view on the files of one trained model (model.joblib, metadata.json,
+    background.npy, explainer.json). Each file is read on first access only,
+    so callers that e.g. only need the metadata never unpickle the model.
+    """
+
+    def __init__(self, model_uri: str):
+        if not model_uri:
+            raise ValueError("No model_uri was provided. Provide a model_uri.")
+        self.model_uri = Path(model_uri)
+
+    @cached_property
+    def model(self):
+        return load_model(model_uri=self.model_uri)
+
+    @cached_property
+    def metadata(self) -> dict:
+        # Imported here to keep model_loader free of the DB dependency of metadata_loader
+        from mlcore.io.metadata_loader import load_metadata
+        return load_metadata(self.model_uri.with_name("metadata.json"))
+
+    @cached_property
+    def background(self) -> np.ndarray:
+        return load_background(model_uri=self.model_uri)
+
+    @cached_property
+    def explainer_state(self) -> dict | None:
+        return load_explainer_state(model_uri=self.model_uri)
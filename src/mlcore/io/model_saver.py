@@ -1,5 +1,12 @@
+from contextlib import contextmanager
 from joblib import dump
 from pathlib import Path
+from typing import Iterator
+import json
+import os
+import shutil
+import uuid
+import numpy as np
 import logging
 logger = logging.getLogger(__name__)
 
@@ -20,6 +27,82 @@ def save_model(
         logger.error(f"[SAVE_MODEL] Failed to save model: {e}")
         raise
 
-    
+def save_background(
+    background: np.ndarray,
+    parent_path: str,
+    explainer_state: dict | None = None,
+)-> str:
+    """
+    Store the (already preprocessed) SHAP background sample as float32 next to
+    model.joblib, so explanations do not need the training data again.
+    Optionally store the explainer state (task, output, feature names, ...) as explainer.json.
+    """
+    base_path = Path(parent_path)
+    base_path.mkdir(parents=True, exist_ok=True)
 
-    
+    background_path = base_path / "background.npy"
+    explainer_path = base_path / "explainer.json"
+
+    try:
+        background = np.asarray(background, dtype=np.float32)
+        np.save(background_path, background, allow_pickle=False)
+        logger.info(f"[SAVE_BACKGROUND] Background saved successfully to {background_path!s}")
+        if explainer_state is not None:
+            explainer_state = {
+                **explainer_state,
+                "background": {
+                    **explainer_state.get("background", {}),
+                    "file": background_path.name,
+                    "n_rows": int(background.shape[0]),
+                    "n_features": int(background.shape[1]),
+                    "dtype": str(background.dtype),
+                },
+            }
+            with open(explainer_path, "w") as f:
+                json.dump(explainer_state, f, indent=4)
+            logger.info(f"[SAVE_BACKGROUND] Explainer state saved successfully to {explainer_path!s}")
+        return str(background_path)
+    except Exception as e:
+        logger.error(f"[SAVE_BACKGROUND] Failed to save background: {e}")
+        raise
+
+
+@contextmanager
+def staged_model_dir(final_dir: str) -> Iterator[Path]:
+    """
+    Temporary sibling directory of final_dir to write the artifacts of a model into.
+    Same filesystem, so publish_model_dir is a rename. Removed again unless it was published.
+    """
+    final_dir = Path(final_dir)
+    staging_dir = final_dir.with_name(f".{final_dir.name}.{uuid.uuid4().hex}.tmp")
+    staging_dir.mkdir(parents=True)
+    try:
+        yield staging_dir
+    finally:
+        if staging_dir.exists():
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def publish_model_dir(
+    staging_dir: str,
+    final_dir: str,
+) -> str:
+    """
+    Move staged artifacts to final_dir with a rename, so readers see all files of a model or none.
+    An existing final_dir (model id trained again) is moved aside first and removed afterwards.
+    """
+    final_dir = Path(final_dir)
+    replaced = None
+    if final_dir.exists():
+        replaced = final_dir.with_name(f".{final_dir.name}.{uuid.uuid4().hex}.old")
+        os.rename(final_dir, replaced)
+    try:
+        os.rename(staging_dir, final_dir)
+    except Exception:
+        if replaced is not None:
+            os.rename(replaced, final_dir)
+        raise
+    if replaced is not None:
+        shutil.rmtree(replaced, ignore_errors=True)
+    logger.info(f"[SAVE_MODEL] Model artifacts published to {final_dir!s}")
+    return str(final_dir)
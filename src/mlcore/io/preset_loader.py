@@ -1,42 +1,141 @@
+import hashlib
 import importlib.util
+import os
+import threading
 from pathlib import Path
 from ..presets import presets_path
 
 
+class PresetRegistry:
+    """
+    Per-process registry of the presets under <base_dir>/<task>/<algorithm>.py.
+    A preset file is read, hashed and executed once and kept as
+    {"build_model", "presets", "version", "source_hash", "path"}; it is only
+    executed again when the file's mtime changes. Listing a task is cached the
+    same way (by the directory mtime) and never imports a preset.
+    """
+
+    def __init__(self, base_dir: str = presets_path):
+        self.base_dir = Path(base_dir)
+        self._lock = threading.Lock()
+        self._presets: dict[tuple[str, str], dict] = {}
+        self._hashes: dict[Path, tuple[int, str]] = {}
+        self._listings: dict[str, tuple[int, list[str]]] = {}
+
+    def _path(self, task: str, algorithm: str) -> Path:
+        path = self.base_dir / task / f"{algorithm}.py"
+        if not path.exists():
+            raise FileNotFoundError(f"Preset not found: {path}")
+        return path
+
+    def list(self, task: str) -> list[str]:
+        """
+        Names of the presets of a task (python files, without private / init files).
+        """
+        task_dir = self.base_dir / task
+        if not task_dir.is_dir():
+            raise ValueError(f"Failed to find a directory for this task {task}.")
+        mtime = task_dir.stat().st_mtime_ns
+        cached = self._listings.get(task)
+        if cached and cached[0] == mtime:
+            return list(cached[1])
+        names = sorted(
+            os.path.splitext(file)[0]
+            for file in os.listdir(task_dir)
+            if file.endswith(".py") and not file.startswith("_")
+        )
+        self._listings[task] = (mtime, names)
+        return list(names)
+
+    def source_hash(self, task: str, algorithm: str) -> str:
+        """
+        sha256 of the preset source (reproducibility, fit fingerprint). Does not import the preset.
+        """
+        path = self._path(task, algorithm)
+        mtime = path.stat().st_mtime_ns
+        cached = self._hashes.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        source_hash = hashlib.sha256(path.read_bytes()).hexdigest()
+        self._hashes[path] = (mtime, source_hash)
+        return source_hash
+
+    def get(self, task: str, algorithm: str) -> dict:
+        """
+        The loaded preset; source_hash is the hash of exactly the source that was executed.
+        """
+        path = self._path(task, algorithm)
+        mtime = path.stat().st_mtime_ns
+        preset = self._presets.get((task, algorithm))
+        if preset and preset["mtime"] == mtime:
+            return preset
+        with self._lock:
+            preset = self._presets.get((task, algorithm))
+            if preset and preset["mtime"] == mtime:
+                return preset
+            preset = self._load(task, algorithm, path, mtime)
+            self._presets[(task, algorithm)] = preset
+            self._hashes[path] = (mtime, preset["source_hash"])
+            return preset
+
+    def _load(self, task: str, algorithm: str, path: Path, mtime: int) -> dict:
+        # Automatically detect the correct top-level package name (src locally, code in Docker)
+        # Use of rsplit because the length from the right side is known, while the length from
+        # left side is unknown.
+        base_pkg = __package__.rsplit(".", 1)[0]
+
+        try:
+            source = path.read_bytes()
+            # Create a specification of the module from */*.py
+            spec = importlib.util.spec_from_file_location(
+                f"{base_pkg}.mlcore.presets.{task}.{algorithm}", path)
+            if spec is None:
+                raise ImportError(f"Could not load spec for {path}")
+            # Create an empty container/module from this specification
+            module = importlib.util.module_from_spec(spec)
+            # Run the bytes that were hashed (not a second read of the file) to populate the module
+            exec(compile(source, str(path), "exec"), module.__dict__)
+
+            # Check if build_model() exists in the created module
+            if not hasattr(module, "build_model"):
+                raise AttributeError(
+                    f"There is no function 'build_model()' in {path.name}")
+        except Exception as e:
+            print(f"Failed to load preset {task}/{algorithm}: {e}")
+            raise
+
+        return {
+            "build_model": module.build_model,
+            "presets": getattr(module, "PRESETS", {}),
+            "version": getattr(module, "VERSION", None),
+            "source_hash": hashlib.sha256(source).hexdigest(),
+            "path": str(path),
+            "mtime": mtime,
+        }
+
+
+_registries: dict[str, PresetRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(base_dir: str = presets_path) -> PresetRegistry:
+    """
+    The process-wide registry of a presets directory.
+    """
+    key = os.path.abspath(base_dir)
+    with _registries_lock:
+        if key not in _registries:
+            _registries[key] = PresetRegistry(key)
+        return _registries[key]
+
+
 def loader(
     task: str,
     algorithm: str,
     base_dir: str = presets_path
 ):
     """
-    Dynamically load and return build_model() from
-    presets/<task>/<algorithm>.py
+    Return build_model() of presets/<task>/<algorithm>.py (imported once per process,
+    see PresetRegistry).
     """
-    path = Path(base_dir) / task / f"{algorithm}.py"
-    if not path.exists():
-        raise FileNotFoundError(f"Preset not found: {path}")
-    
-    # Automatically detect the correct top-level package name (src locally, code in Docker)
-    # Use of rsplit because the length from the right side is known, while the length from
-    # left side is unknown.
-    base_pkg = __package__.rsplit(".",1)[0]
-
-    try:
-        # Create a specification of the module from */*.py
-        spec = importlib.util.spec_from_file_location(
-            f"{base_pkg}.mlcore.presets.{task}.{algorithm}", path)
-        if spec is None or spec.loader is None:
-            raise ImportError(f"Could not load spec for {path}")
-        # Create an empty container/module from this specification
-        module = importlib.util.module_from_spec(spec)
-        # Run all top-level code to populate the module
-        spec.loader.exec_module(module)
-
-        # Check if build_model() exists in the created module
-        if not hasattr(module, "build_model"):
-            raise AttributeError(
-                f"There is no function 'build_model()' in {path.name}")
-        return module.build_model
-    except Exception as e:
-        print(f"Failed to load preset {task}/{algorithm}: {e}")
-        raise
+    return get_registry(base_dir).get(task, algorithm)["build_model"]
@@ -0,0 +1,59 @@
+import threading
+from . import csv_index
+from .csv_index import get_row_index, read_csv_window
+
+
+def write_csvs(tmp_path, n):
+    uris = []
+    for i in range(n):
+        path = tmp_path / f"data{i}.csv"
+        path.write_text("a,b\n" + "".join(f"{row},{i}\n" for row in range(20)))
+        uris.append(str(path))
+    return uris
+
+
+def test_entry_evicted_by_another_thread_during_lookup(tmp_path, monkeypatch):
+    monkeypatch.setattr(csv_index, "INDEX_CACHE_SIZE", 2)
+    uris = write_csvs(tmp_path, 3)
+    get_row_index(uris[0])
+    signature = csv_index._file_signature
+    evicted = []
+
+    def signature_racing_with_eviction(uri):
+        # While this lookup checks the file, another request fills the cache and evicts uri
+        if uri == uris[0] and not evicted:
+            evicted.append(uri)
+            other = threading.Thread(target=lambda: [get_row_index(u) for u in uris[1:]])
+            other.start()
+            other.join()
+        return signature(uri)
+
+    monkeypatch.setattr(csv_index, "_file_signature", signature_racing_with_eviction)
+    assert get_row_index(uris[0])["n_rows"] == 20
+    assert evicted == [uris[0]]
+    assert len(csv_index._index_cache) <= 2
+
+
+def test_row_index_cache_under_concurrent_requests(tmp_path, monkeypatch):
+    monkeypatch.setattr(csv_index, "INDEX_CACHE_SIZE", 2)
+    uris = write_csvs(tmp_path, 6)
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(200):
+                assert get_row_index(uris[(n + i) % len(uris)])["n_rows"] == 20
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(csv_index._index_cache) <= 2
+    df, total = read_csv_window(uris[3], offset=5, limit=2)
+    assert total == 20
+    assert df["a"].tolist() == [5, 6]
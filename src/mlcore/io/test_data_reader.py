@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+from .data_reader import get_dataframe_from_csv, is_float32_exact
+
+
+def test_is_float32_exact():
+    assert is_float32_exact(pd.Series([0.5, 1.25, np.nan, -3.0]))
+    assert not is_float32_exact(pd.Series([0.5, 123456.789]))
+    assert not is_float32_exact(pd.Series([0.1]))
+    assert not is_float32_exact(pd.Series([1e300]))
+    assert not is_float32_exact(pd.Series([1, 2], dtype=np.int64))
+
+
+def test_compact_load_keeps_float_values(tmp_path):
+    uri = tmp_path / "data.csv"
+    pd.DataFrame({
+        "exact": [0.5, 1.25, np.nan],
+        "lossy": [123456.789, 0.1, 2.0],
+    }).to_csv(uri, index=False)
+    profile = {"columns": {
+        "exact": {"semantic_type": "numeric", "dtype_raw": "float64", "missing_pct": 33.3},
+        "lossy": {"semantic_type": "numeric", "dtype_raw": "float64", "missing_pct": 0},
+    }}
+
+    df = get_dataframe_from_csv(str(uri), profile=profile)
+
+    assert df["exact"].dtype == np.float32
+    assert df["lossy"].dtype == np.float64
+    pd.testing.assert_series_equal(df["lossy"], pd.read_csv(uri)["lossy"])
@@ -0,0 +1,28 @@
+import pytest
+from .model_saver import publish_model_dir, staged_model_dir
+
+
+def test_staged_dir_is_published_with_a_rename(tmp_path):
+    final_dir = tmp_path / "problem" / "model"
+    final_dir.mkdir(parents=True)
+    (final_dir / "model.joblib").write_text("old")
+
+    with staged_model_dir(final_dir) as staging_dir:
+        (staging_dir / "model.joblib").write_text("new")
+        (staging_dir / "metadata.json").write_text("{}")
+        publish_model_dir(staging_dir, final_dir)
+
+    assert (final_dir / "model.joblib").read_text() == "new"
+    # Only the model directory is left: no staging or replaced directories
+    assert [p.name for p in final_dir.parent.iterdir()] == ["model"]
+
+
+def test_failed_staging_leaves_nothing_behind(tmp_path):
+    final_dir = tmp_path / "problem" / "model"
+
+    with pytest.raises(RuntimeError):
+        with staged_model_dir(final_dir) as staging_dir:
+            (staging_dir / "model.joblib").write_text("partial")
+            raise RuntimeError("fit crashed")
+
+    assert list(final_dir.parent.iterdir()) == []
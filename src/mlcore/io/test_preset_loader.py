@@ -0,0 +1,42 @@
+import hashlib
+import os
+from .preset_loader import PresetRegistry
+
+PRESET = '''
+PRESETS = {"n_estimators": {"fast": %d}}
+
+def build_model(*args, **kwargs):
+    return PRESETS
+'''
+
+
+def write_preset(path, n_estimators, mtime_ns):
+    path.write_text(PRESET % n_estimators)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_preset_is_imported_once_and_reloaded_on_change(tmp_path):
+    (tmp_path / "classification").mkdir()
+    path = tmp_path / "classification" / "forest.py"
+    write_preset(path, 100, 1_000_000_000)
+    registry = PresetRegistry(str(tmp_path))
+
+    first = registry.get("classification", "forest")
+    assert registry.get("classification", "forest") is first
+    assert first["presets"] == {"n_estimators": {"fast": 100}}
+    assert first["source_hash"] == hashlib.sha256(path.read_bytes()).hexdigest()
+    assert registry.source_hash("classification", "forest") == first["source_hash"]
+
+    write_preset(path, 200, 2_000_000_000)
+    second = registry.get("classification", "forest")
+    assert second["build_model"]() == {"n_estimators": {"fast": 200}}
+    assert second["source_hash"] != first["source_hash"]
+
+
+def test_list_skips_private_files(tmp_path):
+    task_dir = tmp_path / "regression"
+    task_dir.mkdir()
+    for name in ("ridge.py", "auto.py", "__init__.py", "_helpers.py", "notes.txt"):
+        (task_dir / name).write_text("")
+
+    assert PresetRegistry(str(tmp_path)).list("regression") == ["auto", "ridge"]
@@ -2,7 +2,7 @@ import json
 from typing import Any
 import pandas as pd
 from pathlib import Path
-from mlcore.io.data_reader import get_dataframe_from_csv
+from mlcore.io.data_reader import get_dataframe_from_csv, coerce_to_schema
 from mlcore.io.model_loader import load_model
 from mlcore.io.metadata_loader import load_metadata
 from db.db import get_ml_problem, get_model, create_prediction, update_prediction
@@ -17,7 +17,13 @@ def predict(
     input_uri: str | None = None,
     problem_id: str | None = None,
     model_id: str | None = "production",
+    persist: bool = True,
 ) -> tuple[pd.DataFrame, Any, dict]:
+    """
+    Predict with a model (or the production model of a problem).
+    persist=False skips writing the prediction row, for callers that store it themselves
+    (the worker buffers the write, see worker/prediction_writer.py).
+    """
 
     if input_df is None and not input_uri:
         raise ValueError(
@@ -27,13 +33,6 @@ def predict(
         raise ValueError(
             "Not specified which model to load. Provide a problem_id or a model_id.")
 
-    if input_uri:
-        X = get_dataframe_from_csv(input_uri)
-    else:
-        X = input_df
-    if X is None:
-        raise ValueError("Input resolved to None.")
-
     if model_id == "production":
         problem = get_ml_problem(problem_id)
         if not problem.get("current_model_id"):
@@ -55,9 +54,6 @@ def predict(
         metadata = load_metadata(metadata_path)
         target = metadata.get("target")
 
-    if target in X.columns:
-        X = X.drop(columns=[target])
-
     # Check schema snapshot and feature order and compare with X -> reorder if needed
     schema_snapshot = metadata.get("schema_snapshot")
     if not schema_snapshot:
@@ -66,6 +62,18 @@ def predict(
     if not feature_order:
         raise ValueError("schema_snapshot.feature_order is missing from model metadata.")
 
+    if input_uri:
+        # Only parse the columns the model uses
+        features = set(feature_order)
+        X = get_dataframe_from_csv(input_uri, usecols=lambda column: column in features)
+    else:
+        X = input_df
+    if X is None:
+        raise ValueError("Input resolved to None.")
+
+    if target in X.columns:
+        X = X.drop(columns=[target])
+
     input_order = list(X.columns)
 
     # Empty or invalid columns names check
@@ -92,6 +100,7 @@ def predict(
 
     # Reorder to training order for safety (X.drop is integrated here)
     X = X[feature_order]
+    X = coerce_to_schema(X, schema_snapshot.get("X", {}))
 
     y_pred = model.predict(X)
 
@@ -106,6 +115,9 @@ def predict(
         "model_metadata": metadata,
     }
 
+    if not persist:
+        return X, y_pred, prediction_summary
+
     if input_df is None:
         inputs_to_store = None
     else:
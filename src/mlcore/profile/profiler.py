@@ -200,6 +200,15 @@ def _analyse_column(
         return column_summary
 
 
+def suggest_exclusions(
+    columns: dict,
+) -> list:
+    """
+    Columns suggested for exclusion: those the column analysis flagged with exclude_for_analysis.
+    """
+    return [column for column, summary in columns.items() if summary.get("exclude_for_analysis")]
+
+
 def suggest_profile(
     df: pd.DataFrame,
 ) -> dict:
@@ -229,8 +238,7 @@ def suggest_profile(
         columns[column] = _analyse_column(df[column])
         if columns[column]["is_unique"]:
             profile["id_candidates"].append(column)
-        if columns[column]["exclude_for_analysis"]:
-            profile["exclude_suggestions"].append(column)
 
+    profile["exclude_suggestions"] = suggest_exclusions(columns)
     profile["columns"] = columns
     return profile
@@ -1,4 +1,4 @@
-from .profiler import suggest_profile, suggest_schema
+from .profiler import suggest_exclusions, suggest_profile, suggest_schema
 from mlcore.io.data_reader import get_dataframe_from_csv
 import pandas as pd
 
@@ -10,5 +10,11 @@ def test_suggest_profile():
     assert isinstance(profile, dict)
 
 
+def test_suggest_exclusions_matches_profile():
+    df = get_dataframe_from_csv("./testdata/test_train.csv")
+    profile = suggest_profile(pd.DataFrame(df))
+    assert suggest_exclusions(profile["columns"]) == profile["exclude_suggestions"]
+
+
 if __name__ == "__main__":
     test_suggest_profile()
@@ -0,0 +1,58 @@
+import hashlib
+import json
+from mlcore.io.preset_loader import get_registry
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(
+    uri: str,
+    chunk_size: int = CHUNK_SIZE,
+) -> str:
+    """
+    sha256 of the file content, read in chunks so large datasets do not have to fit in memory.
+    """
+    if not uri:
+        raise ValueError("No uri was provided. Provide a uri.")
+    sha = hashlib.sha256()
+    with open(uri, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def hash_preset_source(
+    task: str,
+    algorithm: str,
+    base_dir: str,
+) -> str:
+    """
+    sha256 of the preset file, so a changed preset never reuses an old fit.
+    Cached by the preset registry until the file changes.
+    """
+    return get_registry(base_dir).source_hash(task, algorithm)
+
+
+def compute_fingerprint(
+    dataset_hash: str,
+    profile: dict,
+    feature_strategy: dict | str,
+    preset_hash: str,
+    hyperparameters: dict,
+    random_seed: int,
+) -> str:
+    """
+    Deterministic fingerprint of everything that influences a fit.
+    Two train requests with the same fingerprint produce the same model.
+    """
+    payload = {
+        "dataset_hash": dataset_hash,
+        "profile": profile,
+        "feature_strategy": feature_strategy,
+        "preset_hash": preset_hash,
+        "hyperparameters": hyperparameters,
+        "random_seed": random_seed,
+    }
+    # sort_keys + compact separators -> the same payload always serializes to the same bytes
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
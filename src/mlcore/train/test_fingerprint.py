@@ -0,0 +1,20 @@
+from .fingerprint import compute_fingerprint, hash_file
+
+
+def test_compute_fingerprint():
+    dataset_hash = hash_file("./testdata/test_train.csv")
+    args = dict(
+        dataset_hash=dataset_hash,
+        profile={"age": {"type": "numeric"}},
+        feature_strategy="auto",
+        preset_hash="abc",
+        hyperparameters={"algorithm": "random_forest", "train_mode": "fast"},
+        random_seed=42,
+    )
+    fingerprint = compute_fingerprint(**args)
+    assert fingerprint == compute_fingerprint(**args)
+    assert fingerprint != compute_fingerprint(**{**args, "random_seed": 0})
+
+
+if __name__ == "__main__":
+    test_compute_fingerprint()
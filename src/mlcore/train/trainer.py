@@ -1,19 +1,17 @@
-from sklearn.pipeline import Pipeline
-from mlcore.io.preset_loader import loader
-from mlcore.io.data_reader import get_dataframe_from_csv, preprocess_dataframe, get_semantic_types
-from mlcore.io.model_saver import save_model
-from mlcore.io.metadata_saver import save_metadata
+from mlcore.io.preset_loader import get_registry
+from mlcore.io.data_reader import get_dataframe_from_csv, preprocess_dataframe, get_semantic_types, logical_dtype, select_columns
+from mlcore.io.model_saver import save_model, save_background, staged_model_dir, publish_model_dir
+from mlcore.io.metadata_saver import save_metadata_json
 from mlcore.profile.profiler import suggest_profile
-from mlcore.explain.explanator import explain_model
-from mlcore.metrics.metrics_calculator import calculate_metrics
-from mlcore.metrics.cv_calculator import calculate_cv
+from mlcore.explain.explanator import explain_model, build_background
 from mlcore.explain.get_feature_names import get_feature_names
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-from typing import Literal, Tuple
+from typing import Callable, Literal, Tuple
 import pandas as pd
-from db.db import db_get_dataset_version, get_ml_problem, create_model, update_model
+from mlcore.train.fingerprint import compute_fingerprint, hash_file, hash_preset_source
+from db.db import db_get_dataset_version, get_ml_problem, get_model_by_fingerprint, build_model_uri, register_model
 import json
+import shutil
+import uuid
 from pathlib import Path
 import logging
 logger = logging.getLogger(__name__)
@@ -22,6 +20,98 @@ BASE_DIR = "./testdata/models"
 PRESET_DIR = "/code/mlcore/presets"
 NAME = None
 
+def _finalize_model(
+    write_artifacts: Callable[[Path], None],
+    metadata: dict,
+    metrics: dict,
+    explanation: dict,
+    name: str,
+    problem_id: str,
+    model_id: str | None,
+    model_uri: str | None,
+    algorithm: str,
+    train_mode: str,
+    evaluation_strategy: str,
+    fingerprint: str,
+) -> Tuple[str, str]:
+    """
+    Register a trained model in one step. The metadata is serialized once, for metadata.json
+    and the DB row. write_artifacts fills a temporary directory, which is renamed to the model
+    directory inside the DB transaction that writes the model row, so a crash leaves either
+    a complete model or nothing registered (the row the API created stays "training").
+    """
+    if not model_id and not model_uri:
+        model_id = str(uuid.uuid4())
+        model_uri = build_model_uri(problem_id, model_id)
+    parent_path = Path(model_uri).parent
+    metadata["model_id"] = model_id
+    metadata["model_uri"] = (parent_path / "model.joblib").as_posix()
+    metadata_json = json.dumps(metadata)
+
+    with staged_model_dir(parent_path) as staging_path:
+        write_artifacts(staging_path)
+        save_metadata_json(metadata_json, staging_path)
+        register_model(
+            {
+                "id": model_id,
+                "problem_id": problem_id,
+                "name": name,
+                "algorithm": algorithm,
+                "train_mode": train_mode,
+                "evaluation_strategy": evaluation_strategy,
+                "status": "staging",
+                "metrics_json": json.dumps(metrics),
+                "uri": model_uri,
+                "metadata_json": metadata_json,
+                "explanation_json": json.dumps(explanation),
+                "fingerprint": fingerprint,
+                "created_by": NAME,
+            },
+            publish=lambda: publish_model_dir(staging_path, parent_path),
+        )
+    logger.info(f"[SAVE_MODEL] Model registered: {model_id} at {model_uri}")
+    return model_id, model_uri
+
+def _clone_model(
+    source: dict,
+    name: str,
+    problem_id: str,
+    model_id: str | None,
+    model_uri: str | None,
+    train_mode: str,
+    evaluation_strategy: str,
+) -> Tuple[str, str]:
+    """
+    Register a copy of an already trained model (same fingerprint) under a new model id.
+    """
+    def _load(raw):
+        return json.loads(raw) if isinstance(raw, str) else (raw or {})
+
+    metadata = _load(source.get("metadata_json"))
+    metadata["model_name"] = name
+    metadata["cloned_from"] = source["id"]
+
+    def write_artifacts(path: Path):
+        # Copy every artifact (model, background, explainer state); the metadata is rewritten
+        shutil.copytree(Path(source["uri"]).parent, path, dirs_exist_ok=True)
+
+    model_id, model_uri = _finalize_model(
+        write_artifacts=write_artifacts,
+        metadata=metadata,
+        metrics=_load(source.get("metrics_json")),
+        explanation=_load(source.get("explanation_json")),
+        name=name,
+        problem_id=problem_id,
+        model_id=model_id,
+        model_uri=model_uri,
+        algorithm=source["algorithm"],
+        train_mode=train_mode,
+        evaluation_strategy=evaluation_strategy,
+        fingerprint=source["fingerprint"],
+    )
+    logger.info(f"[TRAIN] model {source['id']} cloned to {model_id}")
+    return model_id, model_uri
+
 def train(
     name: str,
     problem_id: str,
@@ -34,19 +124,31 @@ def train(
     test_size_ratio: float = 0.2,
     random_seed: int = 42,
     preset_dir: str = PRESET_DIR,
+    background_method: Literal["sample", "kmeans"] = "sample",
+    persist_background: bool = True,
+    reuse_fit: bool = True,
 ) -> Tuple[str, str]:
+    # sklearn is imported here, not at module level: importing the trainer (worker startup)
+    # stays cheap, and fit-cache hits never load it
+    from sklearn.model_selection import train_test_split
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import LabelEncoder
+    from mlcore.metrics.cv_calculator import calculate_cv
+    from mlcore.metrics.metrics_calculator import calculate_metrics
 
     problem = get_ml_problem(problem_id)
     dataset_version_id = problem.get("dataset_version_id", False)
     target = problem.get("target", False)
+    task = problem.get("task")
     dataset_version = db_get_dataset_version(dataset_version_id)
+    dataset_uri = dataset_version.get("uri", False)
 
-    df = get_dataframe_from_csv(
-        dataset_version.get("uri", False))
+    df = None
     raw_profile = dataset_version.get("profile_json")
     profile = json.loads(raw_profile) if isinstance(
         raw_profile, str) else raw_profile
     if not profile:
+        df = get_dataframe_from_csv(dataset_uri)
         profile = suggest_profile(pd.DataFrame(df))
     # multi_class = profile.get("columns", {}).get(
     #     target, {}).get("cardinality", 0) > 2
@@ -57,9 +159,51 @@ def train(
     else:
         feature_strategy = "auto"
 
+    fingerprint = compute_fingerprint(
+        # content_hash is computed at upload; older versions are hashed here
+        dataset_hash=dataset_version.get("content_hash") or hash_file(dataset_uri),
+        profile=profile,
+        feature_strategy=feature_strategy,
+        preset_hash=hash_preset_source(task, algorithm.lower(), preset_dir),
+        hyperparameters={
+            "task": task,
+            "target": target,
+            "algorithm": algorithm.lower(),
+            "train_mode": train_mode,
+            "evaluation_strategy": evaluation_strategy,
+            "explain": explain,
+            "test_size_ratio": test_size_ratio,
+            "background_method": background_method,
+            "persist_background": persist_background,
+        },
+        random_seed=random_seed,
+    )
+
+    # Fit cache: an identical request was already trained -> clone it instead of fitting again
+    if reuse_fit:
+        cached_model = get_model_by_fingerprint(problem_id, fingerprint)
+        if cached_model and cached_model.get("uri") and Path(cached_model["uri"]).exists():
+            logger.info(f"[TRAIN] fingerprint match, cloning model {cached_model['id']}")
+            return _clone_model(
+                source=cached_model,
+                name=name,
+                problem_id=problem_id,
+                model_id=model_id,
+                model_uri=model_uri,
+                train_mode=train_mode,
+                evaluation_strategy=evaluation_strategy,
+            )
+
+    if df is None:
+        # Only parse the columns that survive the feature strategy (plus the target)
+        df = get_dataframe_from_csv(
+            dataset_uri,
+            profile=profile,
+            usecols=select_columns(target, profile, feature_strategy),
+        )
+
     X, y = preprocess_dataframe(df, target, profile, feature_strategy)
     semantic_types = get_semantic_types(X, profile)
-    task = problem.get("task")
 
     categorical = semantic_types["categorical"]
     numeric = semantic_types["numeric"]
@@ -83,7 +227,8 @@ def train(
         y_train = label_encoder.transform(y_train)
         y_test = label_encoder.transform(y_test)
 
-    build_model = loader(task, algorithm.lower(), preset_dir)
+    preset = get_registry(preset_dir).get(task, algorithm.lower())
+    build_model = preset["build_model"]
 
     model, metadata = build_model(categorical, numeric, boolean, train_mode)
 
@@ -119,6 +264,14 @@ def train(
             metadata["cross_validation"] = cv
         logger.info("[TRAIN] CV done")
 
+    # Background sample for SHAP, drawn once and persisted with the model so
+    # local explanations later only pay for the attribution itself.
+    # Skipped when neither the global explanation nor local explanations will use it.
+    background = None
+    if explain or persist_background:
+        background = build_background(
+            pre, X_train, n_ref_max=200, random_seed=random_seed, method=background_method)
+
     explaination_summary = {}
     label_classes = None
     if task == "classification":
@@ -140,13 +293,12 @@ def train(
         metadata["feature_names"] = feature_names
         metadata["feature_parents"] = feature_parents
 
-        X_train_shap = pre.transform(X_train)
         X_test_shap = pre.transform(X_test)
         # explanation = explain_model(task, model_shap, X_train_shap, X_test_shap)
         explaination_summary = explain_model(
             task=task,
             model=model_shap,
-            X_train=X_train_shap,
+            X_train=None,
             X_test=X_test_shap,
             feature_names=feature_names,
             feature_parents=feature_parents,
@@ -156,56 +308,31 @@ def train(
             top_k=30,
             include_distributions=True,
             random_seed=random_seed,
+            X_ref=background,
         )
         logger.info("[TRAIN] explain done")
 
     metadata["model_name"] = name
     metadata["problem_id"] = problem_id
     metadata["target"] = target
+    # Logical dtypes (not the compact in-memory ones) so prediction inputs are coerced identically
     metadata["schema_snapshot"]["X"] = {
-        column: str(X[column].dtype) for column in X.columns
+        column: logical_dtype(X[column].dtype) for column in X.columns
     }
     metadata["schema_snapshot"]["y"] = {
-        y.name: str(y.dtype)
+        y.name: logical_dtype(y.dtype)
     }
     metadata["schema_snapshot"]["feature_order"] = list(X.columns)
     metadata["metrics"] = metrics
+    metadata["fingerprint"] = fingerprint
+    # Hash of the preset source that built this model (reproducibility)
+    metadata["preset_hash"] = preset["source_hash"]
     if explaination_summary:
         metadata["explanation"] = explaination_summary
     
     if task == "classification":
         metadata["label_classes"] = label_classes
 
-    if not model_id and not model_uri:
-        model_id, model_uri = create_model(
-            problem_id=problem_id,
-            algorithm=algorithm.lower(),
-            status="staging",
-            train_mode=train_mode,
-            evaluation_strategy=evaluation_strategy,
-            metrics_json=metrics,
-            uri=None,
-            metadata_json=metadata,
-            explanation_json=explaination_summary,
-            created_by=NAME,
-            name=name,
-        )
-        metadata["model_id"] = model_id
-        metadata["model_uri"] = model_uri
-    else:
-        metadata["model_id"] = model_id
-        metadata["model_uri"] = model_uri
-        update_model(
-            model_id=model_id,
-            status="staging",
-            metrics_json=json.dumps(metrics),
-            uri=model_uri,
-            metadata_json=json.dumps(metadata),
-            explanation_json=json.dumps(explaination_summary),
-        )
-
-    parent_path = Path(model_uri).parent
-
     if algorithm.lower() == "auto":
         model_to_save = Pipeline([
             ("pre", pre),
@@ -214,15 +341,32 @@ def train(
     else:
         model_to_save = model
 
-    if save_model(model_to_save, parent_path):
-        logger.info(f"[SAVE_MODEL] Model saved at: {model_uri}")
-        if save_metadata(metadata, parent_path):
-            logger.info(f"[SAVE_MODEL_METADATA] Model's metadata saved at: {model_uri}")
-            return model_id, model_uri
-        else:
-            logger.error(f"[SAVE_MODEL_METADATA] Failed to save model's metadata at: {model_uri}")
-            raise RuntimeError(
-                f"Failed to save the model's metadata at {parent_path}")
-    else:
-        logger.error(f"[SAVE_MODEL] Failed to save model at: {model_uri}")
-        raise RuntimeError(f"Failed to save the model at {parent_path}")
+    def write_artifacts(path: Path):
+        save_model(model_to_save, path)
+        if persist_background:
+            feature_info = get_feature_names(pre)
+            explainer_state = {
+                "task": task,
+                "explainer": "auto",
+                "model_output": "predict_proba" if task == "classification" else "predict",
+                "feature_names": feature_info["feature_names"],
+                "feature_parents": feature_info["feature_parents"],
+                "label_classes": label_classes,
+                "background": {"method": background_method, "random_seed": random_seed},
+            }
+            save_background(background, path, explainer_state)
+
+    return _finalize_model(
+        write_artifacts=write_artifacts,
+        metadata=metadata,
+        metrics=metrics,
+        explanation=explaination_summary,
+        name=name,
+        problem_id=problem_id,
+        model_id=model_id,
+        model_uri=model_uri,
+        algorithm=algorithm.lower(),
+        train_mode=train_mode,
+        evaluation_strategy=evaluation_strategy,
+        fingerprint=fingerprint,
+    )
@@ -0,0 +1,57 @@
+"""
+Import-time budgets of the worker and API entry points, measured with python -X importtime
+in a fresh interpreter. Heavy ML libraries must only be imported at the point of use.
+"""
+import os
+import subprocess
+import sys
+import pytest
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(SRC_DIR)
+
+# Never imported at startup (seconds and hundreds of MB each)
+HEAVY_MODULES = ("shap", "sklearn", "xgboost")
+# Cumulative import time budgets in seconds; generous, the module checks are the strict part
+WORKER_BUDGET = 1.5
+API_BUDGET = 2.0
+
+
+def import_times(statement: str, cwd: str) -> dict[str, float]:
+    """
+    Run statement with -X importtime and return the cumulative import time (seconds) per module.
+    """
+    env = dict(os.environ, PYTHONPATH=cwd)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=cwd, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        if "ModuleNotFoundError" in result.stderr:
+            pytest.skip(f"Dependencies missing: {result.stderr.strip().splitlines()[-1]}")
+        raise AssertionError(result.stderr)
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def assert_lazy(times: dict[str, float], entry_point: str, budget: float, heavy: tuple[str, ...]) -> None:
+    loaded = sorted({module.split(".")[0] for module in times} & set(heavy))
+    assert not loaded, f"{entry_point} imports {loaded} at startup; import them where they are used"
+    assert times[entry_point] < budget, f"{entry_point} took {times[entry_point]:.2f}s to import (budget {budget}s)"
+
+
+def test_worker_startup_does_not_import_ml_libraries():
+    times = import_times("import worker.tasks", SRC_DIR)
+    assert_lazy(times, "worker.tasks", WORKER_BUDGET, HEAVY_MODULES)
+
+
+def test_api_startup_does_not_import_ml_libraries():
+    # The API also defers pandas: only the csv/profile routes need it
+    times = import_times("import src.api.main", ROOT_DIR)
+    assert_lazy(times, "src.api.main", API_BUDGET, HEAVY_MODULES + ("pandas",))
@@ -0,0 +1,310 @@
+import fcntl
+import glob
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Callable
+import pymysql
+from db.db import update_predictions
+
+logger = logging.getLogger(__name__)
+
+# Max predictions written per flush cycle before a flush is triggered early
+BATCH_SIZE = int(os.getenv("PREDICTION_BATCH_SIZE", 100))
+# Max seconds a prediction write waits in the buffer
+FLUSH_INTERVAL = float(os.getenv("PREDICTION_FLUSH_INTERVAL", 0.5))
+# Max JSON bytes per INSERT statement (must stay below MySQL's max_allowed_packet)
+BATCH_MAX_BYTES = int(os.getenv("PREDICTION_BATCH_MAX_BYTES", 16 * 1024 * 1024))
+# Journal of buffered writes; must be on persistent storage and not shared across hosts
+JOURNAL_DIR = os.getenv(
+    "PREDICTION_JOURNAL_DIR",
+    os.path.join(os.getenv("MODEL_BASE_PATH", "/models"), ".prediction-journal"),
+)
+# "1": fsync every journal append, so buffered writes also survive an OS crash / power loss
+JOURNAL_FSYNC = os.getenv("PREDICTION_JOURNAL_FSYNC", "0") == "1"
+# Seconds to wait before retrying after a failed flush (e.g. DB unavailable)
+RETRY_DELAY = 1.0
+# Writes the DB rejects for good are appended here (in the journal dir) instead of being retried
+DEAD_LETTER_FILE = "dead-letter.jsonl"
+# Errors caused by the rows themselves: retrying the same row can never succeed
+PERMANENT_ERRORS = (
+    pymysql.err.IntegrityError,
+    pymysql.err.DataError,
+    pymysql.err.ProgrammingError,
+    pymysql.err.NotSupportedError,
+)
+
+
+def _merge(older: dict, newer: dict) -> dict:
+    # Later writes win field by field; None means "unchanged" (as in update_prediction)
+    merged = dict(older)
+    merged.update({key: value for key, value in newer.items() if value is not None})
+    return merged
+
+
+def _chunks(rows: list[dict], max_rows: int, max_bytes: int):
+    chunk, size = [], 0
+    for row in rows:
+        row_size = sum(len(value) for value in row.values() if isinstance(value, str))
+        if chunk and (len(chunk) >= max_rows or size + row_size > max_bytes):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(row)
+        size += row_size
+    if chunk:
+        yield chunk
+
+
+def _dead_letter(journal_dir: str, record: dict, error: Exception) -> None:
+    logger.error(f"[PREDICTIONS] Dropping write of prediction {record.get('id')}, rejected by the DB: {error}")
+    line = json.dumps({"record": record, "error": str(error), "ts": time.time()})
+    try:
+        with open(os.path.join(journal_dir, DEAD_LETTER_FILE), "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        logger.error(f"[PREDICTIONS] Failed to dead-letter prediction {record.get('id')}: {e}")
+
+
+def _write(
+    rows: list[dict],
+    writer: Callable[[list[dict]], int],
+    journal_dir: str,
+) -> tuple[list[dict], list[dict]]:
+    """
+    Write rows in chunks. A chunk rejected by the DB is written again one row at a time, so
+    one bad row does not block the others; rows that still fail with a permanent error are
+    dead-lettered. Returns (rows to retry after a transient error, dead-lettered rows).
+    """
+    retry, dead = [], []
+    chunks = list(_chunks(rows, BATCH_SIZE, BATCH_MAX_BYTES))
+    for i, chunk in enumerate(chunks):
+        try:
+            writer(chunk)
+            continue
+        except PERMANENT_ERRORS as e:
+            logger.warning(f"[PREDICTIONS] Batch of {len(chunk)} predictions rejected, writing them one by one: {e}")
+        except Exception:
+            # DB unavailable: the remaining chunks would fail the same way
+            retry.extend(row for rest in chunks[i:] for row in rest)
+            break
+        for row in chunk:
+            try:
+                writer([row])
+            except PERMANENT_ERRORS as e:
+                _dead_letter(journal_dir, row, e)
+                dead.append(row)
+            except Exception:
+                retry.append(row)
+    return retry, dead
+
+
+def replay_journals(journal_dir: str = JOURNAL_DIR, writer: Callable[[list[dict]], int] = update_predictions) -> int:
+    """
+    Crash recovery: write the journals of dead processes to the DB and remove them.
+    A journal belongs to a live process as long as that process holds the flock on its .lock file.
+    Returns the number of recovered predictions.
+    """
+    recovered = 0
+    for lock_path in sorted(glob.glob(os.path.join(journal_dir, "*.lock"))):
+        journal_path = lock_path[: -len(".lock")] + ".jsonl"
+        try:
+            lock_file = open(lock_path, "a")
+        except FileNotFoundError:
+            continue
+        try:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue  # owner still running
+
+            records: dict[str, dict] = {}
+            if os.path.exists(journal_path):
+                with open(journal_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # Torn last line of a process killed mid-append; that write never returned
+                            logger.warning(f"[PREDICTIONS] Skipping unreadable journal line in {journal_path}")
+                            continue
+                        records[record["id"]] = _merge(records.get(record["id"], {}), record)
+
+            retry, dead = _write(list(records.values()), writer, journal_dir)
+            if retry:
+                logger.warning(f"[PREDICTIONS] Journal replay of {journal_path} failed, keeping it")
+                continue
+            recovered += len(records) - len(dead)
+            if os.path.exists(journal_path):
+                os.remove(journal_path)
+            os.remove(lock_path)
+        finally:
+            lock_file.close()
+    if recovered:
+        logger.info(f"[PREDICTIONS] Recovered {recovered} predictions from journals in {journal_dir}")
+    return recovered
+
+
+class PredictionWriter:
+    """
+    Write-behind buffer for prediction rows, shared by all tasks of a worker process.
+    submit() journals the write and returns; a background thread coalesces the buffered writes
+    per prediction id and flushes them as multi-row updates every FLUSH_INTERVAL seconds or
+    once BATCH_SIZE predictions are waiting.
+
+    Durability: a submitted write is in the journal (page cache, or on disk with
+    PREDICTION_JOURNAL_FSYNC=1) before submit() returns. If the process dies before the flush,
+    the next worker process that starts replays the journal (replay_journals). on_flushed
+    callbacks run after the rows are in the DB; they are not replayed after a crash.
+    Writes the DB rejects for good (see PERMANENT_ERRORS) are dead-lettered, not retried;
+    writes of deleted predictions are dropped by update_predictions.
+    """
+
+    def __init__(
+        self,
+        journal_dir: str = JOURNAL_DIR,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        writer: Callable[[list[dict]], int] = update_predictions,
+    ):
+        self.journal_dir = journal_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.writer = writer
+        self._lock = threading.Lock()
+        # Serializes flushes, so two writes of the same prediction never reach the DB out of order
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+        self._pending: dict[str, dict] = {}
+        # (prediction id, on_flushed)
+        self._callbacks: list[tuple[str, Callable[[], None]]] = []
+        self._journal = None
+        self._journal_path = None
+        self._lock_file = None
+        self._written = 0
+        self._failed = 0
+        self._dead_lettered = 0
+
+    def start(self) -> None:
+        """
+        Replay journals of dead processes and start the flush thread (idempotent per process).
+        """
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            os.makedirs(self.journal_dir, exist_ok=True)
+            replay_journals(self.journal_dir, self.writer)
+
+            # Unique per start: after a container restart hostname and pid repeat, and the journal
+            # of the previous process may have been kept (replay failed); it must not be reused
+            name = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex}"
+            self._journal_path = os.path.join(self.journal_dir, f"{name}.jsonl")
+            # Lock before the file gets its visible name, so a replaying process never sees it unlocked
+            tmp_lock_path = os.path.join(self.journal_dir, f".{uuid.uuid4()}.tmp")
+            self._lock_file = open(tmp_lock_path, "a")
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            os.replace(tmp_lock_path, os.path.join(self.journal_dir, f"{name}.lock"))
+            self._journal = open(self._journal_path, "x", encoding="utf-8")
+
+            self._pending, self._callbacks = {}, []
+            self._written = self._failed = self._dead_lettered = 0
+            self._wake = threading.Event()
+            self._flush_lock = threading.Lock()
+            thread = threading.Thread(target=self._run, name="prediction-writer", daemon=True)
+            thread.start()
+            self._pid = os.getpid()
+
+    def submit(self, record: dict, on_flushed: Callable[[], None] | None = None) -> None:
+        """
+        Buffer a prediction write: record has "id" plus the columns to set (JSON columns as JSON text).
+        on_flushed runs once the write is in the DB (e.g. to publish the job event).
+        """
+        self.start()
+        line = json.dumps(record)
+        with self._lock:
+            self._journal.write(line + "\n")
+            self._journal.flush()
+            if JOURNAL_FSYNC:
+                os.fsync(self._journal.fileno())
+            self._pending[record["id"]] = _merge(self._pending.get(record["id"], {}), record)
+            if on_flushed is not None:
+                self._callbacks.append((record["id"], on_flushed))
+            if len(self._pending) >= self.batch_size:
+                self._wake.set()
+
+    def flush(self) -> bool:
+        """
+        Write everything buffered now (e.g. before the process exits). False if writes could
+        not reach the DB; they then stay buffered and journaled for the replay.
+        """
+        if self._pid != os.getpid():
+            return True
+        return self._flush()
+
+    def metrics(self) -> dict:
+        return {
+            "written": self._written,
+            "failed_flushes": self._failed,
+            "dead_lettered": self._dead_lettered,
+            "pending": len(self._pending),
+        }
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(timeout=self.flush_interval)
+            self._wake.clear()
+            if not self._flush():
+                time.sleep(RETRY_DELAY)
+
+    def _flush(self) -> bool:
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return True
+                batch, self._pending = self._pending, {}
+                callbacks, self._callbacks = self._callbacks, []
+
+            retry, dead = _write(list(batch.values()), self.writer, self.journal_dir)
+            retry_ids = {record["id"] for record in retry}
+            dead_ids = {record["id"] for record in dead}
+            if retry:
+                self._failed += 1
+                logger.warning(f"[PREDICTIONS] Writing {len(retry)} of {len(batch)} predictions failed, retrying")
+            with self._lock:
+                # Put the failed writes back under the writes submitted in the meantime
+                for record in retry:
+                    newer = self._pending.get(record["id"])
+                    self._pending[record["id"]] = _merge(record, newer) if newer else record
+                self._callbacks = [item for item in callbacks if item[0] in retry_ids] + self._callbacks
+                if len(retry) < len(batch):
+                    self._rewrite_journal()
+            self._written += len(batch) - len(retry) - len(dead)
+            self._dead_lettered += len(dead)
+
+        for prediction_id, callback in callbacks:
+            if prediction_id in retry_ids or prediction_id in dead_ids:
+                continue
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"[PREDICTIONS] on_flushed callback failed: {e}")
+        return not retry
+
+    def _rewrite_journal(self) -> None:
+        # The flushed writes are in the DB: the journal only needs what is still pending
+        tmp_path = self._journal_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in self._pending.values():
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            if JOURNAL_FSYNC:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self._journal_path)
+        self._journal.close()
+        self._journal = open(self._journal_path, "a", encoding="utf-8")
@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from collections import deque
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Max events waiting to be published per worker process; when full the oldest is dropped
+BUFFER_SIZE = int(os.getenv("EVENT_BUFFER_SIZE", 1000))
+# Max Redis connections per worker process
+POOL_SIZE = int(os.getenv("EVENT_POOL_SIZE", 4))
+# Seconds between two metrics reports (only reported when events were published)
+METRICS_LOG_INTERVAL = float(os.getenv("EVENT_METRICS_LOG_INTERVAL", 60))
+# Redis hash with the last metrics report of every worker process ("<host>:<pid>" -> json),
+# read by the API (GET /events/metrics)
+METRICS_KEY = "events:publisher_metrics"
+# The hash expires when no worker process reported for this long
+METRICS_TTL = int(os.getenv("EVENT_METRICS_TTL", 600))
+# Number of recent publish latencies kept for the percentiles
+LATENCY_WINDOW = 1000
+
+
+class EventPublisher:
+    """
+    Fire-and-forget Redis publisher shared by all tasks of a worker process.
+    publish() only enqueues; a background thread sends the events over a pooled connection.
+    The pool and thread are created lazily per process, so forked (prefork) workers get their own.
+    """
+
+    def __init__(self, url: str, buffer_size: int = BUFFER_SIZE, pool_size: int = POOL_SIZE):
+        self.url = url
+        self.buffer_size = buffer_size
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue: queue.Queue | None = None
+        self._client: redis.Redis | None = None
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._published = 0
+        self._dropped = 0
+        self._failed = 0
+        self._last_metrics_log = time.monotonic()
+
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            pool = redis.ConnectionPool.from_url(self.url, max_connections=self.pool_size, decode_responses=True)
+            self._client = redis.Redis(connection_pool=pool)
+            self._queue = queue.Queue(maxsize=self.buffer_size)
+            self._latencies.clear()
+            self._published = self._dropped = self._failed = 0
+            thread = threading.Thread(target=self._run, name="event-publisher", daemon=True)
+            thread.start()
+            self._pid = os.getpid()
+
+    def publish(self, channel: str, message: str) -> None:
+        """
+        Enqueue a message without blocking the task. Drops the oldest queued event when the buffer is full.
+        """
+        self._ensure_started()
+        item = (channel, message, time.monotonic())
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self._queue.task_done()
+                    self._dropped += 1
+                except queue.Empty:
+                    pass
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """
+        Wait until the buffered events were sent (e.g. before the process exits).
+        """
+        if self._pid != os.getpid():
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+
+    def metrics(self) -> dict:
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> float | None:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 3)
+
+        return {
+            "published": self._published,
+            "dropped": self._dropped,
+            "failed": self._failed,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            # Time from publish() to the Redis PUBLISH returning, in ms
+            "latency_p50_ms": percentile(0.50),
+            "latency_p99_ms": percentile(0.99),
+        }
+
+    def _run(self) -> None:
+        while True:
+            channel, message, enqueued_at = self._queue.get()
+            try:
+                self._client.publish(channel, message)
+                self._published += 1
+                self._latencies.append(time.monotonic() - enqueued_at)
+            except Exception as e:
+                self._failed += 1
+                logger.warning(f"[EVENTS] Failed to publish on {channel}: {e}")
+            finally:
+                self._queue.task_done()
+            self._log_metrics()
+
+    def _log_metrics(self) -> None:
+        now = time.monotonic()
+        if now - self._last_metrics_log >= METRICS_LOG_INTERVAL:
+            self._last_metrics_log = now
+            metrics = self.metrics()
+            logger.info(f"[EVENTS] publisher metrics: {metrics}")
+            try:
+                report = json.dumps({**metrics, "ts": time.time()})
+                self._client.hset(METRICS_KEY, f"{socket.gethostname()}:{os.getpid()}", report)
+                self._client.expire(METRICS_KEY, METRICS_TTL)
+            except Exception as e:
+                logger.warning(f"[EVENTS] Failed to report publisher metrics: {e}")
@@ -3,27 +3,75 @@ import sys  # nopep8
 import os
 import time  # nopep8
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # nopep8
-from db.db import create_model, update_model, update_prediction
+from db.db import archive_predictions, create_model, get_model, get_prediction, update_model
 
 from celery_handler import celery_app
 from mlcore.profile.profiler import suggest_profile
 from mlcore.predict.predictor import predict
 from mlcore.train.trainer import train
+from mlcore.explain.local_explanator import explain_prediction
 from celery import states
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
+import importlib
 import traceback
 from time import sleep
 import pandas as pd
 from typing import Literal
 import json
-import redis
+import atexit
+from worker.publisher import EventPublisher
+from worker.prediction_writer import PredictionWriter
 
 
 REDIS_URL = os.getenv("REDISSERVER", "redis://redis_server:6379")
-CHANNEL = "jobs:global" # f"jobs:user:{user_id}" to add later -> Channel per user
+CHANNEL_PREFIX = "jobs"
+
+# One pooled, non-blocking publisher per worker process
+publisher = EventPublisher(REDIS_URL)
+atexit.register(publisher.flush)
+
+# Write-behind buffer for prediction rows; flushed before the publisher (atexit runs LIFO),
+# since flushing publishes the completion events
+prediction_writer = PredictionWriter()
+atexit.register(prediction_writer.flush)
+
+
+# shap and sklearn are imported on first use (see mlcore.explain / mlcore.train), so workers
+# start fast. "1": import them once in the parent process instead, before the pool forks, so
+# every pool process shares them (copy-on-write) rather than importing them on its first task.
+WORKER_PRELOAD_ML = os.getenv("WORKER_PRELOAD_ML", "0") == "1"
+PRELOAD_MODULES = ("sklearn.pipeline", "sklearn.model_selection", "sklearn.preprocessing", "shap")
+
+
+@worker_init.connect
+def preload_ml_modules(**kwargs):
+    if WORKER_PRELOAD_ML:
+        for module in PRELOAD_MODULES:
+            importlib.import_module(module)
+
+
+@worker_process_init.connect
+def start_prediction_writer(**kwargs):
+    # Replays the journals of crashed worker processes right at startup, not on the first prediction
+    prediction_writer.start()
+
+
+@worker_process_shutdown.connect
+def flush_prediction_writer(**kwargs):
+    prediction_writer.flush()
+    publisher.flush()
+
+def job_channel(payload: dict) -> str:
+    """
+    Topic of a job event: jobs:u:{user_id}:p:{problem_id}:m:{model_id}, unknown parts are "_".
+    The API subscribes with patterns over it (see api/events.py).
+    """
+    user_id, problem_id, model_id = (payload.get(key) or "_" for key in ("user_id", "problem_id", "model_id"))
+    return f"{CHANNEL_PREFIX}:u:{user_id}:p:{problem_id}:m:{model_id}"
 
 def publish_job_event(event: str, payload: dict) -> None:
-    redis_con = redis.Redis.from_url(REDIS_URL, decode_responses=True)
-    redis_con.publish(CHANNEL, json.dumps({"event": event, "job": payload}))
+    # Non-blocking: sent by the process-wide publisher over a pooled connection
+    publisher.publish(job_channel(payload), json.dumps({"event": event, "job": payload}))
 
 
 @celery_app.task(name="hello.task", bind=True)
@@ -71,6 +119,9 @@ def train_task(
     explain: bool = True,
     test_size_ratio: float = 0.2,
     random_seed: int = 42,
+    reuse_fit: bool = True,
+    background_method: Literal["sample", "kmeans"] = "sample",
+    persist_background: bool = True,
 ):
     """
     Celery wrapper around mlcore.train.
@@ -91,6 +142,9 @@ def train_task(
             explain=explain,
             test_size_ratio=test_size_ratio,
             random_seed=random_seed,
+            reuse_fit=reuse_fit,
+            background_method=background_method,
+            persist_background=persist_background,
         )
 
         publish_job_event("job.completed", {
@@ -165,17 +219,34 @@ def predict_task(
             input_uri=input_uri,
             problem_id=problem_id,
             model_id=model_id,
+            persist=False,
         )
 
-        publish_job_event("job.completed", {
+        # Resolved ids: model_id may be "production" and problem_id None on input
+        model_metadata = summary["model_metadata"]
+        resolved_model_id = model_metadata.get("model_id") or model_id
+        event = {
             "type": "predict",
             "status": "completed",
             "prediction_id": prediction_id,
-            "problem_id": problem_id,
-            "model_id": model_id,
+            "problem_id": model_metadata.get("problem_id") or problem_id,
+            "model_id": resolved_model_id,
             "task_id": self.request.id,
             "ts": time.time(),
-        })
+        }
+        # The completion event is published once the row is written, so clients that
+        # react to it read the completed prediction
+        prediction_writer.submit(
+            {
+                "id": prediction_id,
+                "model_id": resolved_model_id if resolved_model_id != "production" else None,
+                "input_uri": input_uri,
+                "inputs_json": json.dumps(input_df.to_dict(orient="records")) if input_df is not None else None,
+                "outputs_json": json.dumps(summary),
+                "status": "completed",
+            },
+            on_flushed=lambda: publish_job_event("job.completed", event),
+        )
 
         return {
             "X": summary["X"],
@@ -191,24 +262,112 @@ def predict_task(
                 "exc_message": traceback.format_exc().split("\n"),
             },
         )
-        update_prediction(
+        failed_problem_id, failed_model_id = _prediction_event_ids(prediction_id, problem_id, model_id)
+        event = {
+            "type": "predict",
+            "status": "failed",
+            "prediction_id": prediction_id,
+            "problem_id": failed_problem_id,
+            "model_id": failed_model_id,
+            "task_id": self.request.id,
+            "ts": time.time(),
+        }
+        prediction_writer.submit(
+            {"id": prediction_id, "status": "failed"},
+            on_flushed=lambda: publish_job_event("job.completed", event),
+        )
+
+        raise
+
+
+def _prediction_event_ids(
+    prediction_id: str,
+    problem_id: str | None,
+    model_id: str | None,
+) -> tuple[str | None, str | None]:
+    """
+    (problem_id, model_id) of a prediction for its events. The task inputs may be
+    model_id="production" and problem_id=None; the prediction row and its model have
+    the resolved ids. Lookup failures keep the inputs (the event must still go out).
+    """
+    try:
+        if model_id in (None, "production"):
+            prediction = get_prediction(prediction_id, load_archived=False) or {}
+            model_id = prediction.get("model_id") or model_id
+        if not problem_id and model_id not in (None, "production"):
+            problem_id = (get_model(model_id) or {}).get("problem_id")
+    except Exception as e:
+        print(f"Failed to resolve the ids of prediction {prediction_id}: {e}")
+    return problem_id, model_id
+
+
+@celery_app.task(name="explain.task", bind=True)
+def explain_task(
+    self,
+    prediction_id: str,
+    rows: list[int],
+    top_k: int = 10,
+):
+    """
+    Celery wrapper around mlcore.explain.local_explanator.
+    Computes local attributions for selected rows of a stored prediction.
+    """
+    try:
+        self.update_state(state="STARTED", meta={"prediction_id": prediction_id})
+
+        explanation = explain_prediction(
             prediction_id=prediction_id,
-            status="failed",
+            rows=rows,
+            top_k=top_k,
         )
 
         publish_job_event("job.completed", {
-            "type": "predict",
+            "type": "explain",
+            "status": "completed",
+            "prediction_id": prediction_id,
+            "problem_id": explanation["problem_id"],
+            "model_id": explanation["model_id"],
+            "task_id": self.request.id,
+            "ts": time.time(),
+        })
+
+        return explanation
+
+    except Exception as ex:
+        self.update_state(
+            state=states.FAILURE,
+            meta={
+                "exc_type": type(ex).__name__,
+                "exc_message": traceback.format_exc().split("\n"),
+            },
+        )
+
+        failed_problem_id, failed_model_id = _prediction_event_ids(prediction_id, None, None)
+        publish_job_event("job.failed", {
+            "type": "explain",
             "status": "failed",
             "prediction_id": prediction_id,
-            "problem_id": problem_id,
-            "model_id": model_id,
+            "problem_id": failed_problem_id,
+            "model_id": failed_model_id,
             "task_id": self.request.id,
+            "error": str(ex),
             "ts": time.time(),
         })
 
         raise
 
 
+@celery_app.task(name="archive.task")
+def archive_task(older_than_days: int | None = None):
+    """
+    Retention job: move the payloads of old predictions to compressed files (see db.archive_predictions).
+    Scheduled by celery beat (celery_handler), can also be sent manually.
+    """
+    kwargs = {"older_than_days": older_than_days} if older_than_days is not None else {}
+    archived = archive_predictions(**kwargs)
+    return {"archived": archived}
+
+
 # @celery_app.task(name="profile.task", bind=True)
 # def suggest_profile_task(self, df_dict: dict | pd.DataFrame):
 #     """
@@ -0,0 +1,127 @@
+import json
+import os
+import pymysql
+from .prediction_writer import DEAD_LETTER_FILE, PredictionWriter, replay_journals
+
+
+class FakeDB:
+    def __init__(self, fail: bool = False, rejected: tuple[str, ...] = ()):
+        self.fail = fail
+        # Ids the DB rejects for good (e.g. a foreign key pointing to a deleted model)
+        self.rejected = set(rejected)
+        self.batches = []
+        self.rows = {}
+
+    def __call__(self, rows):
+        if self.fail:
+            raise ConnectionError("db down")
+        if any(row["id"] in self.rejected for row in rows):
+            raise pymysql.err.IntegrityError(1452, "Cannot add or update a child row")
+        self.batches.append(rows)
+        for row in rows:
+            self.rows.setdefault(row["id"], {}).update({k: v for k, v in row.items() if v is not None})
+        return len(rows)
+
+
+def test_writes_are_coalesced_into_one_batch(tmp_path):
+    db = FakeDB()
+    writer = PredictionWriter(journal_dir=str(tmp_path), flush_interval=3600, writer=db)
+    flushed = []
+
+    writer.submit({"id": "p1", "status": "predicting", "name": "a"})
+    writer.submit({"id": "p2", "status": "completed", "outputs_json": "{}"}, on_flushed=lambda: flushed.append("p2"))
+    writer.submit({"id": "p1", "status": "completed", "outputs_json": "[1]"}, on_flushed=lambda: flushed.append("p1"))
+    assert writer.flush()
+
+    assert len(db.batches) == 1
+    assert db.rows["p1"] == {"id": "p1", "status": "completed", "name": "a", "outputs_json": "[1]"}
+    assert flushed == ["p2", "p1"]
+    # Everything is in the DB, so nothing is left to replay
+    assert os.path.getsize(writer._journal_path) == 0
+
+
+def test_failed_flush_keeps_writes_and_journal_is_replayed(tmp_path):
+    down = FakeDB(fail=True)
+    writer = PredictionWriter(journal_dir=str(tmp_path), flush_interval=3600, writer=down)
+    writer.submit({"id": "p1", "status": "completed", "outputs_json": "[1]"})
+    assert not writer.flush()
+    assert writer.metrics()["pending"] == 1
+
+    # The process holding the journal is alive -> its journal is not replayed
+    db = FakeDB()
+    assert replay_journals(str(tmp_path), db) == 0
+
+    # Simulate the process dying: its lock is released, plus a torn last line
+    with open(writer._journal_path, "a") as f:
+        f.write('{"id": "p2", "sta')
+    writer._lock_file.close()
+    assert replay_journals(str(tmp_path), db) == 1
+    assert db.rows["p1"]["status"] == "completed"
+    assert os.listdir(tmp_path) == []
+
+
+def test_journal_holds_only_pending_writes_after_flush(tmp_path):
+    db = FakeDB()
+    writer = PredictionWriter(journal_dir=str(tmp_path), flush_interval=3600, writer=db)
+    writer.submit({"id": "p1", "status": "completed"})
+    writer.flush()
+    writer.submit({"id": "p2", "status": "failed"})
+
+    with open(writer._journal_path) as f:
+        assert [json.loads(line)["id"] for line in f] == ["p2"]
+
+
+def test_rejected_row_is_dead_lettered_and_does_not_block_the_batch(tmp_path):
+    db = FakeDB(rejected=("bad",))
+    writer = PredictionWriter(journal_dir=str(tmp_path), flush_interval=3600, writer=db)
+    flushed = []
+    writer.submit({"id": "p1", "status": "completed"}, on_flushed=lambda: flushed.append("p1"))
+    writer.submit({"id": "bad", "model_id": "deleted", "status": "failed"}, on_flushed=lambda: flushed.append("bad"))
+    writer.submit({"id": "p2", "status": "completed"}, on_flushed=lambda: flushed.append("p2"))
+
+    assert writer.flush()
+    assert set(db.rows) == {"p1", "p2"}
+    assert flushed == ["p1", "p2"]
+    assert writer.metrics() == {"written": 2, "failed_flushes": 0, "dead_lettered": 1, "pending": 0}
+    # Rows written one by one after the batch was rejected; "bad" is not requeued
+    assert writer.flush()
+    assert db.batches == [[{"id": "p1", "status": "completed"}], [{"id": "p2", "status": "completed"}]]
+    assert os.path.getsize(writer._journal_path) == 0
+    with open(tmp_path / DEAD_LETTER_FILE) as f:
+        (line,) = f.readlines()
+    assert json.loads(line)["record"]["id"] == "bad"
+
+
+def test_replay_dead_letters_rejected_rows(tmp_path):
+    writer = PredictionWriter(journal_dir=str(tmp_path), flush_interval=3600, writer=FakeDB(fail=True))
+    writer.submit({"id": "p1", "status": "completed"})
+    writer.submit({"id": "bad", "status": "failed"})
+    writer._lock_file.close()
+
+    db = FakeDB(rejected=("bad",))
+    assert replay_journals(str(tmp_path), db) == 1
+    assert set(db.rows) == {"p1"}
+    assert os.listdir(tmp_path) == [DEAD_LETTER_FILE]
+
+
+def test_restart_after_failed_replay_keeps_the_old_journal(tmp_path, monkeypatch):
+    from . import prediction_writer
+    # A restarted container gets the same hostname and pid as the process that died
+    monkeypatch.setattr(prediction_writer.socket, "gethostname", lambda: "worker")
+    monkeypatch.setattr(prediction_writer.os, "getpid", lambda: 7)
+
+    dead = PredictionWriter(journal_dir=str(tmp_path), flush_interval=3600, writer=FakeDB(fail=True))
+    dead.submit({"id": "p1", "status": "completed"})
+    dead._lock_file.close()
+
+    # DB still down: the replay keeps the dead journal, the new writer must not truncate it
+    restarted = PredictionWriter(journal_dir=str(tmp_path), flush_interval=3600, writer=FakeDB(fail=True))
+    restarted.submit({"id": "p2", "status": "completed"})
+    assert restarted._journal_path != dead._journal_path
+    with open(dead._journal_path) as f:
+        assert [json.loads(line)["id"] for line in f] == ["p1"]
+
+    restarted._lock_file.close()
+    db = FakeDB()
+    assert replay_journals(str(tmp_path), db) == 2
+    assert set(db.rows) == {"p1", "p2"}
@@ -0,0 +1,81 @@
+import json
+import threading
+import time
+from . import publisher as publisher_module
+from .publisher import METRICS_KEY, EventPublisher
+
+
+class FakeRedis:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.messages = []
+        self.hashes = {}
+        # publish() blocks until released, so tests control what is in flight
+        self.release = threading.Event()
+        self.release.set()
+        self.publishing = threading.Event()
+
+    def publish(self, channel, message):
+        self.publishing.set()
+        self.release.wait(5)
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.messages.append((channel, message))
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    def expire(self, key, ttl):
+        pass
+
+
+def make_publisher(monkeypatch, fake, buffer_size=10):
+    monkeypatch.setattr(publisher_module.redis.ConnectionPool, "from_url", lambda *args, **kwargs: None)
+    monkeypatch.setattr(publisher_module.redis, "Redis", lambda connection_pool: fake)
+    return EventPublisher("redis://fake", buffer_size=buffer_size)
+
+
+def test_events_are_published_in_order(monkeypatch):
+    fake = FakeRedis()
+    publisher = make_publisher(monkeypatch, fake)
+    for i in range(5):
+        publisher.publish("jobs", f"m{i}")
+    assert publisher.flush()
+
+    assert fake.messages == [("jobs", f"m{i}") for i in range(5)]
+    metrics = publisher.metrics()
+    assert (metrics["published"], metrics["dropped"], metrics["failed"], metrics["queued"]) == (5, 0, 0, 0)
+    assert metrics["latency_p50_ms"] is not None
+
+
+def test_full_buffer_drops_the_oldest_events(monkeypatch):
+    fake = FakeRedis()
+    fake.release.clear()
+    publisher = make_publisher(monkeypatch, fake, buffer_size=2)
+    publisher.publish("jobs", "m0")
+    # m0 is in flight; m1..m4 compete for the 2 buffer slots
+    assert fake.publishing.wait(5)
+    for i in range(1, 5):
+        publisher.publish("jobs", f"m{i}")
+    assert publisher.metrics()["dropped"] == 2
+
+    fake.release.set()
+    assert publisher.flush()
+    assert [message for _, message in fake.messages] == ["m0", "m3", "m4"]
+    assert publisher.metrics()["published"] == 3
+
+
+def test_failures_are_counted_and_metrics_reported(monkeypatch):
+    monkeypatch.setattr(publisher_module, "METRICS_LOG_INTERVAL", 0)
+    fake = FakeRedis(fail=True)
+    publisher = make_publisher(monkeypatch, fake)
+    publisher.publish("jobs", "m0")
+    assert publisher.flush()
+
+    assert publisher.metrics()["failed"] == 1
+    # The report is written by the publisher thread right after the event is done
+    deadline = time.monotonic() + 5
+    while METRICS_KEY not in fake.hashes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    (report,) = fake.hashes[METRICS_KEY].values()
+    assert json.loads(report)["failed"] == 1
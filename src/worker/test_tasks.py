@@ -25,3 +25,39 @@ def test_task_train(celery_app):
     # except kombu.exceptions.OperationalError as e:
     #     logger.warning(e)
     #     pytest.skip("Skip pytest case as Celery/Redis is probably not available")
+
+
+def test_failed_prediction_event_uses_resolved_ids(monkeypatch):
+    from worker import tasks
+    monkeypatch.setattr(tasks, "get_prediction", lambda prediction_id, load_archived=True: {"model_id": "m1"})
+    monkeypatch.setattr(tasks, "get_model", lambda model_id: {"problem_id": "pr1"})
+
+    assert tasks._prediction_event_ids("p1", None, "production") == ("pr1", "m1")
+    assert tasks._prediction_event_ids("p1", "pr2", "m2") == ("pr2", "m2")
+
+
+def test_failed_prediction_event_keeps_inputs_when_lookup_fails(monkeypatch):
+    from worker import tasks
+
+    def unavailable(*args, **kwargs):
+        raise ConnectionError("db down")
+
+    monkeypatch.setattr(tasks, "get_prediction", unavailable)
+    assert tasks._prediction_event_ids("p1", "pr1", "production") == ("pr1", "production")
+
+
+def test_failed_explain_event_has_resolved_ids(monkeypatch):
+    from worker import tasks
+    published = []
+    monkeypatch.setattr(tasks, "explain_prediction", lambda **kwargs: (_ for _ in ()).throw(ValueError("no model")))
+    monkeypatch.setattr(tasks, "get_prediction", lambda prediction_id, load_archived=True: {"model_id": "m1"})
+    monkeypatch.setattr(tasks, "get_model", lambda model_id: {"problem_id": "pr1"})
+    monkeypatch.setattr(tasks, "publish_job_event", lambda event, payload: published.append((event, payload)))
+    monkeypatch.setattr(tasks.explain_task, "update_state", lambda **kwargs: None)
+
+    with pytest.raises(ValueError):
+        tasks.explain_task.run("p1", rows=[0])
+
+    ((event, payload),) = published
+    assert event == "job.failed"
+    assert tasks.job_channel(payload) == "jobs:u:_:p:pr1:m:m1"